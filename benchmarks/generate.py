@@ -0,0 +1,361 @@
+import argparse
+import bisect
+import itertools
+import logging
+import math
+import os
+import random
+import time
+from datetime import date, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Tailles prédéfinies : nombre de produits, de clients, de ventes et années d'historique
+SIZES = {
+    'small': {'products': 60, 'customers': 500, 'sales': 20_000, 'years': 1},
+    'medium': {'products': 200, 'customers': 5_000, 'sales': 200_000, 'years': 2},
+    'large': {'products': 400, 'customers': 20_000, 'sales': 1_000_000, 'years': 3},
+}
+
+# Ventes insérées par transaction
+CHUNK_SIZE = 20_000
+
+# Saisonnalité mensuelle (janvier -> décembre)
+FLAT = (1.0,) * 12
+# Carême (mars-avril) et fêtes de fin d'année
+FISH = (1.0, 1.0, 1.25, 1.25, 1.0, 0.9, 0.9, 0.9, 1.0, 1.0, 1.0, 1.2)
+# Grande saison de la sardinelle (remontée d'eaux froides de juillet à septembre)
+SARDINELLA = (0.7, 0.7, 0.7, 0.8, 0.9, 1.2, 1.8, 1.9, 1.6, 1.0, 0.8, 0.8)
+POULTRY = (1.0, 0.9, 0.9, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.1, 1.9)
+SHELLFISH = (0.9, 0.9, 1.1, 1.1, 0.9, 0.8, 0.8, 0.8, 0.9, 1.0, 1.1, 1.7)
+
+# Catégorie -> fournisseur habituel et produits (nom, prix au kg en FCFA, saisonnalité)
+CATALOG = {
+    'POISSON': ("Pêcherie du lac de Kossou", [
+        ("Carpe", 1200, FISH), ("Tilapia", 1500, FISH), ("Capitaine", 3000, FISH),
+        ("Mâchoiron", 2500, FISH), ("Silure", 2000, FISH), ("Sardinelle", 800, SARDINELLA),
+        ("Chinchard", 1000, FISH), ("Maquereau", 1300, FISH), ("Thon", 2200, FISH),
+        ("Bar", 3500, FISH), ("Dorade", 2800, FISH), ("Mulet", 1400, FISH), ("Sole", 4000, FISH),
+        ("Hareng", 1100, FISH), ("Ombrine", 2600, FISH), ("Brochet", 2300, FISH),
+    ]),
+    'VOLAILLE': ("Ferme avicole de Korhogo", [
+        ("Poulet de chair", 2000, POULTRY), ("Poulet bicyclette", 3000, POULTRY),
+        ("Pintade", 2800, POULTRY), ("Dinde", 2500, POULTRY), ("Ailes de poulet", 1800, POULTRY),
+        ("Cuisses de poulet", 1900, POULTRY), ("Canard", 3200, POULTRY),
+    ]),
+    'CRUSTACÉS': ("Mareyeuses de San-Pédro", [
+        ("Crevettes", 5000, SHELLFISH), ("Crabes", 2500, SHELLFISH), ("Langoustes", 9000, SHELLFISH),
+        ("Gambas", 6500, SHELLFISH), ("Huîtres de lagune", 3000, SHELLFISH),
+    ]),
+    'FUMÉ ET SÉCHÉ': ("Coopérative des fumeuses de Ouangolo", [
+        ("Mâchoiron fumé", 4000, FLAT), ("Sardinelle fumée", 2500, SARDINELLA),
+        ("Poisson séché", 3500, FLAT), ("Crevettes séchées", 7000, FLAT), ("Silure fumé", 3800, FLAT),
+    ]),
+    'SURGELÉ': ("Frigorifique d'Abidjan", [
+        ("Chinchard congelé", 900, FLAT), ("Maquereau congelé", 1100, FLAT),
+        ("Merlu congelé", 1600, FLAT), ("Poulet congelé", 1700, FLAT), ("Bars congelés", 2400, FLAT),
+        ("Crevettes congelées", 4200, SHELLFISH),
+    ]),
+}
+
+# Déclinaisons ajoutées quand la taille demandée dépasse le catalogue de base
+VARIANTS = (("petit", 0.85), ("gros", 1.2), ("vidé", 1.1), ("en morceaux", 1.15),
+            ("écaillé", 1.1), ("calibre export", 1.4))
+
+FIRST_NAMES = ("Kouassi", "Aya", "Yao", "Adjoua", "Konan", "Amenan", "Moussa", "Fatou", "Ibrahim",
+               "Awa", "Seydou", "Mariam", "Bakary", "Salimata", "Drissa", "Aminata", "Koffi", "Affoué",
+               "Jean", "Marie", "Lassina", "Kadiatou", "Siaka", "Rokia", "Zié", "Nathalie", "Éric",
+               "Hélène", "Adama", "Bintou")
+LAST_NAMES = ("Ouattara", "Traoré", "Koné", "Coulibaly", "Diabaté", "Bamba", "Touré", "Kouamé", "Yao",
+              "N'Guessan", "Kouadio", "Soro", "Silué", "Yéo", "Konaté", "Cissé", "Sanogo", "Fofana",
+              "Diarra", "Doumbia", "Koffi", "Gnagne", "Tuo", "Sékongo", "Dembélé")
+BUSINESSES = ("Restaurant", "Maquis", "Hôtel", "Cantine", "Traiteur")
+TOWNS = ("Ouangolo", "Korhogo", "Ferkessédougou", "Diawala", "Niellé", "Kong", "Boundiali", "Bouaké")
+
+# Fréquentation par jour de la semaine (lundi -> dimanche) et par mois
+WEEKDAYS = (0.8, 0.85, 1.0, 0.9, 1.25, 1.5, 1.1)
+MONTHS = (1.05, 0.95, 1.0, 1.0, 0.95, 0.9, 0.9, 0.9, 0.95, 1.0, 1.05, 1.4)
+# Fêtes : veilles très chargées, jours fériés presque fermés
+HOLIDAYS = {(12, 24): 2.2, (12, 31): 2.0, (12, 25): 0.3, (1, 1): 0.3}
+# Heures d'ouverture et affluence
+HOURS = (7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19)
+HOUR_WEIGHTS = (0.6, 1.3, 1.4, 1.2, 0.9, 0.6, 0.4, 0.4, 0.6, 1.0, 1.3, 1.1, 0.5)
+# Nombre de lignes par panier
+BASKET_SIZES = (1, 2, 3, 4, 5, 6, 7, 8)
+BASKET_WEIGHTS = (30, 28, 18, 10, 6, 4, 2, 2)
+# Croissance annuelle de la fréquentation et hausse annuelle des prix
+GROWTH = 1.08
+INFLATION = 1.05
+
+
+def _zipf(count, exponent=0.9):
+    """Poids cumulés d'une loi de Zipf : quelques éléments très demandés, une longue traîne"""
+    return list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def _pick(rng, cumulative):
+    return bisect.bisect(cumulative, rng.random() * cumulative[-1])
+
+
+def build_products(count, rng):
+    """
+    Compose le catalogue : produits de base puis déclinaisons.
+
+    Returns:
+        list: (nom, catégorie, prix, saisonnalité) dans l'ordre des identifiants
+    """
+    base = [(name, category, price, season)
+            for category, (_, products) in CATALOG.items()
+            for name, price, season in products]
+    products = list(base)
+    for variant, factor in VARIANTS:
+        products.extend((f"{name} {variant}", category, price * factor, season)
+                        for name, category, price, season in base)
+    products = products[:count]
+    index = len(products)
+    while len(products) < count:
+        name, category, price, season = base[index % len(base)]
+        products.append((f"{name} lot {index // len(base)}", category, price, season))
+        index += 1
+    rng.shuffle(products)
+    return [(name, category, round(price / 25) * 25, season) for name, category, price, season in products]
+
+
+def build_customers(count, rng):
+    """
+    Compose les clients : le client comptoir (ventes anonymes), quelques
+    professionnels, puis des particuliers.
+
+    Returns:
+        list: (nom, téléphone, adresse) dans l'ordre des identifiants
+    """
+    customers = [("Client comptoir", None, None)]
+    for index in range(1, count):
+        town = rng.choice(TOWNS)
+        phone = f"{rng.choice(('01', '05', '07'))} {rng.randrange(10, 100)} {rng.randrange(10, 100)} " \
+                f"{rng.randrange(10, 100)} {rng.randrange(10, 100)}"
+        if index % 50 == 1:
+            name = f"{rng.choice(BUSINESSES)} {rng.choice(LAST_NAMES)}"
+        else:
+            name = f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}"
+        customers.append((name, phone, f"Quartier {rng.randrange(1, 30)}, {town}"))
+    return customers
+
+
+def day_weights(start, end, rng):
+    """
+    Pondère chaque jour de la période : jour de la semaine, mois, fêtes, fin de
+    mois (paie), croissance de l'activité et aléas.
+
+    Returns:
+        list: (jour, poids)
+    """
+    weights = []
+    day = start
+    while day <= end:
+        weight = WEEKDAYS[day.weekday()] * MONTHS[day.month - 1]
+        weight *= HOLIDAYS.get((day.month, day.day), 1.0)
+        if day.day >= 25 or day.day <= 3:
+            weight *= 1.15
+        weight *= GROWTH ** ((day - start).days / 365)
+        weight *= rng.lognormvariate(0, 0.15)
+        weights.append((day, weight))
+        day += timedelta(days=1)
+    return weights
+
+
+def generate(conn, products=200, customers=5000, sales=200_000, years=2, seed=42, end=None):
+    """
+    Remplit une base vide (schéma de base, sans migrations) de données réalistes.
+
+    Les ventes sont insérées par lots avant la création des index, des
+    synthèses et de l'index plein texte : les migrations appliquées ensuite
+    les construisent en une passe.
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture
+        products (int): Nombre de produits
+        customers (int): Nombre de clients
+        sales (int): Nombre approximatif de ventes
+        years (int): Années d'historique, jusqu'à end
+        seed (int): Graine du générateur aléatoire (bases reproductibles)
+        end (date): Dernier jour de ventes (par défaut : hier)
+
+    Returns:
+        dict: Nombre de lignes insérées par table
+    """
+    rng = random.Random(seed)
+    end = end or date.today() - timedelta(days=1)
+    start = end - timedelta(days=365 * years - 1)
+    counts = {}
+
+    categories = list(CATALOG)
+    conn.executemany("INSERT INTO categories (id, name) VALUES (?, ?)",
+                     [(index + 1, name) for index, name in enumerate(categories)])
+    category_ids = {name: index + 1 for index, name in enumerate(categories)}
+    conn.executemany("INSERT INTO suppliers (id, name, phone, address) VALUES (?, ?, ?, ?)",
+                     [(index + 1, supplier, f"27 {index + 20} 00 00 {index + 10}", rng.choice(TOWNS))
+                      for index, (supplier, _) in enumerate(CATALOG.values())])
+    supplier_ids = {name: index + 1 for index, name in enumerate(categories)}
+
+    catalog = build_products(products, rng)
+    conn.executemany("INSERT INTO products (id, name, price, stock, category_id) VALUES (?, ?, ?, ?, ?)",
+                     [(index + 1, name, price, round(rng.uniform(5, 150), 1), category_ids[category])
+                      for index, (name, category, price, _) in enumerate(catalog)])
+    clients = build_customers(customers, rng)
+    conn.executemany("INSERT INTO customers (id, name, phone, address) VALUES (?, ?, ?, ?)",
+                     [(index + 1,) + customer for index, customer in enumerate(clients)])
+    conn.commit()
+    counts.update(categories=len(categories), suppliers=len(categories),
+                  products=len(catalog), customers=len(clients))
+
+    # Popularité des produits pour chaque mois, et des clients (habitués en tête)
+    popularity = [1 / (rank + 1) ** 0.8 for rank in range(len(catalog))]
+    monthly = [list(itertools.accumulate(popularity[index] * season[month]
+                                         for index, (_, _, _, season) in enumerate(catalog)))
+               for month in range(12)]
+    regulars = _zipf(max(len(clients) - 1, 1))
+    hours = list(itertools.accumulate(HOUR_WEIGHTS))
+    baskets = list(itertools.accumulate(BASKET_WEIGHTS))
+
+    weights = day_weights(start, end, rng)
+    scale = sales / sum(weight for _, weight in weights)
+    sale_id = 0
+    item_id = 0
+    movement_id = 0
+    sale_rows, item_rows, movement_rows = [], [], []
+    counts.update(sales=0, sale_items=0, inventory_movements=0)
+
+    def flush():
+        conn.executemany('''
+            INSERT INTO sales (id, date, customer_id, total, payment_method, discount, tax, barcode)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', sale_rows)
+        conn.executemany("INSERT INTO sale_items (id, sale_id, product_id, quantity, price) VALUES (?, ?, ?, ?, ?)",
+                         item_rows)
+        conn.executemany('''
+            INSERT INTO inventory_movements (id, product_id, quantity, movement_type, date, supplier_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', movement_rows)
+        conn.commit()
+        counts['sales'] += len(sale_rows)
+        counts['sale_items'] += len(item_rows)
+        counts['inventory_movements'] += len(movement_rows)
+        sale_rows.clear()
+        item_rows.clear()
+        movement_rows.clear()
+
+    for day, weight in weights:
+        expected = weight * scale
+        count = int(expected) + (rng.random() < expected - int(expected))
+        month = day.month - 1
+        price_level = INFLATION ** (-(end - day).days / 365)
+        sold = {}
+
+        times = sorted(rng.randrange(3600) + 3600 * HOURS[_pick(rng, hours)] for _ in range(count))
+        for seconds in times:
+            sale_id += 1
+            stamp = f"{day.isoformat()} {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+            walk_in = rng.random() < 0.55
+            customer_id = 1 if walk_in else 2 + _pick(rng, regulars)
+            # Professionnels (restaurants, maquis...) : paniers en gros
+            bulk = 4 if not walk_in and customer_id % 50 == 2 else 1
+
+            total = 0
+            for product in {_pick(rng, monthly[month]) for _ in range(BASKET_SIZES[_pick(rng, baskets)])}:
+                name, category, price, _ = catalog[product]
+                quantity = round(min(max(rng.lognormvariate(0.2, 0.6) * bulk, 0.2), 40), 1)
+                unit_price = round(price * price_level / 25) * 25
+                item_id += 1
+                item_rows.append((item_id, sale_id, product + 1, quantity, unit_price))
+                total += quantity * unit_price
+                sold[product] = sold.get(product, 0) + quantity
+
+            if rng.random() < 0.25:
+                # Vente saisie depuis l'écran Ventes : moyen de paiement, remise, code
+                payment = rng.choices(('cash', 'mobile', 'credit'), (70, 25, 5))[0]
+                discount = rng.choice((0, 0, 0, 5, 10)) if bulk > 1 else 0
+                final = total * (1 - discount / 100)
+                barcode = f"INV-{day:%Y%m%d}{seconds // 3600:02d}{seconds // 60 % 60:02d}{seconds % 60:02d}"
+                sale_rows.append((sale_id, stamp, customer_id, round(final), payment, discount, 0, barcode))
+            else:
+                sale_rows.append((sale_id, stamp, customer_id, round(total), None, 0, 0, None))
+
+        # Arrivages du matin à hauteur des ventes du jour, et pertes occasionnelles
+        for product, quantity in sold.items():
+            category = catalog[product][1]
+            movement_id += 1
+            movement_rows.append((movement_id, product + 1, math.ceil(quantity * 1.1), 'in',
+                                  f"{day.isoformat()} 06:00:00", supplier_ids[category]))
+            if rng.random() < 0.03:
+                movement_id += 1
+                movement_rows.append((movement_id, product + 1, round(quantity * 0.1, 1), 'loss',
+                                      f"{day.isoformat()} 20:00:00", None))
+
+        if len(sale_rows) >= CHUNK_SIZE:
+            flush()
+            logger.info("%s : %d ventes", day.isoformat(), sale_id)
+    flush()
+    return counts
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande :
+    python -m benchmarks.generate --out bench.db [--size small|medium|large] [--sales N ...]
+    """
+    parser = argparse.ArgumentParser(description="Génère une base de données réaliste pour les mesures de performance")
+    parser.add_argument('--out', required=True, help="Fichier de base de données à créer")
+    parser.add_argument('--size', choices=SIZES, default='medium', help="Taille prédéfinie")
+    parser.add_argument('--products', type=int, help="Nombre de produits")
+    parser.add_argument('--customers', type=int, help="Nombre de clients")
+    parser.add_argument('--sales', type=int, help="Nombre de ventes")
+    parser.add_argument('--years', type=int, help="Années d'historique")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du générateur aléatoire")
+    parser.add_argument('--end', help="Dernier jour de ventes (AAAA-MM-JJ), par défaut hier")
+    parser.add_argument('--force', action='store_true', help="Remplacer le fichier s'il existe")
+    args = parser.parse_args()
+    try:
+        end = date.fromisoformat(args.end) if args.end else None
+    except ValueError:
+        parser.error("--end : format de date invalide (AAAA-MM-JJ)")
+
+    from models.connection import ConnectionManager
+    from models.database import create_schema
+    from models.migrations import apply_migrations
+    from models.profiler import QueryProfiler
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if os.path.exists(args.out):
+        if not args.force:
+            parser.error(f"{args.out} existe déjà (--force pour le remplacer)")
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.out + suffix):
+                os.remove(args.out + suffix)
+
+    options = dict(SIZES[args.size])
+    options.update({name: getattr(args, name) for name in options if getattr(args, name) is not None})
+
+    # Bulk load: statement timing would only add noise
+    QueryProfiler().enabled = False
+    start = time.perf_counter()
+    manager = ConnectionManager(args.out)
+    try:
+        with manager.write_lock:
+            conn = manager.writer
+            create_schema(conn)
+            counts = generate(conn, seed=args.seed, end=end, **options)
+            logger.info("Données insérées en %.1f s, construction des index et synthèses",
+                        time.perf_counter() - start)
+            apply_migrations(conn)
+            conn.execute("ANALYZE")
+            conn.commit()
+    finally:
+        manager.close()
+
+    logger.info("%s généré en %.1f s : %s", args.out, time.perf_counter() - start,
+                ", ".join(f"{count} {table}" for table, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Écart toléré entre stock attendu et stock relu (quantités décimales)
+STOCK_TOLERANCE = 1e-6
+
+# Messages d'erreur de SQLite pour SQLITE_BUSY / SQLITE_LOCKED
+_BUSY_MESSAGES = ('database is locked', 'database is busy', 'database table is locked')
+
+# Nombre de messages d'erreur distincts conservés
+_ERROR_SAMPLES = 5
+
+
+def _is_busy(error):
+    return isinstance(error, sqlite3.OperationalError) and any(
+        message in str(error) for message in _BUSY_MESSAGES)
+
+
+def percentile(values, fraction):
+    """
+    Retourne le centile d'une liste triée (plus proche rang).
+
+    Args:
+        values (list): Valeurs triées
+        fraction (float): Centile, entre 0 et 1
+
+    Returns:
+        float: Valeur du centile, None si la liste est vide
+    """
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def _basket(rng, products, options):
+    """Panier aléatoire : produits distincts, quantités au dixième de kilo"""
+    size = rng.randint(options['basket_min'], min(options['basket_max'], len(products)))
+    items = []
+    for product_id, price in rng.sample(products, size):
+        items.append({'product_id': product_id,
+                      'quantity': round(rng.uniform(0.2, options['max_quantity']), 1),
+                      'price': price})
+    return items
+
+
+def till(index, db_file, options, start, results):
+    """
+    Une caisse : valide des ventes en boucle pendant la durée du test.
+
+    Chaque caisse ouvre ses propres connexions et sa file d'écriture, comme une
+    instance de l'application, et enregistre les ventes par le même chemin que
+    la caisse (services.sales.insert_sale : en-tête, lignes, décrément du stock).
+    La latence mesurée va de la soumission de la vente à sa validation.
+
+    Args:
+        index (int): Numéro de la caisse
+        db_file (str): Base partagée par toutes les caisses
+        options (dict): Paramètres du test (voir run())
+        start: Événement déclenchant le début du test
+        results: File recevant ('ready', index) puis ('done', résultats)
+    """
+    from models.connection import ConnectionManager
+    from models.profiler import QueryProfiler
+    from models.write_queue import WriteQueue
+    from services.sales import insert_sale
+
+    # Failures are counted below; one traceback per busy commit would flood the output
+    logging.getLogger('models.write_queue').setLevel(logging.CRITICAL)
+    QueryProfiler().enabled = False
+
+    manager = ConnectionManager(db_file)
+    if options['busy_timeout'] is not None:
+        manager.writer.execute(f"PRAGMA busy_timeout = {int(options['busy_timeout'])}")
+    if options['synchronous'] is not None:
+        manager.writer.execute(f"PRAGMA synchronous = {options['synchronous']}")
+    writes = WriteQueue(manager)
+
+    rng = random.Random(options['seed'] * 1000 + index)
+    products = [tuple(product) for product in options['products']]
+    customers = options['customers']
+    latencies = []
+    sold = {}
+    items_count = 0
+    busy = 0
+    errors = 0
+    samples = []
+
+    results.put(('ready', index))
+    start.wait()
+    deadline = time.monotonic() + options['duration']
+    next_at = time.monotonic()
+    try:
+        while True:
+            if options['rate']:
+                # Poisson arrivals: exponential time between two customers
+                next_at += rng.expovariate(options['rate'] / 60)
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            if time.monotonic() >= deadline:
+                break
+
+            items = _basket(rng, products, options)
+            sale = {
+                'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'customer_id': rng.choice(customers) if customers else None,
+                'total': round(sum(item['quantity'] * item['price'] for item in items), 2)
+            }
+            began = time.perf_counter()
+            future = writes.submit(insert_sale, sale, items)
+            try:
+                future.result()
+            except Exception as e:
+                if _is_busy(e):
+                    busy += 1
+                else:
+                    errors += 1
+                sample = f"{type(e).__name__}: {e}"
+                if len(samples) < _ERROR_SAMPLES and sample not in samples:
+                    samples.append(sample)
+                continue
+            latencies.append((time.perf_counter() - began) * 1000)
+            items_count += len(items)
+            for item in items:
+                sold[item['product_id']] = sold.get(item['product_id'], 0) + item['quantity']
+    finally:
+        writes.close()
+        manager.close()
+
+    results.put(('done', {
+        'till': index,
+        'latencies': latencies,
+        'items': items_count,
+        'sold': sold,
+        'busy': busy,
+        'errors': errors,
+        'error_samples': samples,
+    }))
+
+
+def _prepare(db_file):
+    """Lit les produits, clients, stocks et compteurs avant le test"""
+    conn = sqlite3.connect(db_file)
+    try:
+        products = conn.execute("SELECT id, price FROM products ORDER BY id").fetchall()
+        customers = [row[0] for row in conn.execute("SELECT id FROM customers ORDER BY id")]
+        stock = dict(conn.execute("SELECT id, stock FROM products"))
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ('sales', 'sale_items')}
+    finally:
+        conn.close()
+    return products, customers, stock, counts
+
+
+def check_consistency(db_file, stock_before, counts_before, committed, items, sold):
+    """
+    Vérifie qu'aucune mise à jour validée n'a été perdue.
+
+    Le stock de chaque produit doit valoir le stock initial moins les quantités
+    des ventes confirmées aux caisses, et le nombre de ventes et de lignes doit
+    avoir augmenté d'autant.
+
+    Returns:
+        dict: Écarts constatés (lost_stock_updates, stock_drift, sales_delta, sale_items_delta)
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        stock_after = dict(conn.execute("SELECT id, stock FROM products"))
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ('sales', 'sale_items')}
+    finally:
+        conn.close()
+
+    lost = 0
+    drift = 0.0
+    for product_id, before in stock_before.items():
+        difference = (before - sold.get(product_id, 0)) - stock_after.get(product_id, 0)
+        if abs(difference) > STOCK_TOLERANCE:
+            lost += 1
+            drift += difference
+    return {
+        'lost_stock_updates': lost,
+        'stock_drift': round(drift, 3),
+        'sales_delta': counts['sales'] - counts_before['sales'] - committed,
+        'sale_items_delta': counts['sale_items'] - counts_before['sale_items'] - items,
+    }
+
+
+def run(source, tills, options, mode='process'):
+    """
+    Exécute un test de charge avec un nombre donné de caisses.
+
+    Le test tourne sur une copie de la base source, qui n'est pas modifiée.
+
+    Args:
+        source (str): Base de départ (voir python -m benchmarks.generate)
+        tills (int): Nombre de caisses simultanées
+        options (dict): duration (s), rate (ventes par minute et par caisse, 0 sans pause),
+            basket_min, basket_max, max_quantity, busy_timeout (ms), synchronous, seed
+        mode (str): 'process' (une caisse par processus, comme des postes distincts)
+            ou 'thread'
+
+    Returns:
+        dict: Débit, latences de validation, erreurs BUSY et contrôle de cohérence
+    """
+    from benchmarks.run import copy_database
+
+    directory = tempfile.mkdtemp(prefix="fisher-load-")
+    try:
+        db_file = copy_database(source, directory)
+        products, customers, stock_before, counts_before = _prepare(db_file)
+        if not products:
+            raise ValueError(f"{source} ne contient aucun produit")
+        options = dict(options, products=products, customers=customers)
+
+        if mode == 'process':
+            context = multiprocessing.get_context('spawn')
+            start, results = context.Event(), context.Queue()
+            workers = [context.Process(target=till, args=(index, db_file, options, start, results), daemon=True)
+                       for index in range(tills)]
+        else:
+            start, results = threading.Event(), queue.Queue()
+            workers = [threading.Thread(target=till, args=(index, db_file, options, start, results), daemon=True)
+                       for index in range(tills)]
+        for worker in workers:
+            worker.start()
+
+        timeout = options['duration'] + 60
+        try:
+            for _ in range(tills):
+                results.get(timeout=timeout)
+            start.set()
+            began = time.perf_counter()
+            reports = []
+            for _ in range(tills):
+                kind, report = results.get(timeout=timeout)
+                reports.append(report)
+            elapsed = time.perf_counter() - began
+        except queue.Empty:
+            raise RuntimeError("Une caisse ne répond plus") from None
+        finally:
+            for worker in workers:
+                worker.join(timeout=5)
+
+        latencies = sorted(latency for report in reports for latency in report['latencies'])
+        committed = len(latencies)
+        items = sum(report['items'] for report in reports)
+        sold = {}
+        for report in reports:
+            for product_id, quantity in report['sold'].items():
+                sold[product_id] = sold.get(product_id, 0) + quantity
+        consistency = check_consistency(db_file, stock_before, counts_before, committed, items, sold)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        'tills': tills,
+        'mode': mode,
+        'elapsed_s': round(elapsed, 3),
+        'committed': committed,
+        'throughput': round(committed / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.5), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+        'max_ms': round(latencies[-1], 2) if latencies else None,
+        'busy': sum(report['busy'] for report in reports),
+        'errors': sum(report['errors'] for report in reports),
+        'error_samples': list(dict.fromkeys(sample for report in reports
+                                            for sample in report['error_samples']))[:_ERROR_SAMPLES],
+        'per_till': sorted((report['till'], len(report['latencies'])) for report in reports),
+        **consistency,
+    }
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande :
+    python -m benchmarks.load_test --db bench.db [--tills 1 2 4 8] [--duration 10] [--rate 0]
+
+    Code de retour 1 si une mise à jour validée a été perdue.
+    """
+    parser = argparse.ArgumentParser(description="Simule plusieurs caisses validant des ventes sur la même base")
+    parser.add_argument('--db', required=True, help="Base de départ (voir python -m benchmarks.generate)")
+    parser.add_argument('--tills', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Nombres de caisses simultanées à tester")
+    parser.add_argument('--mode', choices=('process', 'thread'), default='process',
+                        help="Une caisse par processus (postes distincts) ou par thread")
+    parser.add_argument('--duration', type=float, default=10, help="Durée de chaque palier (s)")
+    parser.add_argument('--rate', type=float, default=0,
+                        help="Ventes par minute et par caisse (arrivées aléatoires), 0 pour enchaîner sans pause")
+    parser.add_argument('--basket', type=int, nargs=2, default=[1, 6], metavar=('MIN', 'MAX'),
+                        help="Nombre de lignes par vente")
+    parser.add_argument('--max-quantity', type=float, default=3.0, help="Quantité maximale par ligne (kg)")
+    parser.add_argument('--busy-timeout', type=int,
+                        help="PRAGMA busy_timeout des caisses en ms (5000 dans l'application)")
+    parser.add_argument('--synchronous', choices=('OFF', 'NORMAL', 'FULL'),
+                        help="PRAGMA synchronous des caisses (OFF dans l'application)")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du générateur aléatoire")
+    parser.add_argument('--out', help="Fichier JSON des résultats")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} introuvable")
+    if not 1 <= args.basket[0] <= args.basket[1]:
+        parser.error("--basket : 1 <= MIN <= MAX")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    options = {
+        'duration': args.duration,
+        'rate': args.rate,
+        'basket_min': args.basket[0],
+        'basket_max': args.basket[1],
+        'max_quantity': args.max_quantity,
+        'busy_timeout': args.busy_timeout,
+        'synchronous': args.synchronous,
+        'seed': args.seed,
+    }
+
+    levels = []
+    for tills in args.tills:
+        logger.info("Palier de %d caisse(s) pendant %.0f s", tills, args.duration)
+        levels.append(run(args.db, tills, options, mode=args.mode))
+
+    print(f"{'Caisses':>7} {'Ventes':>8} {'Ventes/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+          f"{'Max (ms)':>9} {'BUSY':>6} {'Erreurs':>8} {'Pertes':>7}")
+    for level in levels:
+        print(f"{level['tills']:>7} {level['committed']:>8} {level['throughput']:>9.1f} "
+              f"{level['p50_ms'] or 0:>9.2f} {level['p99_ms'] or 0:>9.2f} {level['max_ms'] or 0:>9.2f} "
+              f"{level['busy']:>6} {level['errors']:>8} {level['lost_stock_updates']:>7}")
+        for sample in level['error_samples']:
+            logger.warning("%d caisse(s) : %s", level['tills'], sample)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'database': os.path.abspath(args.db), 'options': options,
+                       'sqlite': sqlite3.sqlite_version, 'levels': levels},
+                      f, ensure_ascii=False, indent=2)
+
+    inconsistent = [level['tills'] for level in levels
+                    if level['lost_stock_updates'] or level['sales_delta'] or level['sale_items_delta']]
+    if inconsistent:
+        logger.error("Mises à jour perdues avec %s caisse(s)", ", ".join(map(str, inconsistent)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
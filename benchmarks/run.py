@@ -0,0 +1,331 @@
+import argparse
+import fnmatch
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Référence enregistrée par --save-baseline, comparée à chaque exécution
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Mesure : nom, fonction run(db, contexte) -> nombre de lignes, nombre d'exécutions
+# (par défaut celui de la ligne de commande)
+Benchmark = namedtuple('Benchmark', ['name', 'run', 'repeat'], defaults=(None,))
+
+
+def _view(cls):
+    """Instance d'une vue sans ses widgets, pour appeler ses méthodes de requête"""
+    return cls.__new__(cls)
+
+
+def _read(query):
+    """Mesure d'une fonction query(conn, contexte) exécutée sur une connexion de lecture"""
+    def run(db, context):
+        with db.read() as conn:
+            return len(query(conn, context))
+    return run
+
+
+def _report(build):
+    """Mesure d'un rapport : construction et lecture de toutes ses lignes, dans un instantané"""
+    def run(db, context):
+        from models.reports import snapshot
+        with db.read() as conn, snapshot(conn):
+            report = build(conn, context)
+            return sum(1 for _ in report.rows())
+    return run
+
+
+def _commit_sale(db, context):
+    # Same path as the till: SaleService, then the grouped commit of the write queue
+    from services.sales import SaleService
+    sale_id = SaleService(db).record_sale(context['customer_id'], context['basket']).result()
+    return 1 if sale_id else 0
+
+
+def benchmarks():
+    """Requêtes chaudes des vues, rapports et validation d'une vente"""
+    from models.invoices import fetch_invoice, fetch_invoices
+    from models.reports import daily_report, monthly_report, period_report, stock_report
+    from models.search import match_expression
+    from views.cashier import CLIENTS_QUERY, PRODUCT_SEARCH_QUERY
+    from views.customers import CustomersView
+    from views.inventory import InventoryView
+    from views.invoices import InvoicesView
+    from views.products import ProductsView
+    from views.sales import SalesView
+
+    products, customers = _view(ProductsView), _view(CustomersView)
+    sales, invoices, inventory = _view(SalesView), _view(InvoicesView), _view(InventoryView)
+
+    return [
+        # List loads: first page, and a page in the middle of the history
+        Benchmark('products.list', _read(lambda conn, c: products.search_products(conn, ''))),
+        Benchmark('customers.list', _read(lambda conn, c: customers.search_customers(conn, ''))),
+        Benchmark('sales.list', _read(lambda conn, c: sales.search_sales(conn, ''))),
+        Benchmark('sales.page', _read(lambda conn, c: sales.search_sales(conn, '', after=c['sales_middle']))),
+        Benchmark('invoices.list', _read(lambda conn, c: invoices.search_invoices(conn, ''))),
+        Benchmark('invoices.page', _read(lambda conn, c: invoices.search_invoices(conn, '', after=c['sales_middle']))),
+        Benchmark('inventory.list', _read(lambda conn, c: inventory.search_inventory(conn, '', 'Toutes'))),
+        Benchmark('inventory.category', _read(lambda conn, c: inventory.search_inventory(conn, '', c['category']))),
+        Benchmark('categories.list', _read(lambda conn, c: conn.execute('SELECT * FROM categories').fetchall())),
+        Benchmark('cashier.clients', _read(lambda conn, c: conn.execute(CLIENTS_QUERY).fetchall())),
+
+        # Searches
+        Benchmark('products.search', _read(lambda conn, c: products.search_products(conn, c['product_term']))),
+        Benchmark('customers.search', _read(lambda conn, c: customers.search_customers(conn, c['customer_term']))),
+        Benchmark('sales.search', _read(lambda conn, c: sales.search_sales(conn, c['customer_term']))),
+        Benchmark('invoices.search', _read(lambda conn, c: invoices.search_invoices(conn, c['customer_term']))),
+        Benchmark('cashier.search', _read(lambda conn, c: conn.execute(
+            PRODUCT_SEARCH_QUERY, (match_expression(c['product_term']),)).fetchall())),
+
+        # Invoices: one sale, and one batch chunk
+        Benchmark('invoices.fetch', _read(lambda conn, c: [fetch_invoice(conn, c['recent_sales'][0])])),
+        Benchmark('invoices.fetch_batch', _read(lambda conn, c: fetch_invoices(conn, c['recent_sales']))),
+
+        # Reports
+        Benchmark('reports.daily', _report(lambda conn, c: daily_report(conn, c['busiest_day']))),
+        Benchmark('reports.monthly', _report(lambda conn, c: monthly_report(conn, *c['last_month']))),
+        Benchmark('reports.period', _report(lambda conn, c: period_report(conn, *c['last_quarter']))),
+        Benchmark('reports.stock', _report(lambda conn, c: stock_report(conn, c['stock_since']))),
+
+        # Sale commit
+        Benchmark('sale.commit', _commit_sale, repeat=50),
+    ]
+
+
+def build_context(db):
+    """Paramètres des mesures, tirés des données de la base"""
+    from utils.dates import day_key
+
+    with db.read() as conn:
+        last = conn.execute("SELECT MAX(date) FROM sales").fetchone()[0]
+        last = datetime.strptime(last[:10], '%Y-%m-%d') if last else datetime.now()
+        month = (last.replace(day=1) - timedelta(days=1))
+        count = conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0]
+        middle = conn.execute("SELECT date, id FROM sales ORDER BY date DESC, id DESC LIMIT 1 OFFSET ?",
+                              (count // 2,)).fetchone()
+        busiest = conn.execute("SELECT day FROM daily_sales ORDER BY transaction_count DESC LIMIT 1").fetchone()
+        category = conn.execute('''
+            SELECT c.name FROM categories c JOIN products p ON p.category_id = c.id
+            GROUP BY c.id ORDER BY COUNT(*) DESC LIMIT 1
+        ''').fetchone()
+        products = conn.execute("SELECT id, name, price FROM products ORDER BY id LIMIT 3").fetchall()
+        customer = conn.execute('''
+            SELECT id, name FROM customers WHERE id IN (
+                SELECT customer_id FROM sales GROUP BY customer_id ORDER BY COUNT(*) DESC LIMIT 2
+            ) ORDER BY id DESC LIMIT 1
+        ''').fetchone()
+        recent = [row[0] for row in conn.execute("SELECT id FROM sales ORDER BY id DESC LIMIT 200")]
+
+    return {
+        'sales_middle': tuple(middle) if middle else None,
+        'busiest_day': busiest[0] if busiest else day_key(last),
+        'last_month': (month.year, month.month),
+        'last_quarter': (day_key(last - timedelta(days=89)), day_key(last)),
+        'stock_since': day_key(last - timedelta(days=29)),
+        'category': category[0] if category else 'Toutes',
+        'product_term': products[0]['name'][:4] if products else 'a',
+        'customer_term': customer['name'].split()[0][:5] if customer else 'a',
+        'customer_id': customer['id'] if customer else None,
+        'recent_sales': recent or [0],
+        'basket': [{'product_id': row['id'], 'quantity': 1.5, 'price': row['price']} for row in products],
+    }
+
+
+def measure(benchmark, db, context, repeat, warmup=1):
+    """
+    Exécute une mesure.
+
+    Returns:
+        dict: median_ms, min_ms, p95_ms, mean_ms, rows, runs
+    """
+    for _ in range(warmup):
+        benchmark.run(db, context)
+    times = []
+    rows = 0
+    for _ in range(benchmark.repeat or repeat):
+        start = time.perf_counter()
+        rows = benchmark.run(db, context)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        'median_ms': round(statistics.median(times), 3),
+        'min_ms': round(times[0], 3),
+        'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        'mean_ms': round(statistics.fmean(times), 3),
+        'rows': rows,
+        'runs': len(times),
+    }
+
+
+def compare(results, baseline, tolerance=0.25, floor_ms=0.5):
+    """
+    Compare des résultats à la référence, sur le temps minimal, moins sensible
+    que la médiane à la charge de la machine.
+
+    Une mesure régresse si son minimum dépasse celui de la référence de plus de
+    tolerance (fraction) et d'au moins floor_ms, pour ignorer le bruit des
+    mesures très courtes.
+
+    Returns:
+        list: (nom, référence ms, mesure ms, rapport, statut) ; statut parmi
+            'ok', 'regression', 'improvement', 'new'
+    """
+    rows = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        current = result['min_ms']
+        if reference is None:
+            rows.append((name, None, current, None, 'new'))
+            continue
+        previous = reference['min_ms']
+        ratio = current / previous if previous else float('inf')
+        if current - previous > max(previous * tolerance, floor_ms):
+            status = 'regression'
+        elif previous - current > max(previous * tolerance, floor_ms):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append((name, previous, current, ratio, status))
+    return rows
+
+
+def copy_database(source, directory):
+    """Copie cohérente de la base (journal WAL compris) sous le nom attendu par l'application"""
+    target = os.path.join(directory, "poissonnerie.db")
+    src = sqlite3.connect(f"file:{os.path.abspath(source)}?mode=ro", uri=True)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    return target
+
+
+def run(source, repeat=10, only=None):
+    """
+    Mesure toutes les requêtes sur une copie de la base.
+
+    La copie est ouverte par Database, comme dans l'application : pool de
+    lecture, file d'écriture et migrations. La base d'origine n'est pas modifiée.
+
+    Args:
+        source (str): Base à mesurer
+        repeat (int): Nombre d'exécutions par mesure
+        only (list): Motifs (fnmatch) des mesures à exécuter
+
+    Returns:
+        dict: meta (environnement, taille des tables) et results (par mesure)
+    """
+    from models.database import Database
+    from models.profiler import QueryProfiler
+
+    directory = tempfile.mkdtemp(prefix="fisher-bench-")
+    cwd = os.getcwd()
+    try:
+        copy_database(source, directory)
+        # Database opens poissonnerie.db in the working directory
+        os.chdir(directory)
+        # Slow-query logging (EXPLAIN, warnings) would distort the timings
+        QueryProfiler().slow_ms = float('inf')
+        db = Database()
+        try:
+            context = build_context(db)
+            with db.read() as conn:
+                tables = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                          for table in ('products', 'customers', 'sales', 'sale_items', 'inventory_movements')}
+
+            results = {}
+            for benchmark in benchmarks():
+                if only and not any(fnmatch.fnmatch(benchmark.name, pattern) for pattern in only):
+                    continue
+                results[benchmark.name] = measure(benchmark, db, context, repeat)
+                logger.info("%-24s %10.2f ms (min %.2f ms)", benchmark.name,
+                            results[benchmark.name]['median_ms'], results[benchmark.name]['min_ms'])
+        finally:
+            db.close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        'meta': {
+            'database': os.path.abspath(source),
+            'tables': tables,
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande :
+    python -m benchmarks.run --db bench.db [--out resultats.json] [--save-baseline]
+
+    Code de retour 1 si une mesure régresse par rapport à la référence, ou si la
+    référence est absente (sauf avec --save-baseline). La référence fournie,
+    benchmarks/baseline.json, est mesurée sur la base 'medium' du générateur.
+    """
+    parser = argparse.ArgumentParser(description="Mesure les requêtes de l'application et les compare à la référence")
+    parser.add_argument('--db', required=True, help="Base à mesurer (voir python -m benchmarks.generate)")
+    parser.add_argument('--out', help="Fichier JSON des résultats")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Fichier de référence")
+    parser.add_argument('--save-baseline', action='store_true', help="Enregistrer les résultats comme référence")
+    parser.add_argument('--repeat', type=int, default=10, help="Exécutions par mesure")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Écart toléré sur le temps minimal (0.25 = 25 %%)")
+    parser.add_argument('--only', nargs='+', help="Mesures à exécuter (motifs, ex. 'reports.*')")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} introuvable")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        logger.error("Pas de référence (%s) : lancer avec --save-baseline", args.baseline)
+        return 1
+    report = run(args.db, repeat=args.repeat, only=args.only)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info("Référence enregistrée dans %s", args.baseline)
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('tables') != report['meta']['tables']:
+        logger.warning("La référence a été mesurée sur une base différente : %s", baseline['meta'].get('tables'))
+
+    rows = compare(report['results'], baseline['results'], tolerance=args.tolerance)
+    print(f"{'Mesure':<24} {'Référence':>12} {'Actuel':>12} {'Rapport':>8}  Statut")
+    for name, previous, current, ratio, status in rows:
+        print(f"{name:<24} {'' if previous is None else f'{previous:.2f} ms':>12} {current:>9.2f} ms "
+              f"{'' if ratio is None else f'{ratio:.2f}':>8}  {status}")
+    regressions = [row[0] for row in rows if row[4] == 'regression']
+    if regressions:
+        logger.error("Régressions : %s", ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
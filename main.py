@@ -1,6 +1,13 @@
 import tkinter as tk
-from views.main_window import MainWindow
 import logging
+from utils import startup
+
+# Time every import made by the application (FISHER_DEBUG_STARTUP=1)
+if startup.enabled():
+    startup.install()
+
+from views.main_window import MainWindow
+startup.mark("imports")
 
 def main():
     # Configure logging
@@ -0,0 +1,192 @@
+import sqlite3
+import threading
+from collections import namedtuple
+
+# Fiche produit compacte conservée en mémoire
+Product = namedtuple('Product', ['id', 'name', 'price', 'stock', 'category_id', 'category'])
+
+# product_id enregistré quand toutes les fiches sont à relire (catégorie modifiée)
+ALL_PRODUCTS = 0
+
+_PRODUCT_COLUMNS = '''
+    SELECT p.id, p.name, p.price, p.stock, p.category_id, c.name
+    FROM products p
+    LEFT JOIN categories c ON p.category_id = c.id
+'''
+
+
+def create_change_log(conn):
+    """
+    Crée le journal des modifications de produits et ses déclencheurs.
+
+    Une ligne par produit porte le numéro de la dernière modification
+    (seq croissant) : le journal reste borné par le nombre de produits.
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture (la transaction est à la charge de l'appelant)
+    """
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS product_changes (
+        product_id INTEGER PRIMARY KEY,
+        seq INTEGER NOT NULL
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_product_changes_seq ON product_changes(seq)")
+
+    def log_change(product_id):
+        return f'''
+        INSERT INTO product_changes (product_id, seq)
+        VALUES ({product_id}, (SELECT COALESCE(MAX(seq), 0) + 1 FROM product_changes))
+        ON CONFLICT(product_id) DO UPDATE SET seq = excluded.seq;
+        '''
+
+    for event, product_id in (('INSERT', 'NEW.id'), ('UPDATE', 'NEW.id'), ('DELETE', 'OLD.id')):
+        conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_products_changes_{event.lower()}
+        AFTER {event} ON products
+        BEGIN
+            {log_change(product_id)}
+        END
+        ''')
+
+    # Un renommage de catégorie touche toutes les fiches qui la référencent
+    for event in ('UPDATE', 'DELETE'):
+        conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_categories_changes_{event.lower()}
+        AFTER {event} ON categories
+        BEGIN
+            {log_change(ALL_PRODUCTS)}
+        END
+        ''')
+
+
+class Catalog:
+    """
+    Catalogue des produits en mémoire, partagé par tout le processus.
+
+    Les fiches sont indexées par identifiant, par nom et par catégorie. refresh()
+    consulte PRAGMA data_version sur une connexion dédiée : tant qu'aucune autre
+    connexion (de ce processus ou d'une autre caisse) n'a rien validé, il ne lit
+    rien. Sinon seules les fiches inscrites au journal product_changes depuis le
+    dernier rafraîchissement sont relues. Les lectures (get, by_name...) sont de
+    simples accès aux dictionnaires, sans SQL. Implémente le pattern Singleton.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Catalog, cls).__new__(cls)
+            cls._instance.init_catalog()
+        return cls._instance
+
+    def init_catalog(self):
+        from models.database import Database
+
+        self.db = Database()
+        self._conn = None
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._seq = None
+        self._by_id = {}
+        self._by_name = {}
+        self._by_category = {}
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = self.db.open_reader()
+            self._data_version = None
+            self._seq = None
+        return self._conn
+
+    def refresh(self):
+        """
+        Met le catalogue à jour si la base a été modifiée. À appeler hors du thread Tk.
+
+        Returns:
+            bool: True si des fiches ont été relues
+        """
+        with self._lock:
+            try:
+                return self._refresh(self._connection())
+            except sqlite3.ProgrammingError:
+                # Connexion fermée avec le gestionnaire : on repart d'une nouvelle
+                self._conn = None
+                return self._refresh(self._connection())
+
+    def _refresh(self, conn):
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+
+        conn.execute("BEGIN")
+        try:
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM product_changes").fetchone()[0]
+            if seq == self._seq:
+                changed = None
+            elif self._seq is None:
+                changed = self._load_all(conn)
+            else:
+                ids = [row[0] for row in conn.execute(
+                    "SELECT product_id FROM product_changes WHERE seq > ?", (self._seq,))]
+                if ALL_PRODUCTS in ids:
+                    changed = self._load_all(conn)
+                else:
+                    changed = self._load_changed(conn, ids)
+        finally:
+            conn.execute("COMMIT")
+
+        self._data_version = data_version
+        self._seq = seq
+        if changed is None:
+            return False
+        self._index(changed)
+        return True
+
+    def _load_all(self, conn):
+        return {row[0]: Product(*row) for row in conn.execute(_PRODUCT_COLUMNS)}
+
+    def _load_changed(self, conn, ids):
+        by_id = dict(self._by_id)
+        for product_id in ids:
+            by_id.pop(product_id, None)
+        by_id.update((row[0], Product(*row)) for row in conn.execute(
+            _PRODUCT_COLUMNS + " WHERE p.id IN (SELECT product_id FROM product_changes WHERE seq > ?)",
+            (self._seq,)))
+        return by_id
+
+    def _index(self, by_id):
+        """Remplace les index en une fois : les lecteurs voient l'ancien ou le nouvel état"""
+        by_category = {}
+        for product in by_id.values():
+            by_category.setdefault(product.category, []).append(product.id)
+        self._by_name = {product.name: product for product in by_id.values()}
+        self._by_category = by_category
+        self._by_id = by_id
+
+    def get(self, product_id):
+        """Retourne la fiche d'un produit par identifiant, ou None"""
+        return self._by_id.get(product_id)
+
+    def by_name(self, name):
+        """Retourne la fiche d'un produit par nom, ou None"""
+        return self._by_name.get(name)
+
+    def in_category(self, category):
+        """Retourne les fiches d'une catégorie (nom)"""
+        by_id = self._by_id
+        return [by_id[product_id] for product_id in self._by_category.get(category, ())]
+
+    def products(self, in_stock=False):
+        """
+        Retourne les fiches triées par nom.
+
+        Args:
+            in_stock (bool): Ne retourner que les produits en stock
+
+        Returns:
+            list: Fiches Product
+        """
+        products = self._by_id.values()
+        if in_stock:
+            products = [product for product in products if product.stock > 0]
+        return sorted(products, key=lambda product: product.name)
@@ -0,0 +1,145 @@
+import sqlite3
+import queue
+import threading
+from contextlib import contextmanager
+from models.profiler import ProfiledConnection
+
+
+class ConnectionManager:
+    """
+    Gestionnaire des connexions SQLite de l'application.
+
+    Fournit une connexion d'écriture dédiée, protégée par un verrou, et un pool
+    borné de connexions de lecture. Chaque thread emprunte sa propre connexion
+    de lecture, ce qui permet (grâce au mode WAL) d'exécuter des rapports
+    pendant qu'une vente est validée.
+    """
+
+    def __init__(self, db_file, max_readers=4, timeout=30):
+        self.db_file = db_file
+        self.timeout = timeout
+        self.max_readers = max_readers
+        self.write_lock = threading.RLock()
+        self._readers = queue.LifoQueue(maxsize=max_readers)
+        self._all_readers = []
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+        self.commit_hooks = []
+        self._dedicated = []
+        self.writer = self._open()
+
+    def _open(self, readonly=False):
+        """Ouvre une connexion configurée avec les PRAGMA de l'application"""
+        # Every statement is timed by the query profiler
+        conn = sqlite3.connect(self.db_file, check_same_thread=False, timeout=self.timeout,
+                               factory=ProfiledConnection)
+        conn.execute("PRAGMA foreign_keys = ON")
+        if not readonly:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA page_size = 4096")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -8000")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA mmap_size = 30000000000")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _acquire_reader(self):
+        """Emprunte une connexion de lecture, en ouvre une si le pool n'est pas plein"""
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._pool_lock:
+            if len(self._all_readers) < self.max_readers:
+                conn = self._open(readonly=True)
+                self._all_readers.append(conn)
+                return conn
+
+        try:
+            return self._readers.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Aucune connexion de lecture disponible")
+
+    @contextmanager
+    def read(self):
+        """
+        Fournit la connexion de lecture du thread courant.
+
+        Les appels imbriqués dans un même thread réutilisent la même connexion ;
+        elle est rendue au pool à la sortie du bloc le plus externe.
+
+        Yields:
+            sqlite3.Connection: Connexion en lecture seule
+        """
+        conn = getattr(self._local, 'reader', None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._acquire_reader()
+        self._local.reader = conn
+        try:
+            yield conn
+        finally:
+            self._local.reader = None
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def write(self):
+        """
+        Fournit la connexion d'écriture sous verrou exclusif.
+
+        Valide la transaction à la sortie du bloc, l'annule en cas d'exception.
+
+        Yields:
+            sqlite3.Connection: Connexion d'écriture
+        """
+        try:
+            with self.write_lock:
+                try:
+                    yield self.writer
+                    self.writer.commit()
+                except Exception:
+                    self.writer.rollback()
+                    raise
+        finally:
+            self.committed()
+
+    def open_reader(self):
+        """
+        Ouvre une connexion de lecture dédiée, hors du pool.
+
+        Pour un composant qui doit garder la même connexion (PRAGMA data_version
+        n'a de sens que d'une lecture à l'autre sur une même connexion). Elle est
+        fermée avec le gestionnaire ; son utilisateur en assure la synchronisation.
+
+        Returns:
+            sqlite3.Connection: Connexion en lecture seule
+        """
+        conn = self._open(readonly=True)
+        with self._pool_lock:
+            self._dedicated.append(conn)
+        return conn
+
+    def committed(self):
+        """Appelle les fonctions abonnées après la fin d'une transaction d'écriture"""
+        for hook in self.commit_hooks:
+            hook()
+
+    def close(self):
+        """Ferme toutes les connexions gérées"""
+        with self._pool_lock:
+            for conn in self._all_readers + self._dedicated:
+                conn.close()
+            self._all_readers = []
+            self._dedicated = []
+            self._readers = queue.LifoQueue(maxsize=self.max_readers)
+        with self.write_lock:
+            self.writer.close()
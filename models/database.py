@@ -1,15 +1,27 @@
 import sqlite3
 import os
+import time
+import logging
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from models.connection import ConnectionManager
+from models.write_queue import WriteQueue
+from models.migrations import apply_migrations
+from utils.cache import QueryCache
+
+logger = logging.getLogger(__name__)
+
+# Délai entre deux vérifications d'intégrité complètes, en secondes
+INTEGRITY_INTERVAL = 7 * 24 * 3600
 
 class Database:
     """
     Gestionnaire de base de données SQLite pour l'application.
-    Implémente le pattern Singleton pour garantir une seule instance de connexion.
+    Implémente le pattern Singleton pour garantir une seule instance du gestionnaire
+    de connexions : une connexion d'écriture dédiée et un pool de connexions de lecture.
     """
     _instance = None
-    _connection = None
+    _manager = None
+    _write_queue = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -19,158 +31,96 @@ class Database:
         return cls._instance
 
     def init_db(self):
-        """Initialise la base de données et crée les tables si elles n'existent pas"""
+        """Initialise la base de données, crée les tables si elles n'existent pas et applique les migrations"""
         create_tables = not os.path.exists(self.db_file)
         self.connect()
         if create_tables:
             self.create_tables()
+        self.migrate()
+
+    def migrate(self):
+        """
+        Applique les migrations de schéma en attente.
+
+        Returns:
+            list: Versions appliquées
+        """
+        with self._manager.write_lock:
+            applied = apply_migrations(self.conn)
+            self.cache.load_triggers(self.conn)
+        self._manager.committed()
+        return applied
 
     def connect(self):
-        """Établit une connexion à la base de données SQLite"""
-        if self._connection is None:
-            self._connection = sqlite3.connect(self.db_file, check_same_thread=False, timeout=30)
-            self._connection.execute("PRAGMA foreign_keys = ON")
-            self._connection.execute("PRAGMA journal_mode = WAL")
-            self._connection.execute("PRAGMA synchronous = OFF")
-            self._connection.execute("PRAGMA cache_size = -8000")
-            self._connection.execute("PRAGMA temp_store = MEMORY")
-            self._connection.execute("PRAGMA mmap_size = 30000000000")
-            self._connection.execute("PRAGMA page_size = 4096")
-            self._connection.execute("PRAGMA busy_timeout = 5000")
-            self._connection.row_factory = sqlite3.Row
-            # Créer des index pour optimiser les recherches fréquentes
-            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_products_name ON products(name)")
-            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(date)")
-            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_customers_name ON customers(name)")
-        return self._connection
+        """Établit les connexions à la base de données SQLite"""
+        if self._manager is None:
+            self._manager = ConnectionManager(self.db_file)
+            # Writes through the writer connection invalidate the query cache,
+            # commits from other connections (other tills) clear it
+            self.cache = QueryCache()
+            self.cache.track_writes(self._manager.writer, self._manager.write_lock)
+            self._manager.commit_hooks.append(self.cache.flush_writes)
+        return self._manager.writer
 
     @property
     def conn(self):
-        """Retourne la connexion active à la base de données"""
+        """
+        Retourne la connexion d'écriture.
+
+        Réservée au thread Tk ; le code exécuté dans un autre thread doit passer
+        par read() ou write().
+        """
         return self.connect()
 
-    def create_tables(self):
-        """Crée toutes les tables nécessaires dans la base de données"""
-        cursor = self.conn.cursor()
+    def read(self):
+        """
+        Emprunte la connexion de lecture du thread courant.
 
-        # Table des utilisateurs
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL
-        )
-        ''')
-
-        # Insertion de l'utilisateur admin par défaut
-        cursor.execute('''
-        INSERT OR IGNORE INTO users (username, password_hash)
-        VALUES (?, ?)
-        ''', ('admin', generate_password_hash('admin123')))
+        Returns:
+            contextmanager: Bloc fournissant une connexion en lecture seule
+        """
+        self.connect()
+        return self._manager.read()
 
-        # Valider les changements
-        self.conn.commit()
+    def write(self):
+        """
+        Obtient la connexion d'écriture sous verrou, avec validation automatique.
 
-        # Table des produits
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            price REAL NOT NULL,
-            stock REAL NOT NULL,
-            category_id INTEGER,
-            FOREIGN KEY (category_id) REFERENCES categories (id)
-        )
-        ''')
-
-        # Table des catégories
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS categories (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL
-        )
-        ''')
+        Returns:
+            contextmanager: Bloc fournissant la connexion d'écriture
+        """
+        self.connect()
+        return self._manager.write()
 
-        # Table des clients
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS customers (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            phone TEXT,
-            address TEXT
-        )
-        ''')
-
-        # Table des fournisseurs
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS suppliers (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            phone TEXT,
-            address TEXT
-        )
-        ''')
-
-        # Table des ventes
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sales (
-            id INTEGER PRIMARY KEY,
-            date TEXT NOT NULL,
-            customer_id INTEGER,
-            total REAL NOT NULL,
-            status TEXT DEFAULT 'pending',
-            payment_method TEXT,
-            discount REAL DEFAULT 0.0,
-            tax REAL DEFAULT 0.0,
-            FOREIGN KEY (customer_id) REFERENCES customers (id)
-        )
-        ''')
-
-        # Table des détails des ventes
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sale_items (
-            id INTEGER PRIMARY KEY,
-            sale_id INTEGER,
-            product_id INTEGER,
-            quantity REAL NOT NULL,
-            price REAL NOT NULL,
-            FOREIGN KEY (sale_id) REFERENCES sales (id),
-            FOREIGN KEY (product_id) REFERENCES products (id)
-        )
-        ''')
-
-        # Table des mouvements d'inventaire
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS inventory_movements (
-            id INTEGER PRIMARY KEY,
-            product_id INTEGER,
-            quantity REAL NOT NULL,
-            movement_type TEXT NOT NULL,
-            date TEXT NOT NULL,
-            supplier_id INTEGER,
-            sale_id INTEGER,
-            FOREIGN KEY (product_id) REFERENCES products (id),
-            FOREIGN KEY (supplier_id) REFERENCES suppliers (id),
-            FOREIGN KEY (sale_id) REFERENCES sales (id)
-        )
-        ''')
-
-        # Table des factures
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS invoices (
-            id INTEGER PRIMARY KEY,
-            sale_id INTEGER UNIQUE NOT NULL,
-            invoice_number TEXT UNIQUE NOT NULL,
-            date_created TEXT NOT NULL,
-            due_date TEXT,
-            status TEXT NOT NULL DEFAULT 'pending',
-            payment_status TEXT NOT NULL DEFAULT 'unpaid',
-            notes TEXT,
-            FOREIGN KEY (sale_id) REFERENCES sales (id)
-        )
-        ''')
+    def open_reader(self):
+        """
+        Ouvre une connexion de lecture dédiée, hors du pool.
 
-        self.conn.commit()
+        Returns:
+            sqlite3.Connection: Connexion en lecture seule, fermée avec la base
+        """
+        self.connect()
+        return self._manager.open_reader()
+
+    def submit_write(self, fn, *args):
+        """
+        Soumet une transaction au thread écrivain (validation groupée).
+
+        Args:
+            fn (callable): Fonction appelée avec (cursor, *args) dans le thread écrivain
+            *args: Arguments transmis à fn
+
+        Returns:
+            concurrent.futures.Future: Résultat de fn une fois la transaction validée
+        """
+        self.connect()
+        if self._write_queue is None:
+            self._write_queue = WriteQueue(self._manager)
+        return self._write_queue.submit(fn, *args)
+
+    def create_tables(self):
+        """Crée toutes les tables nécessaires dans la base de données"""
+        create_schema(self.conn)
 
     def authenticate_user(self, username, password):
         """
@@ -183,27 +133,79 @@ class Database:
         Returns:
             dict: Informations de l'utilisateur si l'authentification réussit, None sinon
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
-        user = cursor.fetchone()
+        with self.read() as conn:
+            user = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+        # werkzeug est long à importer : il n'est chargé qu'à la première connexion
+        from werkzeug.security import check_password_hash
+
         if user and check_password_hash(user[2], password):
             return {'id': user[0], 'username': user[1]}
         return None
 
-    def execute(self, query, params=()):
+    def fetchall(self, query, params=()):
         """
-        Exécute une requête SQL avec des paramètres optionnels.
+        Exécute une requête de lecture sur la connexion de lecture du thread courant.
 
         Args:
             query (str): Requête SQL
             params (tuple): Paramètres de la requête
 
         Returns:
-            sqlite3.Cursor: Curseur pour accéder aux résultats
+            list: Lignes résultantes (sqlite3.Row)
+        """
+        with self.read() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def cached_fetchall(self, query, params=()):
+        """
+        Exécute une requête de lecture en passant par le cache des résultats.
+
+        Args:
+            query (str): Requête SQL
+            params (tuple): Paramètres de la requête
+
+        Returns:
+            list: Lignes résultantes (sqlite3.Row)
+        """
+        with self.read() as conn:
+            return self.cache.fetchall(conn, query, params)
+
+    def integrity_due(self, interval=INTEGRITY_INTERVAL):
+        """
+        Indique si la dernière vérification d'intégrité réussie date de plus de interval secondes.
+
+        Returns:
+            bool: True si check_integrity() doit être relancée
+        """
+        try:
+            return time.time() - os.path.getmtime(f"{self.db_file}-integrite") > interval
+        except OSError:
+            return True
+
+    def check_integrity(self):
+        """
+        Vérifie l'intégrité du fichier de base de données (PRAGMA quick_check).
+
+        Parcourt tout le fichier : à exécuter en arrière-plan, quand integrity_due()
+        le demande. Une vérification réussie est datée par le fichier <base>-integrite.
+
+        Raises:
+            sqlite3.DatabaseError: Si des anomalies sont détectées
         """
-        cursor = self.conn.cursor()
-        cursor.execute(query, params)
-        return cursor
+        with self.read() as conn:
+            problems = [row[0] for row in conn.execute("PRAGMA quick_check")]
+        if problems != ['ok']:
+            raise sqlite3.DatabaseError("Base de données endommagée : " + "; ".join(problems[:5]))
+        try:
+            with open(f"{self.db_file}-integrite", 'w', encoding='utf-8') as f:
+                f.write(datetime.now().isoformat(timespec='seconds') + "\n")
+        except OSError as e:
+            logger.warning("Date de la vérification d'intégrité non enregistrée : %s", e)
+
+    def optimize(self):
+        """Met à jour les statistiques de l'optimiseur si nécessaire (PRAGMA optimize)"""
+        with self._manager.write_lock:
+            self.conn.execute("PRAGMA optimize")
 
     def backup_db(self):
         """Effectue une sauvegarde de la base de données"""
@@ -218,7 +220,146 @@ class Database:
         
     def close(self):
         """Ferme la connexion à la base de données"""
-        if self._connection:
+        if self._write_queue:
+            self._write_queue.close()
+            self._write_queue = None
+        if self._manager:
             self.backup_db()
-            self._connection.close()
-            self._connection = None
\ No newline at end of file
+            self._manager.close()
+            self._manager = None
+
+
+def create_schema(conn):
+    """
+    Crée les tables de base de l'application et l'utilisateur admin.
+
+    Les index, tables de synthèse et index de recherche sont ajoutés ensuite
+    par les migrations.
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture
+    """
+    cursor = conn.cursor()
+
+    # Table des utilisateurs
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL
+    )
+    ''')
+
+    # Insertion de l'utilisateur admin par défaut (le hachage, coûteux,
+    # n'est calculé qu'à la création de la base)
+    if cursor.execute("SELECT 1 FROM users WHERE username = 'admin'").fetchone() is None:
+        from werkzeug.security import generate_password_hash
+        cursor.execute('''
+        INSERT OR IGNORE INTO users (username, password_hash)
+        VALUES (?, ?)
+        ''', ('admin', generate_password_hash('admin123')))
+
+    # Valider les changements
+    conn.commit()
+
+    # Table des produits
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        price REAL NOT NULL,
+        stock REAL NOT NULL,
+        category_id INTEGER,
+        FOREIGN KEY (category_id) REFERENCES categories (id)
+    )
+    ''')
+
+    # Table des catégories
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL
+    )
+    ''')
+
+    # Table des clients
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS customers (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        phone TEXT,
+        address TEXT
+    )
+    ''')
+
+    # Table des fournisseurs
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS suppliers (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        phone TEXT,
+        address TEXT
+    )
+    ''')
+
+    # Table des ventes
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sales (
+        id INTEGER PRIMARY KEY,
+        date TEXT NOT NULL,
+        customer_id INTEGER,
+        total REAL NOT NULL,
+        status TEXT DEFAULT 'pending',
+        payment_method TEXT,
+        discount REAL DEFAULT 0.0,
+        tax REAL DEFAULT 0.0,
+        barcode TEXT,
+        FOREIGN KEY (customer_id) REFERENCES customers (id)
+    )
+    ''')
+
+    # Table des détails des ventes
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sale_items (
+        id INTEGER PRIMARY KEY,
+        sale_id INTEGER,
+        product_id INTEGER,
+        quantity REAL NOT NULL,
+        price REAL NOT NULL,
+        FOREIGN KEY (sale_id) REFERENCES sales (id),
+        FOREIGN KEY (product_id) REFERENCES products (id)
+    )
+    ''')
+
+    # Table des mouvements d'inventaire
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS inventory_movements (
+        id INTEGER PRIMARY KEY,
+        product_id INTEGER,
+        quantity REAL NOT NULL,
+        movement_type TEXT NOT NULL,
+        date TEXT NOT NULL,
+        supplier_id INTEGER,
+        sale_id INTEGER,
+        FOREIGN KEY (product_id) REFERENCES products (id),
+        FOREIGN KEY (supplier_id) REFERENCES suppliers (id),
+        FOREIGN KEY (sale_id) REFERENCES sales (id)
+    )
+    ''')
+
+    # Table des factures
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS invoices (
+        id INTEGER PRIMARY KEY,
+        sale_id INTEGER UNIQUE NOT NULL,
+        invoice_number TEXT UNIQUE NOT NULL,
+        date_created TEXT NOT NULL,
+        due_date TEXT,
+        status TEXT NOT NULL DEFAULT 'pending',
+        payment_status TEXT NOT NULL DEFAULT 'unpaid',
+        notes TEXT,
+        FOREIGN KEY (sale_id) REFERENCES sales (id)
+    )
+    ''')
+
+    conn.commit()
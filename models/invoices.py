@@ -0,0 +1,81 @@
+import json
+
+# Lecture ensembliste des factures : une requête pour les en-têtes, une pour
+# les lignes, quel que soit le nombre de ventes demandées
+_SALES_SQL = '''
+    SELECT s.id, s.date, c.name AS customer_name, s.total
+    FROM sales s
+    LEFT JOIN customers c ON s.customer_id = c.id
+    WHERE s.id IN (SELECT value FROM json_each(?))
+    ORDER BY s.id
+'''
+
+_ITEMS_SQL = '''
+    SELECT si.sale_id, p.name AS product_name, si.quantity, si.price
+    FROM sale_items si
+    JOIN products p ON si.product_id = p.id
+    WHERE si.sale_id IN (SELECT value FROM json_each(?))
+    ORDER BY si.sale_id, si.id
+'''
+
+
+def fetch_invoices(conn, sale_ids):
+    """
+    Lit les données de facturation de plusieurs ventes.
+
+    Args:
+        conn (sqlite3.Connection): Connexion à utiliser
+        sale_ids (iterable): Identifiants des ventes
+
+    Returns:
+        list: Un dictionnaire par vente trouvée (id, date, customer_name, total,
+            items), dans l'ordre des identifiants
+    """
+    ids = json.dumps([int(sale_id) for sale_id in sale_ids])
+    invoices = {}
+    for row in conn.execute(_SALES_SQL, (ids,)):
+        invoices[row[0]] = {
+            'id': row[0],
+            'date': row[1],
+            'customer_name': row[2],
+            'total': row[3],
+            'items': []
+        }
+    for row in conn.execute(_ITEMS_SQL, (ids,)):
+        invoices[row[0]]['items'].append({
+            'product_name': row[1],
+            'quantity': row[2],
+            'price': row[3]
+        })
+    return list(invoices.values())
+
+
+def fetch_invoice(conn, sale_id):
+    """
+    Lit les données de facturation d'une vente.
+
+    Args:
+        conn (sqlite3.Connection): Connexion à utiliser
+        sale_id (int): Identifiant de la vente
+
+    Returns:
+        dict: Données de la facture, ou None si la vente n'existe pas
+    """
+    invoices = fetch_invoices(conn, [sale_id])
+    return invoices[0] if invoices else None
+
+
+def sale_ids_between(conn, start, end):
+    """
+    Retourne les identifiants des ventes d'une période.
+
+    Args:
+        conn (sqlite3.Connection): Connexion à utiliser
+        start (int): Premier jour inclus, clé AAAAMMJJ
+        end (int): Dernier jour inclus, clé AAAAMMJJ
+
+    Returns:
+        list: Identifiants des ventes, par ordre croissant
+    """
+    return [row[0] for row in conn.execute(
+        "SELECT id FROM sales WHERE day BETWEEN ? AND ? ORDER BY id", (start, end))]
@@ -0,0 +1,347 @@
+import time
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def _columns(conn, table):
+    """Retourne les noms des colonnes d'une table"""
+    return {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+
+
+def _add_column(conn, table, column, definition):
+    """Ajoute une colonne si elle n'existe pas encore"""
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def migration_001_sales_columns_and_indexes(conn):
+    """
+    Met les bases existantes au niveau du schéma courant et indexe les jointures fréquentes.
+
+    Les bases créées avant l'ajout des factures et des mouvements de stock n'ont
+    ni ces tables ni les colonnes de paiement de la table des ventes.
+    """
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS inventory_movements (
+        id INTEGER PRIMARY KEY,
+        product_id INTEGER,
+        quantity REAL NOT NULL,
+        movement_type TEXT NOT NULL,
+        date TEXT NOT NULL,
+        supplier_id INTEGER,
+        sale_id INTEGER,
+        FOREIGN KEY (product_id) REFERENCES products (id),
+        FOREIGN KEY (supplier_id) REFERENCES suppliers (id),
+        FOREIGN KEY (sale_id) REFERENCES sales (id)
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS invoices (
+        id INTEGER PRIMARY KEY,
+        sale_id INTEGER UNIQUE NOT NULL,
+        invoice_number TEXT UNIQUE NOT NULL,
+        date_created TEXT NOT NULL,
+        due_date TEXT,
+        status TEXT NOT NULL DEFAULT 'pending',
+        payment_status TEXT NOT NULL DEFAULT 'unpaid',
+        notes TEXT,
+        FOREIGN KEY (sale_id) REFERENCES sales (id)
+    )
+    ''')
+
+    _add_column(conn, 'sales', 'status', "TEXT DEFAULT 'pending'")
+    _add_column(conn, 'sales', 'payment_method', "TEXT")
+    _add_column(conn, 'sales', 'discount', "REAL DEFAULT 0.0")
+    _add_column(conn, 'sales', 'tax', "REAL DEFAULT 0.0")
+    _add_column(conn, 'sales', 'barcode', "TEXT")
+
+    # Index de recherche
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_products_name ON products(name)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_name ON customers(name)")
+
+    # Index couvrants des jointures ventes / lignes / produits
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sale_items_sale
+        ON sale_items(sale_id, product_id, quantity, price)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sale_items_product
+        ON sale_items(product_id, sale_id, quantity, price)
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales(customer_id, date)")
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_inventory_movements_product_date
+        ON inventory_movements(product_id, date)
+    ''')
+
+
+def migration_002_sales_day_key(conn):
+    """
+    Ajoute la clé de jour entière sales.day (AAAAMMJJ) et son index.
+
+    Colonne générée virtuelle : elle ne prend pas de place dans la table et reste
+    cohérente avec sales.date. Les rapports filtrent dessus par intervalle, ce
+    qui permet un parcours d'index au lieu d'appliquer DATE() à chaque ligne.
+    """
+    _add_column(conn, 'sales', 'day',
+                "INTEGER GENERATED ALWAYS AS (CAST(strftime('%Y%m%d', date) AS INTEGER)) VIRTUAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_day ON sales(day, total)")
+
+
+def migration_003_daily_rollups(conn):
+    """
+    Crée les tables de synthèse journalières et les déclencheurs qui les tiennent à jour.
+
+    daily_sales agrège les en-têtes de vente par jour, daily_product_sales les
+    lignes par jour et par produit. Les rapports lisent ces tables au lieu de
+    réagréger toutes les lignes de vente.
+    """
+    from models.rollups import rebuild_rollups
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS daily_sales (
+        day INTEGER PRIMARY KEY,
+        transaction_count INTEGER NOT NULL DEFAULT 0,
+        total REAL NOT NULL DEFAULT 0
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS daily_product_sales (
+        day INTEGER NOT NULL,
+        product_id INTEGER NOT NULL,
+        quantity REAL NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, product_id)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_product_sales_product ON daily_product_sales(product_id, day)")
+
+    # En-têtes de vente
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_insert
+    AFTER INSERT ON sales
+    WHEN NEW.day IS NOT NULL
+    BEGIN
+        INSERT INTO daily_sales (day, transaction_count, total)
+        VALUES (NEW.day, 1, NEW.total)
+        ON CONFLICT(day) DO UPDATE SET
+            transaction_count = transaction_count + 1,
+            total = total + excluded.total;
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_delete
+    AFTER DELETE ON sales
+    WHEN OLD.day IS NOT NULL
+    BEGIN
+        UPDATE daily_sales
+        SET transaction_count = transaction_count - 1,
+            total = total - OLD.total
+        WHERE day = OLD.day;
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_update
+    AFTER UPDATE OF date, total ON sales
+    BEGIN
+        UPDATE daily_sales
+        SET transaction_count = transaction_count - 1,
+            total = total - OLD.total
+        WHERE day = OLD.day;
+        INSERT INTO daily_sales (day, transaction_count, total)
+        SELECT NEW.day, 1, NEW.total WHERE NEW.day IS NOT NULL
+        ON CONFLICT(day) DO UPDATE SET
+            transaction_count = transaction_count + 1,
+            total = total + excluded.total;
+    END
+    ''')
+    # Changement de jour d'une vente : ses lignes changent de jour de synthèse
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_move_day
+    AFTER UPDATE OF date ON sales
+    WHEN OLD.day IS NOT NEW.day
+    BEGIN
+        INSERT INTO daily_product_sales (day, product_id, quantity, revenue)
+        SELECT OLD.day, product_id, -SUM(quantity), -SUM(quantity * price)
+        FROM sale_items
+        WHERE sale_id = NEW.id AND OLD.day IS NOT NULL AND product_id IS NOT NULL
+        GROUP BY product_id
+        ON CONFLICT(day, product_id) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            revenue = revenue + excluded.revenue;
+        INSERT INTO daily_product_sales (day, product_id, quantity, revenue)
+        SELECT NEW.day, product_id, SUM(quantity), SUM(quantity * price)
+        FROM sale_items
+        WHERE sale_id = NEW.id AND NEW.day IS NOT NULL AND product_id IS NOT NULL
+        GROUP BY product_id
+        ON CONFLICT(day, product_id) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            revenue = revenue + excluded.revenue;
+    END
+    ''')
+
+    # Lignes de vente
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_sale_items_rollup_insert
+    AFTER INSERT ON sale_items
+    BEGIN
+        INSERT INTO daily_product_sales (day, product_id, quantity, revenue)
+        SELECT day, NEW.product_id, NEW.quantity, NEW.quantity * NEW.price
+        FROM sales
+        WHERE id = NEW.sale_id AND day IS NOT NULL AND NEW.product_id IS NOT NULL
+        ON CONFLICT(day, product_id) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            revenue = revenue + excluded.revenue;
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_sale_items_rollup_delete
+    AFTER DELETE ON sale_items
+    BEGIN
+        UPDATE daily_product_sales
+        SET quantity = quantity - OLD.quantity,
+            revenue = revenue - OLD.quantity * OLD.price
+        WHERE product_id = OLD.product_id
+          AND day = (SELECT day FROM sales WHERE id = OLD.sale_id);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_sale_items_rollup_update
+    AFTER UPDATE OF sale_id, product_id, quantity, price ON sale_items
+    BEGIN
+        UPDATE daily_product_sales
+        SET quantity = quantity - OLD.quantity,
+            revenue = revenue - OLD.quantity * OLD.price
+        WHERE product_id = OLD.product_id
+          AND day = (SELECT day FROM sales WHERE id = OLD.sale_id);
+        INSERT INTO daily_product_sales (day, product_id, quantity, revenue)
+        SELECT day, NEW.product_id, NEW.quantity, NEW.quantity * NEW.price
+        FROM sales
+        WHERE id = NEW.sale_id AND day IS NOT NULL AND NEW.product_id IS NOT NULL
+        ON CONFLICT(day, product_id) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            revenue = revenue + excluded.revenue;
+    END
+    ''')
+
+    rebuild_rollups(conn)
+
+
+def migration_004_search_index(conn):
+    """Index plein texte FTS5 des produits, clients et fournisseurs"""
+    from models.search import create_search_index
+
+    create_search_index(conn)
+
+
+def migration_005_product_change_log(conn):
+    """Journal des modifications de produits pour le catalogue en mémoire"""
+    from models.catalog import create_change_log
+
+    create_change_log(conn)
+
+
+def migration_006_sale_delete_product_rollups(conn):
+    """
+    Retire les lignes d'une vente supprimée de daily_product_sales.
+
+    Le déclencheur des lignes retrouve le jour par la vente : une vente
+    supprimée avant ses lignes laissait leurs quantités dans la synthèse. Les
+    lignes sont désormais retirées avant la suppression de la vente (la
+    suppression ultérieure des lignes ne retrouve plus de jour et n'y touche
+    pas), puis les synthèses sont recalculées pour corriger les écarts passés.
+    """
+    from models.rollups import rebuild_rollups
+
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_delete_items
+    BEFORE DELETE ON sales
+    WHEN OLD.day IS NOT NULL
+    BEGIN
+        UPDATE daily_product_sales
+        SET quantity = quantity - (
+                SELECT SUM(si.quantity) FROM sale_items si
+                WHERE si.sale_id = OLD.id AND si.product_id = daily_product_sales.product_id),
+            revenue = revenue - (
+                SELECT SUM(si.quantity * si.price) FROM sale_items si
+                WHERE si.sale_id = OLD.id AND si.product_id = daily_product_sales.product_id)
+        WHERE day = OLD.day
+          AND product_id IN (SELECT product_id FROM sale_items WHERE sale_id = OLD.id);
+    END
+    ''')
+
+    rebuild_rollups(conn)
+
+
+# Migrations ordonnées : (version, description, fonction)
+MIGRATIONS = [
+    (1, "Colonnes de paiement des ventes et index des jointures", migration_001_sales_columns_and_indexes),
+    (2, "Clé de jour indexée des ventes", migration_002_sales_day_key),
+    (3, "Synthèses journalières des ventes", migration_003_daily_rollups),
+    (4, "Index de recherche plein texte", migration_004_search_index),
+    (5, "Journal des modifications de produits", migration_005_product_change_log),
+    (6, "Lignes des ventes supprimées retirées des synthèses", migration_006_sale_delete_product_rollups),
+]
+
+
+def current_version(conn):
+    """Retourne la version du schéma enregistrée dans la base"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TEXT NOT NULL,
+        duration_ms REAL NOT NULL
+    )
+    ''')
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """
+    Applique dans l'ordre les migrations non encore enregistrées.
+
+    Chaque migration s'exécute dans sa propre transaction IMMEDIATE ; la version
+    est relue à l'intérieur de celle-ci pour qu'une autre caisse démarrant au
+    même moment n'applique pas deux fois la même migration.
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture
+        migrations (list): Migrations (version, description, fonction)
+
+    Returns:
+        list: Versions appliquées lors de cet appel
+    """
+    applied = []
+    current_version(conn)
+    conn.commit()
+
+    for version, description, migrate in sorted(migrations, key=lambda m: m[0]):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version <= current_version(conn):
+                conn.rollback()
+                continue
+
+            start = time.perf_counter()
+            migrate(conn)
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            conn.execute('''
+                INSERT INTO schema_version (version, description, applied_at, duration_ms)
+                VALUES (?, ?, ?, ?)
+            ''', (version, description, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), duration_ms))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception("Échec de la migration %d (%s)", version, description)
+            raise
+
+        logger.info("Migration %d appliquée en %.1f ms : %s", version, duration_ms, description)
+        applied.append(version)
+
+    return applied
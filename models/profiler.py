@@ -0,0 +1,335 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from utils.cache import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+# Bornes supérieures des classes de durée, en millisecondes
+HISTOGRAM_BOUNDS = (1, 5, 20, 100, 500, 2000)
+
+# Lignes lues par lot lors de l'itération d'un curseur
+ITER_BATCH = 256
+
+_THIS_FILE = os.path.normcase(os.path.abspath(__file__))
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def _caller():
+    """Retourne l'emplacement du code applicatif à l'origine d'une requête (vue de préférence)"""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = os.path.normcase(os.path.abspath(frame.f_code.co_filename))
+        if filename != _THIS_FILE:
+            location = f"{os.path.relpath(filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+            if f"{os.sep}views{os.sep}" in filename:
+                return location
+            if fallback is None:
+                fallback = location
+        frame = frame.f_back
+    return fallback
+
+
+class QueryProfiler:
+    """
+    Statistiques d'exécution des requêtes SQL de l'application.
+
+    Toutes les connexions ouvertes par le gestionnaire de connexions
+    enregistrent ici chaque requête : durée (exécution et lecture des lignes
+    comprises) et nombre de lignes, regroupées par requête normalisée avec un
+    histogramme des durées. Les requêtes dépassant slow_ms sont conservées
+    dans un journal avec leur origine dans le code ; leur plan d'exécution
+    (EXPLAIN QUERY PLAN) n'est calculé qu'à la demande, sur une connexion
+    dédiée (voir explain()). Implémente le pattern Singleton.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(QueryProfiler, cls).__new__(cls)
+            cls._instance.init_profiler()
+        return cls._instance
+
+    def init_profiler(self, slow_ms=100, max_slow=200):
+        self.enabled = True
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._slow = deque(maxlen=max_slow)
+        self._started = datetime.now()
+        self._next_id = 0
+        self._plan_conn = None
+        self._plan_lock = threading.Lock()
+
+    def record(self, sql, params, seconds, rows):
+        """
+        Enregistre une exécution de requête.
+
+        Args:
+            sql (str): Requête
+            params: Paramètres de la requête
+            seconds (float): Durée totale (exécution et lecture des lignes)
+            rows (int): Nombre de lignes lues ou modifiées
+        """
+        key = normalize_sql(sql)
+        ms = seconds * 1000
+        rows = max(rows, 0)
+        bucket = next((index for index, bound in enumerate(HISTOGRAM_BOUNDS) if ms < bound),
+                      len(HISTOGRAM_BOUNDS))
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {'sql': key, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                            'rows': 0, 'histogram': [0] * (len(HISTOGRAM_BOUNDS) + 1)}
+            stats['count'] += 1
+            stats['total_ms'] += ms
+            stats['max_ms'] = max(stats['max_ms'], ms)
+            stats['rows'] += rows
+            stats['histogram'][bucket] += 1
+
+        if ms >= self.slow_ms:
+            # Only the statement is kept here: the plan is computed on demand (explain())
+            entry = {
+                'time': datetime.now().isoformat(timespec='seconds'),
+                'ms': round(ms, 1),
+                'rows': rows,
+                'sql': key,
+                'params': repr(params)[:200],
+                'source': _caller(),
+                'thread': threading.current_thread().name,
+                'plan': None
+            }
+            with self._lock:
+                entry['id'] = self._next_id
+                self._next_id += 1
+                self._slow.append((entry, sql, params))
+            logger.warning("Requête lente (%.0f ms, %d lignes) depuis %s : %s",
+                           ms, rows, entry['source'], key[:200])
+
+    def explain(self, entry_id, open_connection):
+        """
+        Calcule le plan d'exécution d'une requête du journal des requêtes lentes.
+
+        Le plan est obtenu sur une connexion dédiée, jamais sur celle qui a
+        exécuté la requête, puis conservé dans l'entrée du journal.
+
+        Args:
+            entry_id (int): Identifiant de l'entrée (clé 'id')
+            open_connection (callable): Ouvre la connexion de lecture dédiée
+                (par exemple Database().open_reader), au premier appel seulement
+
+        Returns:
+            list: Étapes du plan ; None si l'entrée n'est plus dans le journal
+        """
+        with self._lock:
+            found = next((item for item in self._slow if item[0]['id'] == entry_id), None)
+        if found is None:
+            return None
+        entry, sql, params = found
+        if entry['plan'] is not None:
+            return entry['plan']
+
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            plan = []
+        else:
+            with self._plan_lock:
+                if self._plan_conn is None:
+                    self._plan_conn = open_connection()
+                try:
+                    # Base class method: the plan query itself is not profiled
+                    cursor = sqlite3.Connection.execute(self._plan_conn, "EXPLAIN QUERY PLAN " + sql,
+                                                        params or ())
+                    plan = [row[3] for row in cursor.fetchall()]
+                except (sqlite3.Error, ValueError, TypeError) as e:
+                    plan = [f"(plan indisponible : {e})"]
+        entry['plan'] = plan
+        return plan
+
+    def stats(self):
+        """
+        Retourne les statistiques par requête, les plus coûteuses en premier.
+
+        Returns:
+            list: Dictionnaires sql, count, total_ms, avg_ms, max_ms, rows, histogram
+        """
+        with self._lock:
+            queries = [dict(stats, histogram=list(stats['histogram'])) for stats in self._stats.values()]
+        for stats in queries:
+            stats['avg_ms'] = stats['total_ms'] / stats['count']
+        return sorted(queries, key=lambda stats: stats['total_ms'], reverse=True)
+
+    def slow_queries(self):
+        """Retourne le journal des requêtes lentes, la plus récente en premier"""
+        with self._lock:
+            return [entry for entry, sql, params in reversed(self._slow)]
+
+    def reset(self):
+        """Remet les statistiques et le journal à zéro"""
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self._started = datetime.now()
+
+    def report(self):
+        """
+        Retourne les statistiques et le journal, prêts à être écrits en JSON.
+
+        Returns:
+            dict: Seuil, statistiques par requête et journal des requêtes lentes
+        """
+        return {
+            'since': self._started.isoformat(timespec='seconds'),
+            'slow_ms': self.slow_ms,
+            'histogram_bounds_ms': list(HISTOGRAM_BOUNDS),
+            'queries': self.stats(),
+            'slow_queries': self.slow_queries()
+        }
+
+    def dump(self, filename):
+        """
+        Écrit les statistiques et le journal des requêtes lentes dans un fichier JSON.
+
+        Args:
+            filename (str): Fichier à écrire
+        """
+        data = dict(self.report(), dumped=datetime.now().isoformat(timespec='seconds'))
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """
+    Curseur mesurant ses requêtes : le temps d'exécution et de lecture des
+    lignes est cumulé jusqu'à ce que le résultat soit épuisé, que le curseur
+    soit réutilisé, fermé ou libéré.
+    """
+    _sql = None
+
+    def _start(self, sql, params):
+        self._finish()
+        self._sql = sql
+        self._params = params
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def _finish(self):
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        profiler = QueryProfiler()
+        if profiler.enabled:
+            profiler.record(sql, self._params, self._elapsed, self._rows)
+
+    def execute(self, sql, parameters=()):
+        self._start(sql, parameters)
+        start = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except Exception:
+            self._sql = None
+            raise
+        self._elapsed += time.perf_counter() - start
+        if self.description is None:
+            self._rows = self.rowcount
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._start(sql, None)
+        start = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        except Exception:
+            self._sql = None
+            raise
+        self._elapsed += time.perf_counter() - start
+        self._rows = self.rowcount
+        self._finish()
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        if self._sql is not None:
+            self._elapsed += time.perf_counter() - start
+            if row is None:
+                self._finish()
+            else:
+                self._rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if self._sql is not None:
+            self._elapsed += time.perf_counter() - start
+            self._rows += len(rows)
+            if not rows:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        if self._sql is not None:
+            self._elapsed += time.perf_counter() - start
+            self._rows += len(rows)
+            self._finish()
+        return rows
+
+    def __iter__(self):
+        # Rows are read in batches so that timing costs little per row
+        fetchmany = super().fetchmany
+        while True:
+            start = time.perf_counter()
+            rows = fetchmany(ITER_BATCH)
+            if self._sql is not None:
+                self._elapsed += time.perf_counter() - start
+                self._rows += len(rows)
+                if not rows:
+                    self._finish()
+            if not rows:
+                return
+            yield from rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            if self._sql is not None:
+                self._elapsed += time.perf_counter() - start
+                self._finish()
+            raise
+        if self._sql is not None:
+            self._elapsed += time.perf_counter() - start
+            self._rows += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connexion dont toutes les requêtes passent par un ProfiledCursor"""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
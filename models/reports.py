@@ -0,0 +1,246 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable, List, Tuple
+from utils.dates import month_range, format_day_key
+
+# Types de colonnes : déterminent la mise en forme, identique dans l'aperçu et le PDF
+TEXT = 'text'
+DAY = 'day'
+COUNT = 'count'
+KG = 'kg'
+EUR = 'eur'
+
+
+@dataclass(frozen=True)
+class Column:
+    label: str
+    kind: str = TEXT
+
+    def format(self, value):
+        if value is None:
+            return ''
+        if self.kind == DAY:
+            return format_day_key(value)
+        if self.kind == KG:
+            return f"{round(value, 3)} kg"
+        if self.kind == EUR:
+            return f"{round(value, 2)} €"
+        return str(value)
+
+
+@dataclass
+class Report:
+    title: str
+    columns: Tuple[Column, ...]
+    lines: Iterable[tuple]
+    line_count: int = 0
+    summary: List[Tuple[Column, Any]] = field(default_factory=list)
+    generated_at: datetime = field(default_factory=datetime.now)
+
+    def rows(self):
+        """Lignes mises en forme, lues au fil de l'eau"""
+        for line in self.lines:
+            yield [column.format(value) for column, value in zip(self.columns, line)]
+
+    def summary_rows(self):
+        """Lignes du résumé : (libellé, valeur mise en forme)"""
+        return [[column.label, column.format(value)] for column, value in self.summary]
+
+
+@contextmanager
+def snapshot(conn):
+    """
+    Ouvre une transaction de lecture : toutes les requêtes du bloc, y compris
+    la lecture des lignes d'un rapport, voient le même état de la base, même
+    si une caisse valide une vente entre deux requêtes.
+
+    Args:
+        conn (sqlite3.Connection): Connexion de lecture
+
+    Yields:
+        sqlite3.Connection: La même connexion
+    """
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    finally:
+        conn.execute("COMMIT")
+
+
+def _lines(cursor):
+    """
+    Lignes d'un curseur, lues au fil de l'eau.
+
+    Les totaux des rapports sont calculés par une requête d'agrégat distincte,
+    dans le même instantané : un agrégat OVER () sur la requête des lignes
+    obligerait SQLite à construire tout le résultat avant la première ligne.
+    """
+    for row in cursor:
+        yield tuple(row)
+
+
+def _sales_totals(conn, start, end):
+    return conn.execute('''
+        SELECT COALESCE(SUM(transaction_count), 0), COALESCE(SUM(total), 0)
+        FROM daily_sales
+        WHERE day BETWEEN ? AND ?
+    ''', (start, end)).fetchone()
+
+
+def daily_report(conn, day):
+    """
+    Rapport journalier : ventes par produit et résumé financier.
+
+    À appeler dans un bloc snapshot() ; les lignes se lisent dans ce bloc.
+
+    Args:
+        conn (sqlite3.Connection): Connexion de lecture
+        day (int): Jour, clé AAAAMMJJ
+
+    Returns:
+        Report: Rapport
+    """
+    transaction_count, total_sales = _sales_totals(conn, day, day)
+    line_count, quantity = conn.execute('''
+        SELECT COUNT(*), COALESCE(SUM(r.quantity), 0)
+        FROM daily_product_sales r
+        JOIN products p ON r.product_id = p.id
+        WHERE r.day = ? AND r.quantity <> 0
+    ''', (day,)).fetchone()
+    lines = _lines(conn.execute('''
+        SELECT p.name, r.quantity, r.revenue
+        FROM daily_product_sales r
+        JOIN products p ON r.product_id = p.id
+        WHERE r.day = ? AND r.quantity <> 0
+        ORDER BY r.revenue DESC
+    ''', (day,)))
+
+    return Report(
+        title=f"Rapport journalier du {format_day_key(day)}",
+        columns=(Column('Produit'), Column('Quantité', KG), Column('CA', EUR)),
+        lines=lines,
+        line_count=line_count,
+        summary=[
+            (Column('Total des ventes', EUR), total_sales),
+            (Column('Nombre de transactions', COUNT), transaction_count),
+            (Column('Panier moyen', EUR), total_sales / transaction_count if transaction_count else 0),
+            (Column('Quantité vendue', KG), quantity),
+        ])
+
+
+def monthly_report(conn, year, month):
+    """
+    Rapport mensuel : une ligne par jour de vente, totaux du mois.
+
+    Args:
+        conn (sqlite3.Connection): Connexion de lecture, dans un bloc snapshot()
+        year (int): Année
+        month (int): Mois (1-12)
+
+    Returns:
+        Report: Rapport
+    """
+    first_day, last_day = month_range(year, month)
+    line_count, transaction_count, total_sales = conn.execute('''
+        SELECT COUNT(*), COALESCE(SUM(transaction_count), 0), COALESCE(SUM(total), 0)
+        FROM daily_sales
+        WHERE day BETWEEN ? AND ? AND transaction_count > 0
+    ''', (first_day, last_day)).fetchone()
+    lines = _lines(conn.execute('''
+        SELECT day, transaction_count, total
+        FROM daily_sales
+        WHERE day BETWEEN ? AND ? AND transaction_count > 0
+        ORDER BY day
+    ''', (first_day, last_day)))
+
+    return Report(
+        title=f"Rapport mensuel {month:02d}/{year}",
+        columns=(Column('Date', DAY), Column('Transactions', COUNT), Column('Total', EUR)),
+        lines=lines,
+        line_count=line_count,
+        summary=[
+            (Column('Total des ventes', EUR), total_sales),
+            (Column('Nombre de transactions', COUNT), transaction_count),
+        ])
+
+
+def period_report(conn, start, end):
+    """
+    Rapport d'une période : ventes par jour et par produit.
+
+    Args:
+        conn (sqlite3.Connection): Connexion de lecture, dans un bloc snapshot()
+        start (int): Premier jour inclus, clé AAAAMMJJ
+        end (int): Dernier jour inclus, clé AAAAMMJJ
+
+    Returns:
+        Report: Rapport
+    """
+    transaction_count, total_sales = _sales_totals(conn, start, end)
+    line_count, quantity = conn.execute('''
+        SELECT COUNT(*), COALESCE(SUM(r.quantity), 0)
+        FROM daily_product_sales r
+        JOIN products p ON r.product_id = p.id
+        WHERE r.day BETWEEN ? AND ? AND r.quantity <> 0
+    ''', (start, end)).fetchone()
+    lines = _lines(conn.execute('''
+        SELECT r.day, p.name, r.quantity, r.revenue
+        FROM daily_product_sales r
+        JOIN products p ON r.product_id = p.id
+        WHERE r.day BETWEEN ? AND ? AND r.quantity <> 0
+        ORDER BY r.day, r.revenue DESC
+    ''', (start, end)))
+
+    return Report(
+        title=f"Rapport du {format_day_key(start)} au {format_day_key(end)}",
+        columns=(Column('Date', DAY), Column('Produit'), Column('Quantité', KG), Column('CA', EUR)),
+        lines=lines,
+        line_count=line_count,
+        summary=[
+            (Column('Total des ventes', EUR), total_sales),
+            (Column('Nombre de transactions', COUNT), transaction_count),
+            (Column('Quantité vendue', KG), quantity),
+        ])
+
+
+def stock_report(conn, since, days=30):
+    """
+    Rapport de stock : stock, prix et ventes récentes de chaque produit.
+
+    Args:
+        conn (sqlite3.Connection): Connexion de lecture, dans un bloc snapshot()
+        since (int): Premier jour pris en compte pour les ventes, clé AAAAMMJJ
+        days (int): Durée correspondante, pour le libellé de la colonne
+
+    Returns:
+        Report: Rapport
+    """
+    line_count, stock, value = conn.execute('''
+        SELECT COUNT(*), COALESCE(SUM(stock), 0), COALESCE(SUM(stock * price), 0)
+        FROM products
+    ''').fetchone()
+    lines = _lines(conn.execute('''
+        SELECT p.name, p.stock, c.name, p.price, COALESCE(r.sold, 0)
+        FROM products p
+        LEFT JOIN categories c ON p.category_id = c.id
+        LEFT JOIN (
+            SELECT product_id, SUM(quantity) as sold
+            FROM daily_product_sales
+            WHERE day >= ?
+            GROUP BY product_id
+        ) r ON r.product_id = p.id
+        ORDER BY c.name, p.name
+    ''', (since,)))
+
+    return Report(
+        title="Rapport de stock",
+        columns=(Column('Produit'), Column('Stock', KG), Column('Catégorie'), Column('Prix', EUR),
+                 Column(f'Vendu ({days} j)', KG)),
+        lines=lines,
+        line_count=line_count,
+        summary=[
+            (Column('Produits', COUNT), line_count),
+            (Column('Stock total', KG), stock),
+            (Column('Valeur du stock', EUR), value),
+        ])
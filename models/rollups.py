@@ -0,0 +1,60 @@
+import argparse
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_rollups(conn):
+    """
+    Recalcule les tables de synthèse à partir des ventes et de leurs lignes.
+
+    À utiliser après un import massif ou si les synthèses ont été modifiées à la
+    main ; en fonctionnement normal elles sont tenues à jour par les déclencheurs.
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture (la transaction est à la charge de l'appelant)
+    """
+    conn.execute("DELETE FROM daily_sales")
+    conn.execute("DELETE FROM daily_product_sales")
+    conn.execute('''
+        INSERT INTO daily_sales (day, transaction_count, total)
+        SELECT day, COUNT(*), SUM(total)
+        FROM sales
+        WHERE day IS NOT NULL
+        GROUP BY day
+    ''')
+    conn.execute('''
+        INSERT INTO daily_product_sales (day, product_id, quantity, revenue)
+        SELECT s.day, si.product_id, SUM(si.quantity), SUM(si.quantity * si.price)
+        FROM sale_items si
+        JOIN sales s ON si.sale_id = s.id
+        WHERE s.day IS NOT NULL AND si.product_id IS NOT NULL
+        GROUP BY s.day, si.product_id
+    ''')
+
+
+def main():
+    """Point d'entrée en ligne de commande : python -m models.rollups [--db fichier]"""
+    parser = argparse.ArgumentParser(description="Reconstruit les tables de synthèse des ventes")
+    parser.add_argument('--db', default="poissonnerie.db", help="Fichier de base de données")
+    args = parser.parse_args()
+
+    from models.migrations import apply_migrations
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    conn = sqlite3.connect(args.db, timeout=30)
+    try:
+        apply_migrations(conn)
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        rebuild_rollups(conn)
+        conn.commit()
+        logger.info("Synthèses reconstruites en %.1f ms", (time.perf_counter() - start) * 1000)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import re
+import unicodedata
+
+# Index plein texte : table FTS5 -> (table source, colonnes indexées)
+FTS_TABLES = {
+    'products_fts': ('products', ('name',)),
+    'customers_fts': ('customers', ('name', 'phone')),
+    'suppliers_fts': ('suppliers', ('name', 'phone')),
+}
+
+
+def remove_diacritics(text):
+    """
+    Supprime les accents et met le texte en minuscules ('Épaulé' -> 'epaule').
+
+    Args:
+        text (str): Texte à normaliser
+
+    Returns:
+        str: Texte sans diacritiques
+    """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def match_expression(term):
+    """
+    Construit une requête FTS5 de préfixes à partir de la saisie de l'utilisateur.
+
+    Chaque mot devient un préfixe entre guillemets ("sau"* "fum"*), ce qui
+    neutralise la syntaxe FTS5 éventuellement tapée dans le champ de recherche.
+
+    Args:
+        term (str): Saisie de recherche
+
+    Returns:
+        str: Expression pour MATCH, ou None si la saisie ne contient aucun mot
+    """
+    tokens = re.findall(r'\w+', remove_diacritics(term))
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def create_search_index(conn):
+    """
+    Crée les tables FTS5 à contenu externe et les déclencheurs de synchronisation.
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture (la transaction est à la charge de l'appelant)
+    """
+    for fts, (table, columns) in FTS_TABLES.items():
+        cols = ', '.join(columns)
+        new_values = ', '.join(f'NEW.{c}' for c in columns)
+        old_values = ', '.join(f'OLD.{c}' for c in columns)
+
+        conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {cols},
+            content='{table}',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        ''')
+        conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new_values});
+        END
+        ''')
+        conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old_values});
+        END
+        ''')
+        conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new_values});
+        END
+        ''')
+
+    rebuild_search_index(conn)
+
+
+def rebuild_search_index(conn):
+    """Reconstruit tous les index plein texte à partir des tables sources"""
+    for fts in FTS_TABLES:
+        conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
@@ -0,0 +1,106 @@
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueue:
+    """
+    File d'écriture servie par un thread unique.
+
+    Les transactions soumises sont regroupées : le thread écrivain prend toutes
+    celles en attente (dans la limite de max_batch), les exécute chacune dans son
+    propre SAVEPOINT puis valide l'ensemble par un seul COMMIT. L'échec d'une
+    transaction n'annule que celle-ci ; chaque appelant reçoit un Future résolu
+    avec le résultat de sa fonction ou l'exception levée.
+    """
+
+    def __init__(self, manager, max_batch=32, max_wait=0.005):
+        self.manager = manager
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args):
+        """
+        Ajoute une transaction à la file.
+
+        Args:
+            fn (callable): Fonction appelée avec (cursor, *args) dans le thread écrivain
+            *args: Arguments transmis à fn
+
+        Returns:
+            concurrent.futures.Future: Résultat de fn une fois la transaction validée
+        """
+        future = Future()
+        self._queue.put((fn, args, future))
+        return future
+
+    def _run(self):
+        running = True
+        while running:
+            task = self._queue.get()
+            if task is None:
+                break
+            batch = [task]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    task = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if task is None:
+                    running = False
+                    break
+                batch.append(task)
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch):
+        """Exécute un lot de transactions et les valide par un seul COMMIT"""
+        results = []
+        with self.manager.write_lock:
+            conn = self.manager.writer
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                for fn, args, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    cursor.execute("SAVEPOINT write_task")
+                    try:
+                        result = fn(cursor, *args)
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO write_task")
+                        cursor.execute("RELEASE write_task")
+                        results.append((future, None, e))
+                    else:
+                        cursor.execute("RELEASE write_task")
+                        results.append((future, result, None))
+                conn.commit()
+            except Exception as e:
+                logger.exception("Échec du commit groupé (%d transactions)", len(batch))
+                if conn.in_transaction:
+                    conn.rollback()
+                # BEGIN itself may fail (SQLITE_BUSY): pending futures fail too
+                for fn, args, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            finally:
+                self.manager.committed()
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def close(self):
+        """Traite les transactions en attente puis arrête le thread écrivain"""
+        self._queue.put(None)
+        self._thread.join()
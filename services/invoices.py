@@ -0,0 +1,105 @@
+import threading
+from models.database import Database
+from models.invoices import fetch_invoice, sale_ids_between
+from utils.invoice_cache import InvoiceCache
+
+# Statuts d'une facture (colonne sales.status)
+STATUSES = ('complete', 'pending')
+
+
+def invoice_filename(sale_id):
+    """Retourne le nom du PDF d'une facture exportée seule"""
+    return f"facture_{sale_id}.pdf"
+
+
+class InvoiceService:
+    """
+    Lecture, statut et export PDF des factures, indépendants de l'interface.
+
+    Les méthodes de lecture prennent la connexion en premier argument, comme
+    les fonctions soumises à QueryExecutor ; export() et generate() peuvent
+    donc s'exécuter en arrière-plan.
+    """
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else Database()
+        self._pdf_gen = None
+        self._pdf_lock = threading.Lock()
+
+    def render(self, sale_data, filename):
+        """Génère le PDF d'une facture (reportlab n'est importé qu'au premier rendu)"""
+        with self._pdf_lock:
+            if self._pdf_gen is None:
+                from utils.pdf_generator import PDFGenerator
+                self._pdf_gen = PDFGenerator()
+            self._pdf_gen.generate_invoice(sale_data, filename)
+
+    @staticmethod
+    def fetch(conn, sale_id):
+        """
+        Lit une facture et ses lignes.
+
+        Args:
+            conn (sqlite3.Connection): Connexion de lecture
+            sale_id (int): Identifiant de la vente
+
+        Returns:
+            dict: id, date, customer_name, total, items
+
+        Raises:
+            ValueError: Vente introuvable
+        """
+        invoice = fetch_invoice(conn, sale_id)
+        if invoice is None:
+            raise ValueError("Vente non trouvée")
+        return invoice
+
+    def set_status(self, sale_id, status):
+        """
+        Change le statut d'une facture.
+
+        Args:
+            sale_id (int): Identifiant de la vente
+            status (str): 'complete' ou 'pending'
+        """
+        if status not in STATUSES:
+            raise ValueError(f"Statut inconnu : {status}")
+        with self.db.write() as conn:
+            conn.execute('UPDATE sales SET status = ? WHERE id = ?', (status, sale_id))
+
+    def export(self, conn, sale_id, filename=None):
+        """
+        Écrit le PDF d'une facture ; une facture inchangée est copiée du cache.
+
+        Args:
+            conn (sqlite3.Connection): Connexion de lecture
+            sale_id (int): Identifiant de la vente
+            filename (str): Fichier de destination (par défaut facture_<id>.pdf)
+
+        Returns:
+            str: Fichier écrit
+        """
+        invoice = self.fetch(conn, sale_id)
+        filename = filename or invoice_filename(invoice['id'])
+        InvoiceCache().export(invoice, filename, self.render)
+        return filename
+
+    def generate(self, start, end, folder, progress=None, cancelled=None):
+        """
+        Génère les factures d'une période dans un dossier (processus de rendu parallèles).
+
+        Args:
+            start (int): Premier jour inclus, clé AAAAMMJJ
+            end (int): Dernier jour inclus, clé AAAAMMJJ
+            folder (str): Dossier de destination
+            progress (callable): progress(traitées, total)
+            cancelled (callable): Retourne True pour interrompre le lot
+
+        Returns:
+            dict: generated, cached, failed, cancelled (voir utils.invoice_batch)
+        """
+        from utils.invoice_batch import generate_invoices
+
+        with self.db.read() as conn:
+            sale_ids = sale_ids_between(conn, start, end)
+        return generate_invoices(self.db.read, sale_ids, folder, progress=progress, cancelled=cancelled)
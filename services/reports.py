@@ -0,0 +1,121 @@
+import threading
+from datetime import datetime, timedelta
+from models.reports import snapshot, daily_report, monthly_report, period_report, stock_report
+from utils.dates import day_key, format_day_key
+
+# Lignes gardées pour l'aperçu ; le PDF reçoit toujours toutes les lignes
+PREVIEW_ROWS = 1000
+
+# Période des ventes du rapport de stock, en jours
+STOCK_DAYS = 30
+
+
+def preview_rows(rows, preview, limit=PREVIEW_ROWS):
+    """Transmet les lignes au PDF au fil de l'eau en gardant les premières pour l'aperçu"""
+    for row in rows:
+        if len(preview) < limit:
+            preview.append(row)
+        yield row
+
+
+class ReportService:
+    """
+    Construction et export PDF des rapports, indépendants de l'interface.
+
+    Chaque rapport est décrit par son type et ses paramètres (voir REPORTS) ;
+    les méthodes prennent la connexion en premier argument, comme les
+    fonctions soumises à QueryExecutor.
+    """
+
+    # Type -> fonction de construction (models.reports)
+    REPORTS = {
+        'daily': daily_report,
+        'monthly': monthly_report,
+        'period': period_report,
+        'stock': stock_report,
+    }
+
+    def __init__(self):
+        self._pdf_gen = None
+        self._pdf_lock = threading.Lock()
+
+    def pdf_gen(self):
+        # reportlab is only imported when the first PDF is generated
+        with self._pdf_lock:
+            if self._pdf_gen is None:
+                from utils.pdf_generator import PDFGenerator
+                self._pdf_gen = PDFGenerator()
+            return self._pdf_gen
+
+    @staticmethod
+    def stock_args(days=STOCK_DAYS):
+        """Paramètres du rapport de stock : ventes des days derniers jours"""
+        return day_key(datetime.now() - timedelta(days=days)), days
+
+    @staticmethod
+    def filename(kind, *args):
+        """
+        Retourne le nom du PDF d'un rapport.
+
+        Args:
+            kind (str): Type de rapport (clé de REPORTS)
+            *args: Paramètres du rapport
+
+        Returns:
+            str: Nom de fichier
+        """
+        if kind == 'daily':
+            return f"rapport_journalier_{format_day_key(args[0])}.pdf"
+        if kind == 'monthly':
+            return f"rapport_mensuel_{args[0]}_{args[1]:02d}.pdf"
+        if kind == 'period':
+            return f"rapport_periode_{args[0]}_{args[1]}.pdf"
+        return f"rapport_stock_{datetime.now().strftime('%Y%m%d')}.pdf"
+
+    def build(self, conn, kind, *args):
+        """
+        Construit un rapport, lignes lues au fil de l'eau.
+
+        À appeler dans un bloc snapshot() pour que résumé et lignes viennent du
+        même état de la base.
+
+        Args:
+            conn (sqlite3.Connection): Connexion de lecture
+            kind (str): Type de rapport (clé de REPORTS)
+            *args: Paramètres du rapport (clé de jour, année et mois, bornes...)
+
+        Returns:
+            Report: Rapport
+        """
+        try:
+            build = self.REPORTS[kind]
+        except KeyError:
+            raise ValueError(f"Type de rapport inconnu : {kind}") from None
+        return build(conn, *args)
+
+    def export(self, conn, kind, *args, filename=None, preview_limit=PREVIEW_ROWS):
+        """
+        Écrit le PDF d'un rapport et garde ses premières lignes pour l'aperçu.
+
+        Une seule transaction de lecture : le résumé et toutes les lignes
+        viennent du même instantané, et les lignes passent du curseur au PDF
+        sans être toutes chargées.
+
+        Args:
+            conn (sqlite3.Connection): Connexion de lecture
+            kind (str): Type de rapport (clé de REPORTS)
+            *args: Paramètres du rapport
+            filename (str): Fichier de destination (par défaut : filename())
+            preview_limit (int): Nombre de lignes gardées dans report.lines
+
+        Returns:
+            tuple: (fichier écrit, rapport dont lines contient l'aperçu)
+        """
+        filename = filename or self.filename(kind, *args)
+        preview = []
+        with snapshot(conn):
+            report = self.build(conn, kind, *args)
+            report.lines = preview_rows(report.lines, preview, preview_limit)
+            self.pdf_gen().generate_report(report, filename)
+        report.lines = preview
+        return filename, report
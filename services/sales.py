@@ -0,0 +1,183 @@
+import json
+from datetime import datetime
+from models.database import Database
+
+# TVA appliquée aux ventes saisies dans la fenêtre de vente
+TAX_RATE = 0.20
+
+# Au-delà, la quantité d'une ligne est à confirmer
+LARGE_QUANTITY = 1000
+
+# Lignes de vente en JSON : [[product_id, quantity, price], ...]
+_INSERT_ITEMS_SQL = '''
+    INSERT INTO sale_items (sale_id, product_id, quantity, price)
+    SELECT ?, json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+    FROM json_each(?)
+'''
+
+# Un produit présent sur plusieurs lignes n'est mis à jour qu'une fois
+_DECREMENT_STOCK_SQL = '''
+    UPDATE products
+    SET stock = stock - (
+        SELECT SUM(json_extract(value, '$[1]')) FROM json_each(?1)
+        WHERE json_extract(value, '$[0]') = products.id
+    )
+    WHERE id IN (SELECT json_extract(value, '$[0]') FROM json_each(?1))
+'''
+
+
+def insert_sale(cursor, sale, items):
+    """
+    Insère l'en-tête, les lignes et décrémente le stock ; exécutée dans le thread écrivain.
+
+    Les lignes et le stock sont écrits en une requête chacun, quel que soit
+    le nombre de lignes.
+
+    Args:
+        cursor (sqlite3.Cursor): Curseur de la transaction d'écriture
+        sale (dict): Colonnes de l'en-tête de vente
+        items (list): Lignes de vente (product_id, quantity, price)
+
+    Returns:
+        int: Identifiant de la vente créée
+    """
+    columns = ', '.join(sale)
+    placeholders = ', '.join('?' for _ in sale)
+    cursor.execute(f'INSERT INTO sales ({columns}) VALUES ({placeholders})', tuple(sale.values()))
+    sale_id = cursor.lastrowid
+
+    lines = json.dumps([[item['product_id'], item['quantity'], item['price']] for item in items])
+    cursor.execute(_INSERT_ITEMS_SQL, (sale_id, lines))
+    cursor.execute(_DECREMENT_STOCK_SQL, (lines,))
+    return sale_id
+
+
+def new_barcode():
+    """Retourne un code de facture horodaté (INV-AAAAMMJJHHMMSS)"""
+    return f"INV-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+
+def check_quantity(quantity):
+    """
+    Vérifie une quantité saisie.
+
+    Args:
+        quantity (str | float): Quantité en kg
+
+    Returns:
+        float: Quantité
+
+    Raises:
+        ValueError: Quantité non numérique, négative ou nulle, ou à plus de 3 décimales
+    """
+    try:
+        quantity = float(quantity)
+    except (TypeError, ValueError):
+        raise ValueError("La quantité doit être un nombre positif") from None
+    if quantity <= 0:
+        raise ValueError("La quantité doit être un nombre positif")
+    if quantity != float(f"{quantity:.3f}"):
+        raise ValueError("La quantité ne peut pas avoir plus de 3 décimales")
+    return quantity
+
+
+def subtotal(items):
+    """Retourne le total des lignes, avant remise et taxe"""
+    return sum(item['quantity'] * item['price'] for item in items)
+
+
+def adjustments(amount, discount_type='percentage', discount_value=0, tax_rate=TAX_RATE):
+    """
+    Calcule la remise et la taxe d'une vente.
+
+    Args:
+        amount (float): Total des lignes (subtotal())
+        discount_type (str): 'percentage' ou 'fixed'
+        discount_value (float): Pourcentage ou montant de la remise
+        tax_rate (float): Taux de taxe appliqué après remise
+
+    Returns:
+        tuple: (remise, taxe)
+    """
+    discount_value = float(discount_value or 0)
+    if discount_type == 'percentage':
+        discount = amount * (discount_value / 100)
+    else:
+        discount = discount_value
+    tax = (amount - discount) * tax_rate
+    return discount, tax
+
+
+class SaleService:
+    """
+    Enregistrement des ventes, indépendant de l'interface.
+
+    Les paniers sont des listes de lignes (dictionnaires product_id, name,
+    quantity, price, total) construites par line() ; record_sale() les confie
+    à la file d'écriture de la base.
+    """
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else Database()
+
+    @staticmethod
+    def line(product, quantity, items=()):
+        """
+        Construit une ligne de vente en vérifiant la quantité et le stock.
+
+        Args:
+            product (Product): Fiche du catalogue
+            quantity (str | float): Quantité en kg
+            items (list): Lignes déjà dans le panier, déduites du stock disponible
+
+        Returns:
+            dict: product_id, name, quantity, price, total
+
+        Raises:
+            ValueError: Produit inconnu, quantité invalide ou stock insuffisant
+        """
+        if product is None:
+            raise ValueError("Produit non trouvé")
+        quantity = check_quantity(quantity)
+        available = product.stock - sum(item['quantity'] for item in items
+                                        if item['product_id'] == product.id)
+        if quantity > available:
+            raise ValueError(f"Stock insuffisant (disponible: {available} kg)")
+        return {
+            'product_id': product.id,
+            'name': product.name,
+            'quantity': quantity,
+            'price': product.price,
+            'total': product.price * quantity
+        }
+
+    def record_sale(self, customer_id, items, payment_method=None, discount=0.0, tax=0.0, barcode=None):
+        """
+        Enregistre une vente de façon asynchrone (validation groupée).
+
+        Le total est celui des lignes, moins la remise, plus la taxe.
+
+        Args:
+            customer_id (int): Client, None pour une vente anonyme
+            items (list): Lignes de vente (product_id, quantity, price)
+            payment_method (str): 'cash', 'credit' ou 'mobile'
+            discount (float): Montant de la remise
+            tax (float): Montant de la taxe
+            barcode (str): Code de la facture
+
+        Returns:
+            concurrent.futures.Future: Identifiant de la vente créée
+        """
+        if not items:
+            raise ValueError("Veuillez ajouter des produits à la vente")
+
+        sale = {
+            'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'customer_id': customer_id,
+            'total': subtotal(items) - discount + tax,
+            'payment_method': payment_method,
+            'discount': discount,
+            'tax': tax,
+            'barcode': barcode
+        }
+        return self.db.submit_write(insert_sale, sale, [dict(item) for item in items])
@@ -0,0 +1,67 @@
+import json
+from models.database import Database
+
+# Ajustements en JSON : {"product_id": variation, ...}
+_ADJUST_SQL = '''
+    UPDATE products
+    SET stock = stock + (SELECT value FROM json_each(?1) WHERE key = CAST(products.id AS TEXT))
+    WHERE id IN (SELECT CAST(key AS INTEGER) FROM json_each(?1))
+'''
+
+
+class StockService:
+    """
+    Consultation et ajustement du stock, indépendants de l'interface.
+    """
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else Database()
+
+    @staticmethod
+    def product(conn, product_id):
+        """
+        Lit le nom et le stock d'un produit.
+
+        Args:
+            conn (sqlite3.Connection): Connexion de lecture
+            product_id (int): Identifiant du produit
+
+        Returns:
+            sqlite3.Row: name, stock ; None si le produit n'existe pas
+        """
+        return conn.execute('SELECT name, stock FROM products WHERE id = ?', (product_id,)).fetchone()
+
+    def adjust(self, product_id, adjustment):
+        """
+        Ajoute une variation (positive ou négative) au stock d'un produit.
+
+        Args:
+            product_id (int): Identifiant du produit
+            adjustment (str | float): Variation en kg
+
+        Raises:
+            ValueError: Variation non numérique ou produit inconnu
+        """
+        try:
+            adjustment = float(adjustment)
+        except (TypeError, ValueError):
+            raise ValueError("Veuillez entrer une valeur numérique valide") from None
+        if not self.adjust_many({product_id: adjustment}):
+            raise ValueError("Produit non trouvé")
+
+    def adjust_many(self, adjustments):
+        """
+        Ajuste le stock de plusieurs produits en une requête et une transaction.
+
+        Args:
+            adjustments (dict): Variation en kg par identifiant de produit
+
+        Returns:
+            int: Nombre de produits mis à jour
+        """
+        if not adjustments:
+            return 0
+        payload = json.dumps({str(int(product_id)): float(adjustment)
+                              for product_id, adjustment in adjustments.items()})
+        with self.db.write() as conn:
+            return conn.execute(_ADJUST_SQL, (payload,)).rowcount
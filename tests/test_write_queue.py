@@ -0,0 +1,57 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from models.connection import ConnectionManager
+from models.profiler import QueryProfiler
+from models.write_queue import WriteQueue
+
+
+def _insert(cursor, value):
+    cursor.execute("INSERT INTO t (value) VALUES (?)", (value,))
+    return cursor.lastrowid
+
+
+class WriteQueueBusyTest(unittest.TestCase):
+    """Un BEGIN IMMEDIATE en échec (SQLITE_BUSY) doit résoudre tous les Future du lot"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.directory.name, "test.db")
+        QueryProfiler().enabled = False
+        self.manager = ConnectionManager(self.db_file, timeout=0)
+        self.manager.writer.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, value INTEGER)")
+        self.manager.writer.commit()
+        self.manager.writer.execute("PRAGMA busy_timeout = 0")
+        # Another process holding the write lock
+        self.blocker = sqlite3.connect(self.db_file, isolation_level=None)
+        self.blocker.execute("BEGIN IMMEDIATE")
+        # A long batching window puts every submission in the same batch
+        self.queue = WriteQueue(self.manager, max_wait=0.5)
+
+    def tearDown(self):
+        if self.blocker.in_transaction:
+            self.blocker.rollback()
+        self.blocker.close()
+        self.queue.close()
+        self.manager.close()
+        QueryProfiler().enabled = True
+        self.directory.cleanup()
+
+    def test_failed_begin_fails_every_queued_future(self):
+        futures = [self.queue.submit(_insert, value) for value in range(5)]
+
+        for future in futures:
+            with self.assertRaises(sqlite3.OperationalError) as raised:
+                future.result(timeout=5)
+            self.assertIn("locked", str(raised.exception))
+
+        # The writer thread survives and commits once the lock is released
+        self.blocker.rollback()
+        self.assertIsNotNone(self.queue.submit(_insert, 42).result(timeout=5))
+        count = self.manager.writer.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+        self.assertEqual(count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import os
+import re
+import gc
+import time
+import cProfile
+import logging
+import tracemalloc
+from tkinter import ttk
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Variable d'environnement activant le profilage des actions au lancement
+PROFILE_ENV = 'FISHER_PROFILE'
+
+# Nombre de lignes de la différence mémoire écrites par action
+MEMORY_TOP = 30
+
+_tracemalloc_filters = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+)
+
+
+def _slug(text):
+    """Nom de fichier sûr à partir d'un libellé d'action"""
+    return re.sub(r'[^\w-]+', '_', str(text)).strip('_') or 'action'
+
+
+class ActionProfiler:
+    """
+    Profilage à la demande des actions de l'interface.
+
+    En mode profilage, chaque navigation et chaque commande de bouton créé
+    par profiled_button() est exécutée sous cProfile, entre deux instantanés tracemalloc. Pour chaque
+    action sont écrits un fichier .pstats (à ouvrir avec pstats ou snakeviz)
+    et la différence mémoire entre les deux instantanés, nommés d'après la vue
+    ou l'action. Le mode s'active par la variable FISHER_PROFILE ou depuis
+    les diagnostics des réglages. Implémente le pattern Singleton.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ActionProfiler, cls).__new__(cls)
+            cls._instance.init_profiler()
+        return cls._instance
+
+    def init_profiler(self, directory="profils"):
+        self.directory = directory
+        self.enabled = False
+        self._context = None
+        self._active = False
+        if os.environ.get(PROFILE_ENV):
+            self.set_enabled(True)
+
+    def set_enabled(self, enabled):
+        """
+        Active ou désactive le mode profilage.
+
+        Args:
+            enabled (bool): True pour profiler les actions suivantes
+        """
+        self.enabled = enabled
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        logger.info("Profilage des actions %s", "activé" if enabled else "désactivé")
+
+    def set_context(self, context):
+        """
+        Définit la vue active, préfixe du nom des actions des vues.
+
+        Args:
+            context (callable): Retourne le nom de la vue active
+        """
+        self._context = context
+
+    def wrap(self, name, command, in_view=False):
+        """
+        Retourne command exécutée sous capture().
+
+        Args:
+            name (str): Nom de l'action
+            command (callable): Commande à profiler
+            in_view (bool): Préfixer le nom de l'action par la vue active au moment de l'appel
+        """
+        def profiled(*args):
+            if not self.enabled:
+                return command(*args)
+            action = name
+            if in_view and self._context is not None:
+                action = f"{self._context()}_{name}"
+            with self.capture(action):
+                return command(*args)
+
+        return profiled
+
+    @contextmanager
+    def capture(self, name):
+        """
+        Profile le bloc et écrit ses statistiques.
+
+        Une capture déjà en cours (action déclenchée par une autre action)
+        englobe le bloc, qui n'est pas profilé séparément.
+
+        Args:
+            name (str): Nom de l'action, utilisé pour les fichiers
+        """
+        if not self.enabled or self._active:
+            yield
+            return
+
+        self._active = True
+        gc.collect()
+        before = tracemalloc.take_snapshot().filter_traces(_tracemalloc_filters)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            gc.collect()
+            after = tracemalloc.take_snapshot().filter_traces(_tracemalloc_filters)
+            self._active = False
+            try:
+                self._write(name, profile, before, after, elapsed)
+            except OSError as e:
+                logger.error("Profil de l'action %s non écrit : %s", name, e)
+
+    def _write(self, name, profile, before, after, elapsed):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{_slug(name)}")
+        profile.dump_stats(f"{base}.pstats")
+
+        differences = after.compare_to(before, 'lineno')
+        growth = sum(stat.size_diff for stat in differences)
+        lines = [f"Action : {name}",
+                 f"Durée : {elapsed * 1000:.1f} ms",
+                 f"Mémoire retenue : {growth / 1024:+.1f} Kio",
+                 f"Allocations retenues par ligne (les {MEMORY_TOP} plus importantes) :"]
+        lines.extend(f"  {stat}" for stat in differences[:MEMORY_TOP])
+        with open(f"{base}.memoire.txt", 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+        logger.info("Action %s profilée en %.0f ms (%+.1f Kio) : %s.pstats",
+                    name, elapsed * 1000, growth / 1024, base)
+
+
+def profiled(name, command):
+    """
+    Retourne la commande d'un bouton de vue, profilée en mode profilage.
+
+    Hors mode profilage, la commande est appelée directement.
+
+    Args:
+        name (str): Nom de l'action, préfixé par la vue active au moment de l'appel
+        command (callable): Commande du bouton
+    """
+    return ActionProfiler().wrap(name, command, in_view=True)
+
+
+def profiled_button(parent, text, command, name=None, widget_class=ttk.Button, **kw):
+    """
+    Crée un bouton dont la commande est profilée en mode profilage.
+
+    Args:
+        parent: Widget parent
+        text (str): Libellé du bouton, qui nomme aussi l'action
+        command (callable): Commande du bouton
+        name (str): Nom de l'action, si le libellé ne suffit pas à la distinguer
+        widget_class: Classe du bouton (ttk.Button par défaut, ou tk.Button)
+        **kw: Options transmises au bouton
+
+    Returns:
+        Widget: Bouton créé, à placer par l'appelant
+    """
+    return widget_class(parent, text=text, command=profiled(name or text, command), **kw)
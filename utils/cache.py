@@ -1,33 +1,297 @@
-
-from functools import lru_cache
+import re
+import sqlite3
+import sys
 import time
+import threading
+from collections import OrderedDict, defaultdict
+
+# Tables lues par un SELECT, tables modifiées par une écriture
+_READ_RE = re.compile(r'\b(?:FROM|JOIN)\s+["\[`]?(\w+)', re.IGNORECASE)
+_WRITE_RE = re.compile(
+    r'\b(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(?!SET\b)["\[`]?(\w+)',
+    re.IGNORECASE)
+
+# Dépendance d'une requête dont les tables n'ont pas pu être déterminées
+ANY_TABLE = '*'
+
+
+def normalize_sql(sql):
+    """Normalise les espaces d'une requête pour en faire une clé de cache"""
+    return ' '.join(sql.split())
+
+
+def read_tables(sql):
+    """Retourne les tables lues par une requête"""
+    return {name.lower() for name in _READ_RE.findall(sql)}
+
+
+def written_tables(sql):
+    """Retourne les tables modifiées par une requête"""
+    return {name.lower() for name in _WRITE_RE.findall(sql)}
+
+
+def _sizeof(rows):
+    """Estime l'occupation mémoire d'un résultat, en octets"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += 64
+        for value in row:
+            size += sys.getsizeof(value)
+    return size
+
+
+class QueryCache:
+    """
+    Cache des résultats de requêtes de lecture.
+
+    Les entrées sont indexées par la requête normalisée et ses paramètres, et
+    bornées en nombre et en octets (éviction LRU) ainsi qu'en durée de vie.
+    Chaque entrée est associée aux tables qu'elle lit : les écritures passant
+    par la connexion d'écriture sont suivies (trace SQLite) et invalident, après
+    validation, les entrées des tables modifiées, y compris celles mises à jour
+    par des triggers. Les écritures validées par une autre connexion (une autre
+    caisse sur le même fichier) sont détectées par PRAGMA data_version sur la
+    connexion d'écriture et vident tout le cache. Implémente le pattern Singleton.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(QueryCache, cls).__new__(cls)
+            cls._instance.init_cache()
+        return cls._instance
+
+    def init_cache(self, max_entries=256, max_bytes=8 * 1024 * 1024, max_age=300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._by_table = defaultdict(set)
+        self._versions = defaultdict(int)
+        self._pending = set()
+        self._trigger_writes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = None
+        self._data_version = None
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0,
+                       'external': 0}
+
+    def fetchall(self, conn, sql, params=()):
+        """
+        Exécute une requête de lecture en passant par le cache.
+
+        Args:
+            conn (sqlite3.Connection): Connexion utilisée en cas d'absence du cache
+            sql (str): Requête SELECT
+            params (tuple): Paramètres de la requête
+
+        Returns:
+            list: Lignes du résultat
+        """
+        key = (normalize_sql(sql), tuple(params))
+        self.check_external()
+        rows = self.get(key)
+        if rows is not None:
+            return rows
+
+        tables = read_tables(key[0]) or {ANY_TABLE}
+        with self._lock:
+            versions = {table: self._versions[table] for table in tables}
+        rows = conn.execute(sql, params).fetchall()
+        self.put(key, rows, versions)
+        return list(rows)
+
+    def get(self, key):
+        """Retourne le résultat en cache pour key, ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if time.monotonic() - entry['time'] > self.max_age:
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return list(entry['rows'])
+
+    def put(self, key, rows, versions):
+        """
+        Ajoute un résultat au cache.
+
+        Args:
+            key (tuple): Requête normalisée et paramètres
+            rows (list): Lignes du résultat
+            versions (dict): Version de chaque table lue, relevée avant la requête ;
+                le résultat est ignoré si l'une d'elles a été modifiée entre-temps
+        """
+        size = _sizeof(rows)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if any(self._versions[table] != version for table, version in versions.items()):
+                return
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = {'rows': rows, 'tables': set(versions), 'size': size,
+                                  'time': time.monotonic()}
+            self._bytes += size
+            for table in versions:
+                self._by_table[table].add(key)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry['size']
+        for table in entry['tables']:
+            keys = self._by_table[table]
+            keys.discard(key)
+            if not keys:
+                del self._by_table[table]
+
+    def invalidate(self, tables):
+        """
+        Supprime les entrées qui lisent l'une des tables données.
+
+        Args:
+            tables (iterable): Noms des tables modifiées
+        """
+        tables = {table.lower() for table in tables}
+        if not tables:
+            return
+        tables.add(ANY_TABLE)
+
+        with self._lock:
+            for table in tables:
+                self._versions[table] += 1
+                for key in list(self._by_table.get(table, ())):
+                    self._remove(key)
+                    self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            for table in list(self._versions):
+                self._versions[table] += 1
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def versions(self, tables):
+        """
+        Retourne les compteurs de modification de tables.
+
+        Args:
+            tables (iterable): Noms des tables
+
+        Returns:
+            tuple: Un compteur par table, incrémenté à chaque écriture validée
+                (y compris par une autre connexion)
+        """
+        self.check_external()
+        with self._lock:
+            return tuple(self._versions[table.lower()] for table in tables)
+
+    def stats(self):
+        """
+        Retourne les compteurs du cache.
+
+        Returns:
+            dict: hits, misses, evictions, expirations, invalidations, external
+                (vidages dus à une autre connexion), entries, bytes
+        """
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+    def track_writes(self, conn, lock=None):
+        """
+        Suit les écritures d'une connexion.
+
+        Args:
+            conn (sqlite3.Connection): Connexion d'écriture
+            lock: Verrou de la connexion d'écriture ; s'il est fourni, PRAGMA
+                data_version y est consulté pour détecter les écritures des
+                autres connexions (voir check_external())
+        """
+        conn.set_trace_callback(self._trace)
+        if lock is not None:
+            self._writer = conn
+            self._writer_lock = lock
+            self._data_version = None
+
+    def check_external(self):
+        """
+        Vide le cache si une autre connexion a validé une écriture depuis le dernier appel.
+
+        PRAGMA data_version de la connexion d'écriture ne change qu'avec les
+        validations des autres connexions : celles de ce processus, déjà
+        suivies table par table, ne vident pas le cache. La vérification est
+        sautée si la connexion d'écriture est occupée ; elle sera faite à la
+        lecture suivante.
+
+        Returns:
+            bool: True si le cache a été vidé
+        """
+        conn, lock = self._writer, self._writer_lock
+        if conn is None or not lock.acquire(blocking=False):
+            return False
+        try:
+            # Base class method: the check itself is not profiled
+            data_version = sqlite3.Connection.execute(conn, "PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            return False
+        finally:
+            lock.release()
+
+        with self._lock:
+            changed = self._data_version is not None and data_version != self._data_version
+            self._data_version = data_version
+            if changed:
+                self._stats['external'] += 1
+        if changed:
+            self.clear()
+        return changed
+
+    def _trace(self, statement):
+        tables = written_tables(statement)
+        if tables:
+            with self._lock:
+                self._pending |= tables
+
+    def load_triggers(self, conn):
+        """
+        Relève les tables modifiées par les triggers du schéma.
+
+        Args:
+            conn (sqlite3.Connection): Connexion à utiliser
+        """
+        writes = defaultdict(set)
+        for table, sql in conn.execute(
+                "SELECT tbl_name, sql FROM sqlite_master WHERE type = 'trigger'"):
+            body = sql[sql.upper().find('BEGIN'):]
+            writes[table.lower()] |= written_tables(body)
+        self._trigger_writes = dict(writes)
+
+    def flush_writes(self):
+        """Invalide les tables modifiées depuis le dernier appel ; à appeler après validation"""
+        with self._lock:
+            tables, self._pending = self._pending, set()
+
+        # Les triggers propagent les écritures (cumuls, index de recherche)
+        todo = list(tables)
+        while todo:
+            for table in self._trigger_writes.get(todo.pop(), ()):
+                if table not in tables:
+                    tables.add(table)
+                    todo.append(table)
 
-class Cache:
-    _cache = {}
-    _timestamps = {}
-    _max_age = 300  # 5 minutes
-
-    @classmethod
-    def get(cls, key):
-        if key in cls._cache:
-            if time.time() - cls._timestamps[key] < cls._max_age:
-                return cls._cache[key]
-            else:
-                del cls._cache[key]
-                del cls._timestamps[key]
-        return None
-
-    @classmethod
-    def set(cls, key, value):
-        cls._cache[key] = value
-        cls._timestamps[key] = time.time()
-
-    @classmethod
-    def clear(cls):
-        cls._cache.clear()
-        cls._timestamps.clear()
-
-@lru_cache(maxsize=128)
-def get_cached_data(query, params=()):
-    """Cache les résultats des requêtes fréquentes"""
-    pass
+        self.invalidate(tables)
@@ -0,0 +1,37 @@
+import calendar
+from datetime import date, datetime
+
+
+def day_key(value):
+    """
+    Convertit une date en clé de jour entière AAAAMMJJ (colonne sales.day).
+
+    Args:
+        value (date | datetime | str): Date ou chaîne 'YYYY-MM-DD[ HH:MM:SS]'
+
+    Returns:
+        int: Clé de jour, par exemple 20250102
+    """
+    if isinstance(value, str):
+        value = datetime.strptime(value[:10], '%Y-%m-%d')
+    return value.year * 10000 + value.month * 100 + value.day
+
+
+def month_range(year, month):
+    """
+    Retourne les bornes inclusives des clés de jour d'un mois.
+
+    Args:
+        year (int): Année
+        month (int): Mois (1-12)
+
+    Returns:
+        tuple: (premier jour, dernier jour) au format AAAAMMJJ
+    """
+    last_day = calendar.monthrange(year, month)[1]
+    return day_key(date(year, month, 1)), day_key(date(year, month, last_day))
+
+
+def format_day_key(key):
+    """Formate une clé AAAAMMJJ en 'YYYY-MM-DD'"""
+    return f"{key // 10000:04d}-{key // 100 % 100:02d}-{key % 100:02d}"
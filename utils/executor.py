@@ -0,0 +1,99 @@
+import queue
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox
+from models.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class QueryExecutor:
+    """
+    Exécuteur de requêtes en arrière-plan pour les vues Tk.
+
+    Les fonctions soumises s'exécutent dans un pool de threads, chacune sur la
+    connexion de lecture de son thread. Les résultats sont déposés dans une file
+    que la boucle Tk vide via after() : les rappels on_success / on_error sont
+    donc toujours appelés dans le thread Tk. Implémente le pattern Singleton.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(QueryExecutor, cls).__new__(cls)
+            cls._instance.init_executor()
+        return cls._instance
+
+    def init_executor(self, max_workers=4, interval=15):
+        self.db = Database()
+        self.interval = interval
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self._done = queue.Queue()
+        self._pending = 0
+        self._root = None
+        self._pump_id = None
+
+    def submit(self, widget, fn, *args, on_success=None, on_error=None, loading=None):
+        """
+        Exécute fn(conn, *args) en arrière-plan. À appeler depuis le thread Tk.
+
+        Args:
+            widget: Widget propriétaire ; les rappels sont ignorés s'il a été détruit
+            fn (callable): Fonction de lecture appelée avec une connexion en lecture seule
+            *args: Arguments transmis à fn
+            on_success (callable): Appelée avec le résultat de fn, dans le thread Tk
+            on_error (callable): Appelée avec l'exception ; affiche une erreur par défaut
+            loading: Widget affichant un curseur d'attente pendant l'exécution
+
+        Returns:
+            concurrent.futures.Future: Résultat de fn
+        """
+        if loading is not None:
+            loading.configure(cursor='watch')
+
+        future = self._pool.submit(self._run, fn, args)
+        self._pending += 1
+        future.add_done_callback(
+            lambda f: self._done.put((widget, f, on_success, on_error, loading)))
+
+        if self._pump_id is None:
+            self._root = widget.nametowidget('.')
+            self._pump_id = self._root.after(self.interval, self._pump)
+        return future
+
+    def _run(self, fn, args):
+        with self.db.read() as conn:
+            return fn(conn, *args)
+
+    def _pump(self):
+        """Distribue dans le thread Tk les résultats terminés"""
+        self._pump_id = None
+        while True:
+            try:
+                widget, future, on_success, on_error, loading = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            self._deliver(widget, future, on_success, on_error, loading)
+
+        if self._pending:
+            self._pump_id = self._root.after(self.interval, self._pump)
+
+    def _deliver(self, widget, future, on_success, on_error, loading):
+        if loading is not None and loading.winfo_exists():
+            loading.configure(cursor='')
+        if not widget.winfo_exists():
+            return
+
+        error = future.exception()
+        try:
+            if error is None:
+                if on_success is not None:
+                    on_success(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                logger.error("Échec de la requête en arrière-plan : %s", error)
+                messagebox.showerror("Erreur", str(error))
+        except Exception:
+            logger.exception("Erreur dans le rappel d'une requête en arrière-plan")
@@ -0,0 +1,187 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.invoice_cache import InvoiceCache, invoice_key
+
+logger = logging.getLogger(__name__)
+
+# Nombre de ventes lues en une fois (deux requêtes par tranche)
+CHUNK_SIZE = 200
+
+# Générateur PDF propre à chaque processus de rendu
+_pdf_gen = None
+
+
+def invoice_filename(output_dir, sale_id):
+    """Retourne le chemin du PDF d'une facture"""
+    return os.path.join(output_dir, f"facture_{sale_id}.pdf")
+
+
+def _render(sale_data, filename):
+    """Écrit le PDF d'une facture avec le générateur du processus"""
+    global _pdf_gen
+    if _pdf_gen is None:
+        from utils.pdf_generator import PDFGenerator
+        _pdf_gen = PDFGenerator()
+    _pdf_gen.generate_invoice(sale_data, filename)
+
+
+def render_invoice(sale_data, cache_directory):
+    """
+    Génère le PDF d'une facture dans le cache ; exécutée dans un processus de rendu.
+
+    Le rendu passe par InvoiceCache.get, comme l'export d'une facture seule :
+    le fichier est écrit sous un nom temporaire puis renommé, et supprimé si
+    le rendu échoue. L'éviction est faite une fois, à la fin du lot.
+
+    Args:
+        sale_data (dict): Données de la facture
+        cache_directory (str): Dossier du cache des factures du processus principal
+
+    Returns:
+        int: Identifiant de la vente
+    """
+    cache = InvoiceCache()
+    cache.directory = cache_directory
+    cache.get(sale_data, _render, evict=False)
+    return sale_data['id']
+
+
+def generate_invoices(read, sale_ids, output_dir, workers=None, progress=None, cancelled=None):
+    """
+    Génère les PDF de plusieurs factures dans des processus parallèles.
+
+    Les données sont lues par tranches de CHUNK_SIZE ventes. Les PDF passent
+    par le cache des factures : une facture inchangée depuis son dernier rendu
+    est simplement copiée, si bien que relancer un lot interrompu ne rend que
+    les factures manquantes, et qu'une vente modifiée est toujours re-rendue.
+
+    Args:
+        read (callable): Fournit un bloc with donnant une connexion de lecture (Database.read)
+        sale_ids (list): Identifiants des ventes à facturer
+        output_dir (str): Dossier de destination, créé si nécessaire
+        workers (int): Nombre de processus de rendu (par défaut : nombre de processeurs)
+        progress (callable): progress(traitées, total), appelée depuis le thread appelant
+        cancelled (callable): Retourne True pour interrompre le lot
+
+    Returns:
+        dict: generated, cached (nombres de factures), failed (liste de (id, erreur)),
+            cancelled (bool)
+    """
+    from models.invoices import fetch_invoices
+
+    cache = InvoiceCache()
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(cache.directory, exist_ok=True)
+    total = len(sale_ids)
+    result = {'generated': 0, 'cached': 0, 'failed': [], 'cancelled': False}
+    done = 0
+    if progress:
+        progress(done, total)
+
+    start = time.perf_counter()
+    # spawn : les processus de rendu ne doivent pas hériter de Tk ni des connexions
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for index in range(0, total, CHUNK_SIZE):
+            if cancelled and cancelled():
+                result['cancelled'] = True
+                break
+
+            chunk = sale_ids[index:index + CHUNK_SIZE]
+            with read() as conn:
+                invoices = fetch_invoices(conn, chunk)
+            missing = set(chunk) - {invoice['id'] for invoice in invoices}
+            result['failed'].extend((sale_id, "Vente introuvable") for sale_id in sorted(missing))
+            done += len(missing)
+
+            futures = {}
+            for invoice in invoices:
+                key = invoice_key(invoice)
+                cached = cache.lookup(key)
+                if cached is None:
+                    futures[pool.submit(render_invoice, invoice, cache.directory)] = (invoice['id'], key)
+                    continue
+                shutil.copyfile(cached, invoice_filename(output_dir, invoice['id']))
+                result['cached'] += 1
+                done += 1
+            if progress:
+                progress(done, total)
+
+            for future in as_completed(futures):
+                sale_id, key = futures[future]
+                try:
+                    future.result()
+                    shutil.copyfile(cache.path(key), invoice_filename(output_dir, sale_id))
+                    result['generated'] += 1
+                except Exception as e:
+                    logger.error("Échec de la facture %s : %s", sale_id, e)
+                    result['failed'].append((sale_id, str(e)))
+                done += 1
+                if progress:
+                    progress(done, total)
+                if cancelled and cancelled():
+                    # Les factures en cours de rendu sont terminées, les autres abandonnées
+                    for other in futures:
+                        other.cancel()
+                    result['cancelled'] = True
+                    break
+            if result['cancelled']:
+                break
+
+    cache.evict()
+    logger.info("%d factures générées en %.1f s (%d depuis le cache, %d échecs)",
+                result['generated'], time.perf_counter() - start,
+                result['cached'], len(result['failed']))
+    return result
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande :
+    python -m utils.invoice_batch (--from AAAA-MM-JJ --to AAAA-MM-JJ | --ids N [N ...]) [--out dossier]
+    """
+    parser = argparse.ArgumentParser(description="Génère les factures PDF d'une période ou d'une liste de ventes")
+    parser.add_argument('--db', default="poissonnerie.db", help="Fichier de base de données")
+    parser.add_argument('--from', dest='start', help="Premier jour (AAAA-MM-JJ)")
+    parser.add_argument('--to', dest='end', help="Dernier jour (AAAA-MM-JJ), par défaut le premier")
+    parser.add_argument('--ids', type=int, nargs='+', help="Identifiants des ventes")
+    parser.add_argument('--out', default="factures", help="Dossier de destination")
+    parser.add_argument('--workers', type=int, help="Nombre de processus de rendu")
+    args = parser.parse_args()
+    if not args.ids and not args.start:
+        parser.error("indiquer --from/--to ou --ids")
+
+    from models.connection import ConnectionManager
+    from models.invoices import sale_ids_between
+    from models.migrations import apply_migrations
+    from utils.dates import day_key
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    manager = ConnectionManager(args.db)
+    try:
+        with manager.write_lock:
+            apply_migrations(manager.writer)
+
+        sale_ids = args.ids
+        if not sale_ids:
+            with manager.read() as conn:
+                sale_ids = sale_ids_between(conn, day_key(args.start), day_key(args.end or args.start))
+
+        def progress(done, total):
+            print(f"\r{done}/{total}", end='\n' if done == total else '', flush=True)
+
+        result = generate_invoices(manager.read, sale_ids, args.out, workers=args.workers,
+                                   progress=progress)
+        for sale_id, error in result['failed']:
+            logger.error("Facture %s : %s", sale_id, error)
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
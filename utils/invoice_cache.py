@@ -0,0 +1,150 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Version de la mise en page des factures (PDFGenerator.generate_invoice) : à
+# incrémenter à chaque modification du gabarit pour invalider le cache
+TEMPLATE_VERSION = 1
+
+
+def invoice_key(sale_data):
+    """
+    Calcule l'empreinte du contenu d'une facture.
+
+    Args:
+        sale_data (dict): En-tête et lignes de la facture (models.invoices.fetch_invoice)
+
+    Returns:
+        str: Empreinte SHA-256 de l'en-tête, des lignes et de la version du gabarit
+    """
+    content = json.dumps({'template': TEMPLATE_VERSION, 'invoice': sale_data},
+                         sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class InvoiceCache:
+    """
+    Cache des factures PDF adressé par leur contenu.
+
+    Chaque PDF est rangé sous l'empreinte de ses données : une facture
+    inchangée est resservie sans rendu, une vente modifiée produit une
+    nouvelle empreinte donc un nouveau fichier. Le dossier est borné en octets ;
+    les fichiers les moins récemment servis sont supprimés en premier.
+    Implémente le pattern Singleton.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(InvoiceCache, cls).__new__(cls)
+            cls._instance.init_cache()
+        return cls._instance
+
+    def init_cache(self, directory=os.path.join("cache", "factures"), max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        """Retourne le chemin du PDF d'une empreinte"""
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def lookup(self, key):
+        """
+        Retourne le PDF en cache d'une empreinte, ou None.
+
+        Le fichier servi est marqué comme récemment utilisé.
+        """
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get(self, sale_data, render, evict=True):
+        """
+        Retourne le PDF d'une facture, en le générant s'il n'est pas en cache.
+
+        Le PDF est écrit sous un nom temporaire propre au processus et au
+        thread, puis renommé ; il est supprimé si le rendu échoue.
+
+        Args:
+            sale_data (dict): Données de la facture
+            render (callable): render(sale_data, fichier) écrit le PDF
+            evict (bool): Appliquer la limite de taille du cache après un rendu
+
+        Returns:
+            tuple: (chemin du PDF, True s'il était déjà en cache)
+        """
+        key = invoice_key(sale_data)
+        path = self.lookup(key)
+        if path is not None:
+            return path, True
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            render(sale_data, partial)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        if evict:
+            self.evict()
+        return path, False
+
+    def export(self, sale_data, filename, render):
+        """
+        Écrit le PDF d'une facture sous filename, depuis le cache si possible.
+
+        Args:
+            sale_data (dict): Données de la facture
+            filename (str): Fichier de destination
+            render (callable): render(sale_data, fichier) écrit le PDF
+
+        Returns:
+            bool: True si la facture était déjà en cache
+        """
+        path, hit = self.get(sale_data, render)
+        shutil.copyfile(path, filename)
+        return hit
+
+    def evict(self):
+        """Supprime les PDF les moins récemment servis au-delà de max_bytes"""
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self.directory)
+                           if entry.name.endswith('.pdf') and entry.is_file()]
+            except FileNotFoundError:
+                return
+            files = []
+            total = 0
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+
+            files.sort()
+            removed = 0
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            logger.info("%d factures supprimées du cache", removed)
@@ -1,14 +1,93 @@
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Flowable
 from reportlab.lib.styles import getSampleStyleSheet
-from datetime import datetime
+from models.reports import TEXT
+
+# Style des tableaux de rapport : en-tête répété en haut de chaque page
+REPORT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.green),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+class StreamingTable(Flowable):
+    """
+    Tableau multipage alimenté au fil de l'eau par un itérateur de lignes.
+
+    Seules les lignes de la page en cours de mise en page (et au plus
+    chunk_size lignes d'avance) sont en mémoire : à chaque saut de page, la
+    partie placée est dessinée et le reste du tableau reprend la lecture de
+    l'itérateur (typiquement un curseur SQLite). L'en-tête est répété sur chaque
+    page (LongTable, repeatRows=1). Les largeurs de colonnes sont fixes pour que
+    les pages restent alignées.
+    """
+
+    def __init__(self, header, rows, col_widths, style=REPORT_TABLE_STYLE, chunk_size=60):
+        """
+        Args:
+            header (list): Libellés des colonnes
+            rows (iterable): Lignes déjà formatées (listes de textes)
+            col_widths (list): Largeur de chaque colonne, en points
+            style (TableStyle): Style appliqué à chaque page du tableau
+            chunk_size (int): Nombre de lignes lues d'avance
+        """
+        super().__init__()
+        self.header = list(header)
+        self.rows = iter(rows)
+        self.col_widths = col_widths
+        self.style = style
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self._limit = chunk_size
+        self._exhausted = False
+        self._table = None
+
+    def _fill(self):
+        while not self._exhausted and len(self.buffer) < self._limit:
+            try:
+                self.buffer.append(next(self.rows))
+            except StopIteration:
+                self._exhausted = True
+
+    def wrap(self, availWidth, availHeight):
+        # Read ahead until the rows overflow the frame or the source is exhausted
+        while True:
+            self._fill()
+            self._table = LongTable([self.header] + self.buffer, colWidths=self.col_widths,
+                                    repeatRows=1, style=self.style)
+            width, height = self._table.wrap(availWidth, availHeight)
+            if self._exhausted or height > availHeight:
+                return width, height
+            self._limit += self.chunk_size
+
+    def split(self, availWidth, availHeight):
+        if self._table is None:
+            self.wrap(availWidth, availHeight)
+        parts = self._table.split(availWidth, availHeight)
+        if not parts:
+            return []
+
+        # Keep the placed rows; the rest of the table continues from the iterator
+        placed = len(parts[0]._cellvalues) - 1
+        rest = StreamingTable(self.header, self.rows, self.col_widths, self.style, self.chunk_size)
+        rest.buffer = self.buffer[placed:]
+        rest._exhausted = self._exhausted
+        return [parts[0], rest]
+
+    def draw(self):
+        self._table.drawOn(self.canv, 0, 0)
+
 
 class PDFGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
 
     def generate_invoice(self, sale_data, filename):
+        # Any layout change must bump utils.invoice_cache.TEMPLATE_VERSION
         doc = SimpleDocTemplate(filename, pagesize=A4)
         elements = []
 
@@ -52,50 +131,44 @@ class PDFGenerator:
         # Build PDF
         doc.build(elements)
 
-    def generate_daily_report(self, report_data, filename):
-        doc = SimpleDocTemplate(filename, pagesize=A4)
-        elements = []
+    def generate_report(self, report, filename):
+        """
+        Génère le PDF d'un rapport (models.reports.Report).
 
-        # Header
-        elements.append(Paragraph("Rapport Journalier", self.styles['Heading1']))
-        elements.append(Paragraph(f"Date: {datetime.now().strftime('%d/%m/%Y')}", self.styles['Normal']))
+        Les lignes sont lues au fil de l'eau depuis report.lines : l'appel doit
+        se faire dans le bloc de lecture qui a produit le rapport.
 
-        # Sales summary
-        elements.append(Paragraph("Résumé des ventes", self.styles['Heading2']))
-        data = [['Produit', 'Quantité vendue', 'Chiffre d\'affaires']]
-        for item in report_data['sales_summary']:
-            data.append([
-                item['product_name'],
-                f"{item['quantity']} kg",
-                f"{item['revenue']} €"
-            ])
+        Args:
+            report (Report): Rapport à mettre en page
+            filename (str): Fichier PDF à écrire
+        """
+        doc = SimpleDocTemplate(filename, pagesize=A4)
+        elements = [
+            Paragraph(report.title, self.styles['Heading1']),
+            Paragraph(f"Édité le {report.generated_at.strftime('%d/%m/%Y %H:%M')}", self.styles['Normal'])
+        ]
 
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.green),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        if report.summary:
+            elements.append(Paragraph("Résumé", self.styles['Heading2']))
+            elements.append(self._summary_table(report.summary_rows()))
 
-        elements.append(table)
+        elements.append(Paragraph("Détail", self.styles['Heading2']))
+        # Text columns (product, category) get twice the width of figures
+        weights = [2 if column.kind == TEXT else 1 for column in report.columns]
+        elements.append(StreamingTable([column.label for column in report.columns], report.rows(),
+                                       self._col_widths(doc, *weights)))
 
-        # Financial summary
-        elements.append(Paragraph("Résumé financier", self.styles['Heading2']))
-        financial_data = [
-            ['Total des ventes', f"{report_data['total_sales']} €"],
-            ['Nombre de transactions', str(report_data['transaction_count'])],
-            ['Panier moyen', f"{report_data['average_basket']} €"]
-        ]
+        doc.build(elements)
 
-        financial_table = Table(financial_data)
-        financial_table.setStyle(TableStyle([
+    def _col_widths(self, doc, *weights):
+        """Répartit la largeur utile de la page selon des poids"""
+        total = sum(weights)
+        return [doc.width * weight / total for weight in weights]
+
+    def _summary_table(self, data):
+        table = Table(data)
+        table.setStyle(TableStyle([
             ('GRID', (0, 0), (-1, -1), 1, colors.black),
             ('BACKGROUND', (0, 0), (-1, -1), colors.beige)
         ]))
-
-        elements.append(financial_table)
-
-        # Build PDF
-        doc.build(elements)
+        return table
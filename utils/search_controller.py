@@ -0,0 +1,119 @@
+import sqlite3
+import time
+import logging
+import threading
+from collections import OrderedDict
+from models.search import remove_diacritics
+from utils.executor import QueryExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class SearchController:
+    """
+    Recherche asynchrone d'une vue de liste.
+
+    La saisie est temporisée (debounce) ; la requête s'exécute via le
+    QueryExecutor sur une connexion de lecture ; une requête dépassée par une saisie
+    plus récente est interrompue (sqlite3.Connection.interrupt) et son résultat
+    ignoré. Les derniers résultats sont conservés par terme normalisé et seule
+    la réponse la plus récente est affichée, dans le thread Tk.
+    """
+
+    def __init__(self, widget, variables, query, apply, delay=250, cache_size=32, max_age=30):
+        """
+        Args:
+            widget: Widget Tk servant à planifier les rappels via after()
+            variables (list): Variables Tk dont la modification relance la recherche
+            query (callable): query(conn, *valeurs) -> lignes, exécutée hors du thread Tk
+            apply (callable): apply(lignes), appelée dans le thread Tk
+            delay (int): Temporisation de la saisie, en millisecondes
+            cache_size (int): Nombre de résultats conservés
+            max_age (float): Durée de validité d'un résultat en cache, en secondes
+        """
+        self.widget = widget
+        self.variables = list(variables)
+        self.query = query
+        self.apply = apply
+        self.delay = delay
+        self.cache_size = cache_size
+        self.max_age = max_age
+        self.executor = QueryExecutor()
+        self._cache = OrderedDict()
+        self._after_id = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._active = None
+
+        for variable in self.variables:
+            variable.trace_add('write', self._on_change)
+
+    def _values(self):
+        return tuple(variable.get() for variable in self.variables)
+
+    def _on_change(self, *args):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.delay, self.run)
+
+    def run(self):
+        """Lance immédiatement la recherche pour les valeurs courantes"""
+        self._after_id = None
+        self._generation += 1
+        generation = self._generation
+        values = self._values()
+        key = tuple(remove_diacritics(str(v)).strip() for v in values)
+
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.max_age:
+            self._cache.move_to_end(key)
+            self._interrupt()
+            self.apply(cached[1])
+            return
+
+        self._interrupt()
+        self.executor.submit(self.widget, self._execute, generation, values,
+                             on_success=lambda rows: self._deliver(generation, key, rows),
+                             on_error=lambda error: self._failed(generation, error),
+                             loading=self.widget)
+
+    def _execute(self, conn, generation, values):
+        if generation != self._generation:
+            return None
+        with self._lock:
+            self._active = (generation, conn)
+        try:
+            return self.query(conn, *values)
+        finally:
+            with self._lock:
+                self._active = None
+
+    def _interrupt(self):
+        """Interrompt la requête en cours, devenue obsolète"""
+        with self._lock:
+            if self._active is not None:
+                self._active[1].interrupt()
+
+    def _failed(self, generation, error):
+        if generation != self._generation:
+            return
+        if not (isinstance(error, sqlite3.OperationalError) and 'interrupted' in str(error)):
+            logger.error("Échec de la recherche : %s", error)
+
+    def _deliver(self, generation, key, rows):
+        if generation != self._generation:
+            return
+        self._cache[key] = (time.monotonic(), rows)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        self.apply(rows)
+
+    def invalidate(self):
+        """Vide le cache après une modification des données affichées"""
+        self._cache.clear()
+
+    def refresh(self):
+        """Vide le cache et relance la recherche courante"""
+        self.invalidate()
+        self.run()
@@ -0,0 +1,190 @@
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+from collections import namedtuple
+from importlib.abc import MetaPathFinder
+
+logger = logging.getLogger(__name__)
+
+# Variable d'environnement activant le rapport de démarrage
+DEBUG_ENV = 'FISHER_DEBUG_STARTUP'
+
+_start = time.perf_counter()
+_start_modules = len(sys.modules)
+_phases = []
+_imports = []
+_reported = False
+
+# Étape du démarrage : libellé affiché, fonction sans argument, poids dans la
+# barre de progression, et arrêt du démarrage en cas d'échec
+Step = namedtuple('Step', ['label', 'run', 'weight', 'required'], defaults=(1, False))
+
+
+def enabled():
+    """Indique si le rapport de démarrage est demandé"""
+    return bool(os.environ.get(DEBUG_ENV))
+
+
+class _ImportTimer(MetaPathFinder):
+    """
+    Mesure le temps d'exécution de chaque module importé, comme -X importtime :
+    temps propre (hors sous-imports) et temps cumulé.
+    """
+
+    def __init__(self):
+        self._stack = []
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def run(self, name, exec_module, module):
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            _imports.append((name, elapsed - nested, elapsed))
+
+
+class _TimedLoader:
+    def __init__(self, loader, timer):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer.run(module.__name__, self._loader.exec_module, module)
+
+
+def install():
+    """Active la mesure des imports ; à appeler avant d'importer l'application"""
+    if not any(isinstance(finder, _ImportTimer) for finder in sys.meta_path):
+        sys.meta_path.insert(0, _ImportTimer())
+
+
+def mark(phase):
+    """
+    Enregistre la fin d'une étape du démarrage.
+
+    Args:
+        phase (str): Nom de l'étape
+    """
+    _phases.append((phase, time.perf_counter(), len(sys.modules)))
+
+
+def report(top=15):
+    """
+    Journalise, une seule fois, la durée de chaque étape et les imports les
+    plus coûteux.
+
+    Args:
+        top (int): Nombre d'imports à afficher
+    """
+    global _reported
+    if _reported or not enabled():
+        return
+    _reported = True
+
+    lines = ["Démarrage : %.0f ms" % ((time.perf_counter() - _start) * 1000)]
+    previous, modules = _start, _start_modules
+    for phase, at, count in _phases:
+        lines.append("  %-36s %8.1f ms %8.1f ms  %4d modules"
+                     % (phase, (at - previous) * 1000, (at - _start) * 1000, count - modules))
+        previous, modules = at, count
+
+    if _imports:
+        lines.append("Imports les plus coûteux (propre / cumulé) :")
+        for name, own, cumulative in sorted(_imports, key=lambda item: item[2], reverse=True)[:top]:
+            lines.append("  %-40s %8.1f ms %8.1f ms" % (name, own * 1000, cumulative * 1000))
+
+    logger.info("\n".join(lines))
+
+
+class StartupPipeline:
+    """
+    Exécute les étapes du démarrage dans un thread d'arrière-plan.
+
+    L'avancement est déposé dans une file que la boucle Tk consulte via after() :
+    les rappels sont appelés dans le thread Tk. L'échec d'une étape obligatoire
+    interrompt le démarrage ; celui d'une autre étape est signalé à la fin.
+    """
+
+    def __init__(self, steps):
+        """
+        Args:
+            steps (list): Étapes (Step) dans leur ordre d'exécution
+        """
+        self.steps = list(steps)
+        self._events = queue.Queue()
+
+    def start(self, widget, on_progress, on_done, on_error, interval=20):
+        """
+        Lance les étapes. À appeler depuis le thread Tk.
+
+        Args:
+            widget: Widget Tk servant à planifier la consultation de la file
+            on_progress (callable): on_progress(fraction, libellé de l'étape en cours)
+            on_done (callable): on_done(échecs), échecs étant une liste de (libellé, exception)
+            on_error (callable): on_error(libellé, exception) si une étape obligatoire échoue
+            interval (int): Délai entre deux consultations, en millisecondes
+        """
+        def poll():
+            if not widget.winfo_exists():
+                return
+            while True:
+                try:
+                    event = self._events.get_nowait()
+                except queue.Empty:
+                    widget.after(interval, poll)
+                    return
+                kind, args = event[0], event[1:]
+                if kind == 'progress':
+                    on_progress(*args)
+                elif kind == 'done':
+                    on_done(*args)
+                    return
+                else:
+                    on_error(*args)
+                    return
+
+        threading.Thread(target=self._run, name="startup", daemon=True).start()
+        widget.after(interval, poll)
+
+    def _run(self):
+        total = sum(step.weight for step in self.steps) or 1
+        done = 0
+        failures = []
+        for step in self.steps:
+            self._events.put(('progress', done / total, step.label))
+            try:
+                step.run()
+            except Exception as e:
+                logger.exception("Échec de l'étape de démarrage « %s »", step.label)
+                if step.required:
+                    self._events.put(('error', step.label, e))
+                    return
+                failures.append((step.label, e))
+            mark(step.label)
+            done += step.weight
+        self._events.put(('progress', 1.0, ""))
+        self._events.put(('done', failures))
@@ -0,0 +1,19 @@
+def watch_future(widget, future, callback, interval=20):
+    """
+    Surveille un Future depuis la boucle Tk et appelle callback dans le thread Tk.
+
+    Args:
+        widget: Widget Tk servant à planifier les vérifications via after()
+        future (concurrent.futures.Future): Résultat attendu
+        callback (callable): Appelée avec le Future une fois celui-ci terminé
+        interval (int): Délai entre deux vérifications, en millisecondes
+    """
+    def check():
+        if not widget.winfo_exists():
+            return
+        if future.done():
+            callback(future)
+        else:
+            widget.after(interval, check)
+
+    widget.after(interval, check)
@@ -0,0 +1,95 @@
+class TreeModel:
+    """
+    Adaptateur clé -> ligne pour un ttk.Treeview.
+
+    Chaque ligne est identifiée par sa clé primaire (iid). Une mise à jour
+    compare le nouveau résultat aux lignes affichées et ne transmet à Tk que
+    les insertions, suppressions, modifications et déplacements nécessaires :
+    la sélection et la position de défilement sont conservées. Le modèle doit
+    être le seul à modifier les lignes du widget.
+    """
+
+    def __init__(self, tree):
+        """
+        Args:
+            tree (ttk.Treeview): Liste à alimenter
+        """
+        self.tree = tree
+        self._order = []
+        self._values = {}
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, iid):
+        return str(iid) in self._values
+
+    def keys(self):
+        """Retourne les iid affichés, dans l'ordre"""
+        return list(self._order)
+
+    def update(self, items):
+        """
+        Remplace le contenu de la liste par items.
+
+        Args:
+            items (iterable): Couples (iid, valeurs) dans l'ordre d'affichage
+
+        Returns:
+            int: Nombre de lignes insérées, modifiées, déplacées ou supprimées
+        """
+        items = [(str(iid), tuple(values)) for iid, values in items]
+        wanted = {iid for iid, _ in items}
+        changes = 0
+
+        gone = [iid for iid in self._order if iid not in wanted]
+        if gone:
+            self.delete(gone)
+            changes += len(gone)
+
+        order = self._order
+        for index, (iid, values) in enumerate(items):
+            if iid not in self._values:
+                self.tree.insert('', index, iid=iid, values=values)
+                order.insert(index, iid)
+                self._values[iid] = values
+                changes += 1
+                continue
+
+            if order[index] != iid:
+                self.tree.move(iid, '', index)
+                order.remove(iid)
+                order.insert(index, iid)
+                changes += 1
+            if self._values[iid] != values:
+                self.tree.item(iid, values=values)
+                self._values[iid] = values
+                changes += 1
+
+        return changes
+
+    def insert(self, index, iid, values):
+        """Insère une ligne ('end' ou position)"""
+        iid = str(iid)
+        values = tuple(values)
+        self.tree.insert('', index, iid=iid, values=values)
+        if index == 'end':
+            self._order.append(iid)
+        else:
+            self._order.insert(index, iid)
+        self._values[iid] = values
+
+    def delete(self, iids):
+        """Supprime des lignes en un seul appel Tk"""
+        iids = [str(iid) for iid in iids]
+        if not iids:
+            return
+        self.tree.delete(*iids)
+        removed = set(iids)
+        self._order = [iid for iid in self._order if iid not in removed]
+        for iid in iids:
+            del self._values[iid]
+
+    def clear(self):
+        """Vide la liste"""
+        self.delete(self._order)
@@ -0,0 +1,183 @@
+import time
+import logging
+import importlib
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+from utils.action_profiler import ActionProfiler
+from utils.cache import QueryCache
+
+logger = logging.getLogger(__name__)
+
+
+class ViewRegistry:
+    """
+    Registre des vues de la fenêtre principale.
+
+    Chaque vue est construite une seule fois dans son propre cadre, puis masquée
+    et réaffichée lors de la navigation. À la réactivation, le crochet
+    on_activate() de la vue n'est appelé que si l'une des tables qu'elle affiche
+    a été modifiée depuis son dernier chargement, ou si ses données ont dépassé
+    max_age. Au-delà de max_views vues construites, la moins récemment affichée
+    (hors vues épinglées) est détruite ; une vérification périodique (voir
+    start()) détruit aussi les vues masquées depuis plus de max_idle. Une vue
+    déclarée par son chemin 'module:Classe' n'est importée qu'à son premier
+    affichage.
+    """
+
+    def __init__(self, container, max_views=6, max_age=300, max_idle=900):
+        """
+        Args:
+            container: Widget Tk accueillant les cadres des vues
+            max_views (int): Nombre maximal de vues gardées en mémoire
+            max_age (float): Durée, en secondes, au-delà de laquelle une vue est rechargée
+            max_idle (float): Durée, en secondes, au-delà de laquelle une vue masquée
+                est détruite par trim()
+        """
+        self.container = container
+        self.max_views = max_views
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self._trim_job = None
+        self.cache = QueryCache()
+        self.profiler = ActionProfiler()
+        self.current = None
+        self._factories = {}
+        self._views = OrderedDict()
+
+    def register(self, name, factory, tables=(), pinned=False):
+        """
+        Déclare une vue.
+
+        Args:
+            name (str): Nom de la vue
+            factory (callable | str): factory(cadre) -> vue, ou chemin 'module:Classe'
+                importé au premier affichage
+            tables (tuple): Tables dont la vue affiche les données
+            pinned (bool): La vue n'est jamais détruite par l'éviction
+        """
+        self._factories[name] = (factory, tuple(tables), pinned)
+
+    def show(self, name):
+        """
+        Affiche une vue, en la construisant au premier affichage.
+
+        Args:
+            name (str): Nom de la vue
+
+        Returns:
+            object: Instance de la vue
+        """
+        # Profiling mode: one capture per navigation, named after the view
+        with self.profiler.capture(f"vue_{name}"):
+            return self._show(name)
+
+    def _show(self, name):
+        start = time.perf_counter()
+        factory, tables, pinned = self._factories[name]
+
+        if self.current is not None and self.current != name:
+            self._views[self.current]['frame'].pack_forget()
+
+        entry = self._views.get(name)
+        if entry is None:
+            if isinstance(factory, str):
+                factory = self._load(name, factory)
+            frame = ttk.Frame(self.container)
+            entry = {'frame': frame, 'versions': self.cache.versions(tables),
+                     'loaded': time.monotonic()}
+            frame.pack(fill=tk.BOTH, expand=True)
+            entry['view'] = factory(frame)
+            self._views[name] = entry
+            action = "construite"
+        else:
+            entry['frame'].pack(fill=tk.BOTH, expand=True)
+            action = "affichée"
+            if self.current != name:
+                versions = self.cache.versions(tables)
+                stale = time.monotonic() - entry['loaded'] > self.max_age
+                if versions != entry['versions'] or stale:
+                    entry['versions'] = versions
+                    entry['loaded'] = time.monotonic()
+                    on_activate = getattr(entry['view'], 'on_activate', None)
+                    if on_activate is not None:
+                        on_activate()
+                        action = "rafraîchie"
+
+        self.current = name
+        entry['shown'] = time.monotonic()
+        self._views.move_to_end(name)
+        self._evict()
+
+        logger.debug("Vue %s %s en %.1f ms", name, action, (time.perf_counter() - start) * 1000)
+        return entry['view']
+
+    def _load(self, name, path):
+        module_name, _, attribute = path.partition(':')
+        start = time.perf_counter()
+        factory = getattr(importlib.import_module(module_name), attribute)
+        logger.debug("Module %s importé en %.1f ms", module_name, (time.perf_counter() - start) * 1000)
+        self._factories[name] = (factory,) + self._factories[name][1:]
+        return factory
+
+    def _evict(self):
+        candidates = [name for name in self._views
+                      if name != self.current and not self._factories[name][2]]
+        while len(self._views) > self.max_views and candidates:
+            self.evict(candidates.pop(0))
+
+    def evict(self, name):
+        """Détruit une vue construite ; elle sera reconstruite au prochain affichage"""
+        entry = self._views.pop(name, None)
+        if entry is None:
+            return
+        if self.current == name:
+            self.current = None
+        entry['frame'].destroy()
+
+    def trim(self, max_idle=None):
+        """
+        Détruit les vues non épinglées restées masquées trop longtemps.
+
+        Args:
+            max_idle (float): Durée, en secondes, depuis le dernier affichage
+                (par défaut self.max_idle ; 0 détruit toutes les vues masquées)
+
+        Returns:
+            list: Noms des vues détruites
+        """
+        max_idle = self.max_idle if max_idle is None else max_idle
+        now = time.monotonic()
+        idle = [name for name, entry in self._views.items()
+                if name != self.current and not self._factories[name][2]
+                and now - entry['shown'] >= max_idle]
+        for name in idle:
+            self.evict(name)
+        if idle:
+            logger.debug("Vues inactives détruites : %s", ", ".join(idle))
+        return idle
+
+    def start(self, interval=60):
+        """
+        Lance la vérification périodique des vues inactives (trim()).
+
+        Args:
+            interval (float): Intervalle entre deux vérifications, en secondes
+        """
+        def check():
+            self.trim()
+            self._trim_job = self.container.after(int(interval * 1000), check)
+
+        self.stop()
+        self._trim_job = self.container.after(int(interval * 1000), check)
+
+    def stop(self):
+        """Arrête la vérification périodique"""
+        if self._trim_job is not None:
+            self.container.after_cancel(self._trim_job)
+            self._trim_job = None
+
+    def clear(self):
+        """Détruit toutes les vues (déconnexion)"""
+        for name in list(self._views):
+            self.evict(name)
@@ -0,0 +1,218 @@
+import logging
+from utils.executor import QueryExecutor
+from utils.tree_model import TreeModel
+
+logger = logging.getLogger(__name__)
+
+
+class Keyset:
+    """
+    Ordre de pagination par clé (keyset pagination).
+
+    Les pages suivantes sont lues à partir de la clé de la dernière ligne
+    affichée (WHERE (colonnes) < (?, ?)) plutôt qu'avec OFFSET : chaque page
+    coûte une recherche dans l'index, quelle que soit sa position dans la liste.
+    Les colonnes doivent former un ordre total (terminer par la clé primaire).
+    """
+
+    def __init__(self, columns, fields, descending=False):
+        """
+        Args:
+            columns (tuple): Expressions SQL du tri, ex. ('s.date', 's.id')
+            fields (tuple): Noms des mêmes valeurs dans les lignes renvoyées
+            descending (bool): Tri décroissant
+        """
+        self.columns = tuple(columns)
+        self.fields = tuple(fields)
+        self.descending = descending
+
+    def key(self, row):
+        """Retourne la clé de pagination d'une ligne"""
+        return tuple(row[field] for field in self.fields)
+
+    def query(self, conn, sql, conditions=(), params=(), after=None, before=None, limit=100):
+        """
+        Exécute une requête paginée.
+
+        Args:
+            conn (sqlite3.Connection): Connexion à utiliser
+            sql (str): Requête SELECT ... FROM ... sans WHERE ni ORDER BY
+            conditions (list): Conditions SQL combinées par AND
+            params (list): Paramètres des conditions
+            after (tuple): Clé après laquelle commencer la page
+            before (tuple): Clé avant laquelle terminer la page
+            limit (int): Nombre maximal de lignes
+
+        Returns:
+            list: Lignes de la page, dans l'ordre d'affichage
+        """
+        conditions = list(conditions)
+        params = list(params)
+        columns = ', '.join(self.columns)
+        placeholders = ', '.join('?' * len(self.columns))
+
+        if after is not None:
+            conditions.append(f"({columns}) {'<' if self.descending else '>'} ({placeholders})")
+            params.extend(after)
+        if before is not None:
+            conditions.append(f"({columns}) {'>' if self.descending else '<'} ({placeholders})")
+            params.extend(before)
+
+        # Une page précédente se lit dans l'ordre inverse puis se retourne
+        forward = before is None
+        descending = self.descending == forward
+        order = ', '.join(f"{column} {'DESC' if descending else 'ASC'}" for column in self.columns)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        rows = conn.execute(f"{sql}{where} ORDER BY {order} LIMIT ?", params + [limit]).fetchall()
+        return rows if forward else rows[::-1]
+
+
+class VirtualTree:
+    """
+    Liste virtuelle sur un ttk.Treeview.
+
+    Seule une fenêtre bornée de lignes est matérialisée dans le widget. Les pages
+    sont chargées en arrière-plan quand le défilement approche d'un bord de la
+    fenêtre ; les lignes sorties de la fenêtre de l'autre côté sont supprimées.
+    """
+
+    def __init__(self, tree, query, keyset, render, page_size=100, max_rows=500, threshold=0.1):
+        """
+        Args:
+            tree (ttk.Treeview): Liste à alimenter
+            query (callable): query(conn, *valeurs, after=, before=, limit=) -> lignes,
+                utilisant keyset.query
+            keyset (Keyset): Ordre de pagination de query
+            render (callable): render(ligne) -> (iid, valeurs affichées)
+            page_size (int): Nombre de lignes par page
+            max_rows (int): Nombre maximal de lignes présentes dans le widget
+            threshold (float): Distance au bord (fraction de la liste) déclenchant un chargement
+        """
+        self.tree = tree
+        self.query = query
+        self.keyset = keyset
+        self.render = render
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.threshold = threshold
+        self.executor = QueryExecutor()
+        self.model = TreeModel(tree)
+        self.values = None
+        self.scrollbar = None
+        self._keys = {}
+        self._at_start = True
+        self._at_end = True
+        self._loading = False
+        self._generation = 0
+
+        tree.configure(yscrollcommand=self._on_scroll)
+
+    def attach_scrollbar(self, scrollbar):
+        """Relie une barre de défilement verticale à la liste"""
+        self.scrollbar = scrollbar
+        scrollbar.configure(command=self.tree.yview)
+
+    def first_page(self, conn, *values):
+        """
+        Lit la première page ; exécutée hors du thread Tk.
+
+        Pour un rafraîchissement des mêmes critères, relit toute la fenêtre
+        affichée si elle commence au début de la liste, afin de conserver la
+        position de défilement.
+        """
+        limit = self.page_size
+        if values == self.values and self._at_start:
+            limit = max(limit, len(self._keys))
+        return values, limit, self.query(conn, *values, limit=limit)
+
+    def show(self, page):
+        """Affiche une première page, en ne modifiant que les lignes qui ont changé"""
+        values, limit, rows = page
+        refresh = values == self.values and self._at_start
+        self.values = values
+        self._generation += 1
+        self._loading = False
+
+        items = [self.render(row) for row in rows]
+        self._keys = {str(iid): self.keyset.key(row) for (iid, _), row in zip(items, rows)}
+        self.model.update(items)
+
+        self._at_start = True
+        self._at_end = len(rows) < limit
+        if not refresh:
+            self.tree.yview_moveto(0)
+
+    def _insert(self, index, row):
+        iid, values = self.render(row)
+        self.model.insert(index, iid, values)
+        self._keys[str(iid)] = self.keyset.key(row)
+
+    def _delete(self, items):
+        self.model.delete(items)
+        for item in items:
+            del self._keys[item]
+
+    def _on_scroll(self, first, last):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if self._loading:
+            return
+
+        children = self.model.keys()
+        if not children:
+            return
+        if float(last) >= 1 - self.threshold and not self._at_end:
+            self._fetch(after=self._keys[children[-1]])
+        elif float(first) <= self.threshold and not self._at_start:
+            self._fetch(before=self._keys[children[0]])
+
+    def _fetch(self, after=None, before=None):
+        self._loading = True
+        generation = self._generation
+        self.executor.submit(self.tree, self._fetch_page, self.values, after, before,
+                             on_success=lambda rows: self._extend(generation, before is None, rows),
+                             on_error=lambda error: self._failed(generation, error),
+                             loading=self.tree)
+
+    def _fetch_page(self, conn, values, after, before):
+        return self.query(conn, *values, after=after, before=before, limit=self.page_size)
+
+    def _failed(self, generation, error):
+        if generation == self._generation:
+            self._loading = False
+        logger.error("Échec du chargement d'une page : %s", error)
+
+    def _extend(self, generation, forward, rows):
+        if generation != self._generation:
+            return
+        self._loading = False
+
+        count = len(self.model)
+        top = round(self.tree.yview()[0] * count)
+
+        if forward:
+            for row in rows:
+                self._insert('end', row)
+            self._at_end = len(rows) < self.page_size
+            children = self.model.keys()
+            excess = len(children) - self.max_rows
+            if excess > 0:
+                self._delete(children[:excess])
+                self._at_start = False
+                top -= excess
+        else:
+            for row in reversed(rows):
+                self._insert(0, row)
+            self._at_start = len(rows) < self.page_size
+            top += len(rows)
+            children = self.model.keys()
+            excess = len(children) - self.max_rows
+            if excess > 0:
+                self._delete(children[-excess:])
+                self._at_end = False
+
+        # Keep the rows the user was looking at in place
+        count = len(self.model)
+        if count:
+            self.tree.yview_moveto(max(top, 0) / count)
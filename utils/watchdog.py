@@ -0,0 +1,220 @@
+import os
+import sys
+import time
+import logging
+import threading
+import tkinter
+import traceback
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Bornes supérieures des classes de durée des blocages, en millisecondes
+STALL_BOUNDS = (250, 500, 1000, 2000, 5000, 10000)
+
+_TKINTER_DIR = os.path.normcase(os.path.dirname(os.path.abspath(tkinter.__file__)))
+# Wrapper placed around button commands in profiling mode
+_ACTION_PROFILER = os.path.normcase(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                 'action_profiler.py'))
+
+
+def _is_tkinter(filename):
+    return os.path.normcase(os.path.abspath(filename)).startswith(_TKINTER_DIR)
+
+
+def _is_wrapper(filename):
+    return _is_tkinter(filename) or os.path.normcase(os.path.abspath(filename)) == _ACTION_PROFILER
+
+
+def _handler(stack):
+    """
+    Retourne le gestionnaire d'événement en cours dans une pile : la première
+    fonction applicative appelée par le dernier rappel Tk (CallWrapper).
+    """
+    for index in range(len(stack) - 1, -1, -1):
+        frame = stack[index]
+        if frame.name == '__call__' and _is_tkinter(frame.filename):
+            for inner in stack[index + 1:]:
+                if not _is_wrapper(inner.filename):
+                    return f"{os.path.relpath(inner.filename)} {inner.name}"
+            return None
+    return None
+
+
+class StallWatchdog:
+    """
+    Surveillance des blocages de la boucle d'événements Tk.
+
+    Un battement planifié par after() note l'heure à chaque tour de boucle ; un
+    thread de surveillance vérifie qu'il arrive à temps. Au-delà de
+    threshold_ms de retard, la pile du thread Tk est capturée
+    (sys._current_frames) et journalisée avec la vue active et le gestionnaire
+    d'événement en cours. À la reprise, la durée totale du blocage est ajoutée
+    à l'histogramme global et aux statistiques du gestionnaire.
+    Implémente le pattern Singleton.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(StallWatchdog, cls).__new__(cls)
+            cls._instance.init_watchdog()
+        return cls._instance
+
+    def init_watchdog(self, threshold_ms=250, interval_ms=100, max_stalls=100):
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._root = None
+        self._context = None
+        self._thread = None
+        self._after_id = None
+        self._main_ident = None
+        self._expected = 0.0
+        self._pending = None
+        self._histogram = [0] * (len(STALL_BOUNDS) + 1)
+        self._handlers = {}
+        self._stalls = deque(maxlen=max_stalls)
+        self._started = datetime.now()
+
+    def start(self, root, context=None):
+        """
+        Démarre la surveillance. À appeler depuis le thread Tk.
+
+        Args:
+            root: Fenêtre Tk dont la boucle est surveillée
+            context (callable): Retourne le nom de la vue active ; appelée depuis
+                le thread de surveillance, elle ne doit pas utiliser Tk
+        """
+        if self._thread is not None:
+            return
+        self._root = root
+        self._context = context
+        self._main_ident = threading.get_ident()
+        self._stop.clear()
+        self._expected = time.monotonic() + self.interval_ms / 1000
+        self._after_id = root.after(self.interval_ms, self._beat)
+        self._thread = threading.Thread(target=self._monitor, name="watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête la surveillance"""
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _beat(self):
+        now = time.monotonic()
+        late_ms = (now - self._expected) * 1000
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None or late_ms >= self.threshold_ms:
+            self._record(max(late_ms, 0), pending)
+        self._expected = now + self.interval_ms / 1000
+        if not self._stop.is_set():
+            self._after_id = self._root.after(self.interval_ms, self._beat)
+
+    def _monitor(self):
+        poll = min(self.interval_ms, self.threshold_ms) / 2000
+        while not self._stop.wait(poll):
+            late_ms = (time.monotonic() - self._expected) * 1000
+            if late_ms < self.threshold_ms:
+                continue
+            with self._lock:
+                if self._pending is not None:
+                    continue
+            frame = sys._current_frames().get(self._main_ident)
+            stack = traceback.extract_stack(frame) if frame is not None else []
+            del frame
+            try:
+                view = self._context() if self._context else None
+            except Exception:
+                view = None
+            pending = {
+                'time': datetime.now().isoformat(timespec='seconds'),
+                'view': view,
+                'handler': _handler(stack),
+                'stack': ''.join(traceback.format_list(stack))
+            }
+            with self._lock:
+                self._pending = pending
+            logger.warning("Interface bloquée depuis %.0f ms (vue %s, gestionnaire %s) :\n%s",
+                           late_ms, view, pending['handler'], pending['stack'])
+
+    def _record(self, ms, pending):
+        entry = dict(pending or {'time': datetime.now().isoformat(timespec='seconds'),
+                                 'view': None, 'handler': None, 'stack': ''})
+        entry['ms'] = round(ms, 1)
+        bucket = next((index for index, bound in enumerate(STALL_BOUNDS) if ms < bound),
+                      len(STALL_BOUNDS))
+        key = (entry['view'], entry['handler'])
+        with self._lock:
+            self._histogram[bucket] += 1
+            stats = self._handlers.get(key)
+            if stats is None:
+                stats = self._handlers[key] = {'view': key[0], 'handler': key[1], 'count': 0,
+                                               'total_ms': 0.0, 'max_ms': 0.0,
+                                               'histogram': [0] * (len(STALL_BOUNDS) + 1)}
+            stats['count'] += 1
+            stats['total_ms'] += ms
+            stats['max_ms'] = max(stats['max_ms'], ms)
+            stats['histogram'][bucket] += 1
+            self._stalls.append(entry)
+        logger.warning("Blocage de l'interface : %.0f ms (vue %s, gestionnaire %s)",
+                       ms, entry['view'], entry['handler'])
+
+    def histogram(self):
+        """Retourne le nombre de blocages par classe de durée (STALL_BOUNDS)"""
+        with self._lock:
+            return list(self._histogram)
+
+    def handlers(self):
+        """
+        Retourne les statistiques de blocage par vue et gestionnaire, les plus
+        coûteux en premier.
+
+        Returns:
+            list: Dictionnaires view, handler, count, total_ms, max_ms, histogram
+        """
+        with self._lock:
+            handlers = [dict(stats, histogram=list(stats['histogram']))
+                        for stats in self._handlers.values()]
+        return sorted(handlers, key=lambda stats: stats['total_ms'], reverse=True)
+
+    def stalls(self):
+        """Retourne le journal des blocages, le plus récent en premier"""
+        with self._lock:
+            return list(reversed(self._stalls))
+
+    def reset(self):
+        """Remet l'histogramme et le journal à zéro"""
+        with self._lock:
+            self._histogram = [0] * (len(STALL_BOUNDS) + 1)
+            self._handlers.clear()
+            self._stalls.clear()
+            self._started = datetime.now()
+
+    def report(self):
+        """
+        Retourne l'état de la surveillance, prêt à être écrit en JSON.
+
+        Returns:
+            dict: Seuil, histogramme, statistiques par gestionnaire et journal
+        """
+        return {
+            'since': self._started.isoformat(timespec='seconds'),
+            'threshold_ms': self.threshold_ms,
+            'histogram_bounds_ms': list(STALL_BOUNDS),
+            'histogram': self.histogram(),
+            'handlers': self.handlers(),
+            'stalls': self.stalls()
+        }
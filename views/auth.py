@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
 from models.database import Database
+from utils.action_profiler import profiled_button
 
 class LoginWindow:
     def __init__(self, callback=None):
@@ -94,20 +95,22 @@ class LoginWindow:
         btn_frame.pack(fill='x', pady=(0, 20))
 
         # Login button
-        tk.Button(
+        profiled_button(
             btn_frame,
-            text="Se connecter",
-            command=self.login,
+            "Se connecter",
+            self.login,
+            widget_class=tk.Button,
             font=('Helvetica', 12, 'bold'),
             bg="#00a8e8",
             fg="white"
         ).pack(side=tk.LEFT, expand=True, padx=5)
 
         # Cancel button
-        tk.Button(
+        profiled_button(
             btn_frame,
-            text="Annuler",
-            command=self.window.destroy,
+            "Annuler",
+            self.window.destroy,
+            widget_class=tk.Button,
             font=('Helvetica', 12),
             bg="#dc3545",
             fg="white"
@@ -1,15 +1,38 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.database import Database
-from datetime import datetime
+from models.catalog import Catalog
+from models.search import match_expression
+from utils.executor import QueryExecutor
+from utils.search_controller import SearchController
+from utils.tree_model import TreeModel
+from utils.tk_async import watch_future
+from services.sales import SaleService, check_quantity, subtotal
+from utils.action_profiler import profiled_button
+
+# Customer list of the client combo, served from the query cache
+CLIENTS_QUERY = 'SELECT id, name FROM customers'
+
+# In-stock products matching a full-text search, best matches first
+PRODUCT_SEARCH_QUERY = '''
+    SELECT p.id, p.name, p.price, p.stock
+    FROM products_fts f
+    JOIN products p ON p.id = f.rowid
+    WHERE products_fts MATCH ? AND p.stock > 0
+    ORDER BY f.rank
+'''
+
 
 class CashierView:
     def __init__(self, parent):
         self.parent = parent
         self.db = Database()
+        self.executor = QueryExecutor()
+        self.catalog = Catalog()
+        self.sales = SaleService(self.db)
+        self.clients = {}
         self.setup_ui()
         self.cart = []
-        self.total = 0.0
 
     def setup_ui(self):
         # Main container
@@ -25,7 +48,6 @@ class CashierView:
         search_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(search_frame, text="Rechercher produit:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.filter_products)
         ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, padx=5)
 
         # Products list
@@ -44,6 +66,11 @@ class CashierView:
 
         self.products_tree.pack(fill=tk.BOTH, expand=True)
         self.products_tree.bind('<Double-1>', self.add_to_cart)
+        self.products_model = TreeModel(self.products_tree)
+
+        # Debounced background search
+        self.search = SearchController(self.products_tree, [self.search_var],
+                                       self.search_products, self.show_products)
 
         # Right panel - Cart
         right_panel = ttk.Frame(self.main_frame)
@@ -88,86 +115,75 @@ class CashierView:
         # Buttons
         btn_frame = ttk.Frame(right_panel)
         btn_frame.pack(fill=tk.X, pady=5)
-        ttk.Button(btn_frame, text="Valider la vente", command=self.process_sale).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Annuler", command=self.clear_cart).pack(side=tk.LEFT)
+        self.validate_btn = profiled_button(btn_frame, "Valider la vente", self.process_sale)
+        self.validate_btn.pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Annuler", self.clear_cart).pack(side=tk.LEFT)
 
         # Load initial products
         self.load_products()
 
+    def on_activate(self):
+        self.load_clients()
+        self.load_products()
+
     def load_products(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT id, name, price, stock FROM products WHERE stock > 0')
+        self.search.refresh()
+
+    def load_clients(self):
+        self.executor.submit(self.client_combo, self.fetch_clients, on_success=self.show_clients)
 
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
+    def fetch_clients(self, conn):
+        return {row['name']: row['id'] for row in self.db.cache.fetchall(conn, CLIENTS_QUERY)}
 
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.products_tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['name'],
-                row_data['price'],
-                row_data['stock']
-            ))
+    def show_clients(self, clients):
+        self.clients = clients
+        self.client_combo['values'] = list(clients)
 
-    def load_clients(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT name FROM customers')
-        clients = [dict(row)['name'] for row in cursor.fetchall()]
-        self.client_combo['values'] = clients
-
-    def filter_products(self, *args):
-        search_term = self.search_var.get().lower()
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
-            SELECT id, name, price, stock 
-            FROM products 
-            WHERE LOWER(name) LIKE ? AND stock > 0
-        ''', (f'%{search_term}%',))
-
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
-
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.products_tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['name'],
-                row_data['price'],
-                row_data['stock']
-            ))
+    def search_products(self, conn, term):
+        # Keep the in-memory catalog in step with the list being shown
+        self.catalog.refresh()
+        match = match_expression(term)
+        if match is None:
+            return self.catalog.products(in_stock=True)
+
+        return conn.execute(PRODUCT_SEARCH_QUERY, (match,)).fetchall()
+
+    def show_products(self, rows):
+        # Only the rows whose stock or price changed are touched
+        self.products_model.update((row[0], (
+            row[0],  # ID
+            row[1],  # Name
+            row[2],  # Price
+            row[3]   # Stock
+        )) for row in rows)
 
     def add_to_cart(self, event):
         selection = self.products_tree.selection()
         if not selection:
             return
 
-        # Get product info
-        item = self.products_tree.item(selection[0])
-        product_id = item['values'][0]
-        product_name = item['values'][1]
-        price = item['values'][2]
-        available_stock = item['values'][3]
+        # Get product info from the catalog (no SQL round-trip)
+        product = self.catalog.get(int(selection[0]))
+        if product is None:
+            messagebox.showerror("Erreur", "Produit non trouvé")
+            return
 
         # Ask for quantity
-        dialog = QuantityDialog(self.parent, available_stock)
+        dialog = QuantityDialog(self.parent, product.stock)
         self.parent.wait_window(dialog.top)
 
         if dialog.quantity is not None:
-            quantity = dialog.quantity
-            total = price * quantity
+            try:
+                # Quantities already in the cart are deducted from the stock
+                line = self.sales.line(product, dialog.quantity, self.cart)
+            except ValueError as e:
+                messagebox.showerror("Erreur", str(e))
+                return
 
             # Add to cart
-            self.cart_tree.insert('', 'end', values=(product_name, quantity, price, total))
-            self.cart.append({
-                'product_id': product_id,
-                'quantity': quantity,
-                'price': price
-            })
-
-            # Update total
-            self.total += total
-            self.total_label.config(text=f"{self.total:.2f} €")
+            self.cart_tree.insert('', 'end', values=(line['name'], line['quantity'], line['price'], line['total']))
+            self.cart.append(line)
+            self.total_label.config(text=f"{subtotal(self.cart):.2f} €")
 
     def remove_from_cart(self, event):
         selection = self.cart_tree.selection()
@@ -175,72 +191,49 @@ class CashierView:
             return
 
         if messagebox.askyesno("Confirmation", "Voulez-vous retirer cet article du panier ?"):
-            item = self.cart_tree.item(selection[0])
-            total_item = item['values'][3]
-
-            self.total -= total_item
-            self.total_label.config(text=f"{self.total:.2f} €")
-
+            # Cart lines are in the same order as the tree rows
+            self.cart.pop(self.cart_tree.index(selection[0]))
             self.cart_tree.delete(selection[0])
-            # Remove from cart list - approximate match based on position
-            if self.cart:
-                self.cart.pop(self.cart_tree.index(selection[0]))
+            self.total_label.config(text=f"{subtotal(self.cart):.2f} €")
 
     def process_sale(self):
         if not self.cart:
             messagebox.showwarning("Attention", "Le panier est vide")
             return
 
-        if not self.client_var.get():
+        customer_id = self.clients.get(self.client_var.get())
+        if customer_id is None:
             messagebox.showwarning("Attention", "Veuillez sélectionner un client")
             return
 
         try:
-            cursor = self.db.conn.cursor()
-
-            # Get client ID
-            cursor.execute('SELECT id FROM customers WHERE name = ?', (self.client_var.get(),))
-            customer_id = cursor.fetchone()[0]
+            # Hand the sale over to the writer thread (grouped commit)
+            future = self.sales.record_sale(customer_id, self.cart)
 
-            # Create sale
-            cursor.execute('''
-                INSERT INTO sales (date, customer_id, total)
-                VALUES (?, ?, ?)
-            ''', (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), customer_id, self.total))
+            self.validate_btn.configure(state="disabled")
+            watch_future(self.main_frame, future, self.on_sale_recorded)
 
-            sale_id = cursor.lastrowid
-
-            # Add sale items and update stock
-            for item in self.cart:
-                cursor.execute('''
-                    INSERT INTO sale_items (sale_id, product_id, quantity, price)
-                    VALUES (?, ?, ?, ?)
-                ''', (sale_id, item['product_id'], item['quantity'], item['price']))
-
-                cursor.execute('''
-                    UPDATE products 
-                    SET stock = stock - ? 
-                    WHERE id = ?
-                ''', (item['quantity'], item['product_id']))
+        except Exception as e:
+            messagebox.showerror("Erreur", str(e))
 
-            self.db.conn.commit()
-            messagebox.showinfo("Succès", "Vente enregistrée avec succès")
+    def on_sale_recorded(self, future):
+        self.validate_btn.configure(state="normal")
+        error = future.exception()
+        if error is not None:
+            messagebox.showerror("Erreur", str(error))
+            return
 
-            # Clear cart
-            self.clear_cart()
-            # Reload products
-            self.load_products()
+        messagebox.showinfo("Succès", "Vente enregistrée avec succès")
 
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
-            self.db.conn.rollback()
+        # Clear cart
+        self.clear_cart()
+        # Reload products
+        self.load_products()
 
     def clear_cart(self):
         self.cart = []
-        self.total = 0.0
         self.total_label.config(text="0.00 €")
-        for item in self.cart_tree.get_children():
-            self.cart_tree.delete(item)
+        self.cart_tree.delete(*self.cart_tree.get_children())
         self.client_var.set('')
 
 class QuantityDialog:
@@ -278,8 +271,8 @@ class QuantityDialog:
         btn_frame = ttk.Frame(self.top)
         btn_frame.pack(fill=tk.X, pady=(10, 5))
 
-        ttk.Button(btn_frame, text="OK", command=self.validate, default="active").pack(side=tk.LEFT, expand=True, padx=5)
-        ttk.Button(btn_frame, text="Annuler", command=self.cancel).pack(side=tk.LEFT, expand=True, padx=5)
+        profiled_button(btn_frame, "OK", self.validate, default="active").pack(side=tk.LEFT, expand=True, padx=5)
+        profiled_button(btn_frame, "Annuler", self.cancel).pack(side=tk.LEFT, expand=True, padx=5)
 
         # Bind Enter key to validate
         self.top.bind('<Return>', lambda e: self.validate())
@@ -287,9 +280,7 @@ class QuantityDialog:
 
     def validate(self):
         try:
-            quantity = float(self.quantity_var.get())
-            if quantity <= 0:
-                raise ValueError("La quantité doit être positive")
+            quantity = check_quantity(self.quantity_var.get())
             if quantity > self.max_quantity:
                 raise ValueError(f"Stock disponible: {self.max_quantity} kg")
 
@@ -1,11 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.database import Database
+from utils.executor import QueryExecutor
+from utils.tree_model import TreeModel
+from utils.action_profiler import profiled_button
 
 class CategoriesView:
     def __init__(self, parent):
         self.parent = parent
         self.db = Database()
+        self.executor = QueryExecutor()
         self.setup_ui()
         self.load_categories()
 
@@ -14,7 +18,7 @@ class CategoriesView:
         title_frame = ttk.Frame(self.parent)
         title_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(title_frame, text="Gestion des Catégories", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
-        ttk.Button(title_frame, text="+ Nouvelle Catégorie", command=self.add_category).pack(side=tk.RIGHT)
+        profiled_button(title_frame, "+ Nouvelle Catégorie", self.add_category).pack(side=tk.RIGHT)
 
         # Categories list
         self.tree = ttk.Treeview(self.parent, columns=('ID', 'Nom'), show='headings')
@@ -28,20 +32,20 @@ class CategoriesView:
 
         # Bind double click for editing
         self.tree.bind('<Double-1>', self.edit_category)
+        self.model = TreeModel(self.tree)
+
+    def on_activate(self):
+        self.load_categories()
 
     def load_categories(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT * FROM categories')
+        self.executor.submit(self.tree, self.fetch_categories,
+                             on_success=self.show_categories, loading=self.tree)
 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def fetch_categories(self, conn):
+        return self.db.cache.fetchall(conn, 'SELECT * FROM categories')
 
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['name']
-            ))
+    def show_categories(self, rows):
+        self.model.update((row['id'], (row['id'], row['name'])) for row in rows)
 
     def add_category(self):
         dialog = CategoryDialog(self.parent, self.db)
@@ -75,35 +79,39 @@ class CategoryDialog:
         # Buttons
         btn_frame = ttk.Frame(self.top)
         btn_frame.grid(row=1, column=0, columnspan=2, pady=10)
-        ttk.Button(btn_frame, text="Sauvegarder", command=self.save).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Annuler", command=self.top.destroy).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Sauvegarder", self.save).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Annuler", self.top.destroy).pack(side=tk.LEFT, padx=5)
         if self.category_id:
-            ttk.Button(btn_frame, text="Supprimer", command=self.delete).pack(side=tk.LEFT, padx=5)
+            profiled_button(btn_frame, "Supprimer", self.delete).pack(side=tk.LEFT, padx=5)
 
     def load_category(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT * FROM categories WHERE id = ?', (self.category_id,))
-        category = cursor.fetchone()
+        QueryExecutor().submit(self.top, self.fetch_category, on_success=self.show_category)
+
+    def fetch_category(self, conn):
+        return conn.execute('SELECT * FROM categories WHERE id = ?',
+                            (self.category_id,)).fetchone()
+
+    def show_category(self, category):
         self.name_var.set(category[1])
 
     def save(self):
         try:
             name = self.name_var.get()
 
-            cursor = self.db.conn.cursor()
-            if self.category_id:
-                cursor.execute('''
-                    UPDATE categories 
-                    SET name = ?
-                    WHERE id = ?
-                ''', (name, self.category_id))
-            else:
-                cursor.execute('''
-                    INSERT INTO categories (name)
-                    VALUES (?)
-                ''', (name,))
-
-            self.db.conn.commit()
+            with self.db.write() as conn:
+                cursor = conn.cursor()
+                if self.category_id:
+                    cursor.execute('''
+                        UPDATE categories 
+                        SET name = ?
+                        WHERE id = ?
+                    ''', (name, self.category_id))
+                else:
+                    cursor.execute('''
+                        INSERT INTO categories (name)
+                        VALUES (?)
+                    ''', (name,))
+
             self.top.destroy()
 
         except Exception as e:
@@ -112,9 +120,9 @@ class CategoryDialog:
     def delete(self):
         if messagebox.askyesno("Confirmation", "Voulez-vous vraiment supprimer cette catégorie ?"):
             try:
-                cursor = self.db.conn.cursor()
-                cursor.execute('DELETE FROM categories WHERE id = ?', (self.category_id,))
-                self.db.conn.commit()
+                with self.db.write() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute('DELETE FROM categories WHERE id = ?', (self.category_id,))
                 self.top.destroy()
             except Exception as e:
                 messagebox.showerror("Erreur", str(e))
\ No newline at end of file
@@ -1,6 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.database import Database
+from models.search import match_expression
+from utils.executor import QueryExecutor
+from utils.search_controller import SearchController
+from utils.virtual_tree import Keyset, VirtualTree
+from utils.action_profiler import profiled_button
 
 class CustomersView:
     def __init__(self, parent):
@@ -14,14 +19,13 @@ class CustomersView:
         title_frame = ttk.Frame(self.parent)
         title_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(title_frame, text="Gestion des Clients", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
-        ttk.Button(title_frame, text="+ Nouveau Client", command=self.add_customer).pack(side=tk.RIGHT)
+        profiled_button(title_frame, "+ Nouveau Client", self.add_customer).pack(side=tk.RIGHT)
 
         # Search frame
         search_frame = ttk.Frame(self.parent)
         search_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.filter_customers)
         ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, padx=5)
 
         # Customers table
@@ -41,38 +45,36 @@ class CustomersView:
         # Bind double click for editing
         self.tree.bind('<Double-1>', self.edit_customer)
 
+        # Paged list, filled by the debounced background search
+        self.list = VirtualTree(self.tree, self.search_customers, self.keyset, self.render_customer)
+        self.search = SearchController(self.tree, [self.search_var], self.list.first_page, self.list.show)
+
+    def on_activate(self):
+        self.load_customers()
+
     def load_customers(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT * FROM customers')
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['name'],
-                row_data['phone'],
-                row_data['address']
-            ))
-
-    def filter_customers(self, *args):
-        search_term = self.search_var.get().lower()
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT * FROM customers WHERE LOWER(name) LIKE ?', (f'%{search_term}%',))
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['name'],
-                row_data['phone'],
-                row_data['address']
-            ))
+        self.search.refresh()
+
+    keyset = Keyset(('name', 'id'), ('name', 'id'))
+
+    def search_customers(self, conn, term, after=None, before=None, limit=100):
+        conditions = []
+        params = []
+        match = match_expression(term)
+        if match is not None:
+            conditions.append('id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)')
+            params.append(match)
+
+        return self.keyset.query(conn, 'SELECT * FROM customers', conditions, params, after, before, limit)
+
+    def render_customer(self, row):
+        row_data = dict(row)
+        return row_data['id'], (
+            row_data['id'],
+            row_data['name'],
+            row_data['phone'],
+            row_data['address']
+        )
 
     def add_customer(self):
         dialog = CustomerDialog(self.parent, self.db)
@@ -116,15 +118,19 @@ class CustomerDialog:
         # Buttons
         btn_frame = ttk.Frame(self.top)
         btn_frame.grid(row=3, column=0, columnspan=2, pady=10)
-        ttk.Button(btn_frame, text="Sauvegarder", command=self.save).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Annuler", command=self.top.destroy).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Sauvegarder", self.save).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Annuler", self.top.destroy).pack(side=tk.LEFT, padx=5)
         if self.customer_id:
-            ttk.Button(btn_frame, text="Supprimer", command=self.delete).pack(side=tk.LEFT, padx=5)
+            profiled_button(btn_frame, "Supprimer", self.delete).pack(side=tk.LEFT, padx=5)
 
     def load_customer(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT * FROM customers WHERE id = ?', (self.customer_id,))
-        customer = cursor.fetchone()
+        QueryExecutor().submit(self.top, self.fetch_customer, on_success=self.show_customer)
+
+    def fetch_customer(self, conn):
+        return conn.execute('SELECT * FROM customers WHERE id = ?',
+                            (self.customer_id,)).fetchone()
+
+    def show_customer(self, customer):
         customer_data = dict(customer)
 
         self.name_var.set(customer_data['name'])
@@ -137,20 +143,20 @@ class CustomerDialog:
             phone = self.phone_var.get()
             address = self.address_var.get()
 
-            cursor = self.db.conn.cursor()
-            if self.customer_id:
-                cursor.execute('''
-                    UPDATE customers 
-                    SET name = ?, phone = ?, address = ?
-                    WHERE id = ?
-                ''', (name, phone, address, self.customer_id))
-            else:
-                cursor.execute('''
-                    INSERT INTO customers (name, phone, address)
-                    VALUES (?, ?, ?)
-                ''', (name, phone, address))
-
-            self.db.conn.commit()
+            with self.db.write() as conn:
+                cursor = conn.cursor()
+                if self.customer_id:
+                    cursor.execute('''
+                        UPDATE customers 
+                        SET name = ?, phone = ?, address = ?
+                        WHERE id = ?
+                    ''', (name, phone, address, self.customer_id))
+                else:
+                    cursor.execute('''
+                        INSERT INTO customers (name, phone, address)
+                        VALUES (?, ?, ?)
+                    ''', (name, phone, address))
+
             self.top.destroy()
 
         except Exception as e:
@@ -159,9 +165,9 @@ class CustomerDialog:
     def delete(self):
         if messagebox.askyesno("Confirmation", "Voulez-vous vraiment supprimer ce client ?"):
             try:
-                cursor = self.db.conn.cursor()
-                cursor.execute('DELETE FROM customers WHERE id = ?', (self.customer_id,))
-                self.db.conn.commit()
+                with self.db.write() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute('DELETE FROM customers WHERE id = ?', (self.customer_id,))
                 self.top.destroy()
             except Exception as e:
                 messagebox.showerror("Erreur", str(e))
\ No newline at end of file
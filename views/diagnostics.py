@@ -0,0 +1,210 @@
+import os
+import json
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
+from models.database import Database
+from models.profiler import QueryProfiler, HISTOGRAM_BOUNDS
+from utils.action_profiler import ActionProfiler, profiled_button
+from utils.watchdog import StallWatchdog, STALL_BOUNDS
+
+
+class DiagnosticsDialog:
+    def __init__(self, parent):
+        self.profiler = QueryProfiler()
+        self.watchdog = StallWatchdog()
+        self.action_profiler = ActionProfiler()
+        self.top = tk.Toplevel(parent)
+        self.slow_entries = []
+        self.stall_entries = []
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        self.top.title("Diagnostics")
+        self.top.geometry("1000x600")
+
+        # Options
+        options = ttk.Frame(self.top, padding=10)
+        options.pack(fill=tk.X)
+        self.enabled_var = tk.BooleanVar(value=self.profiler.enabled)
+        ttk.Checkbutton(options, text="Mesurer les requêtes", variable=self.enabled_var,
+                        command=self.apply_options).pack(side=tk.LEFT)
+        ttk.Label(options, text="Seuil des requêtes lentes (ms):").pack(side=tk.LEFT, padx=(20, 5))
+        self.slow_var = tk.StringVar(value=str(self.profiler.slow_ms))
+        slow_spin = ttk.Spinbox(options, from_=1, to=10000, increment=10, width=8,
+                                textvariable=self.slow_var, command=self.apply_options)
+        slow_spin.pack(side=tk.LEFT)
+        slow_spin.bind('<Return>', lambda e: self.apply_options())
+        ttk.Label(options, text="Seuil des blocages (ms):").pack(side=tk.LEFT, padx=(20, 5))
+        self.stall_var = tk.StringVar(value=str(self.watchdog.threshold_ms))
+        stall_spin = ttk.Spinbox(options, from_=50, to=10000, increment=50, width=8,
+                                 textvariable=self.stall_var, command=self.apply_options)
+        stall_spin.pack(side=tk.LEFT)
+        stall_spin.bind('<Return>', lambda e: self.apply_options())
+        self.actions_var = tk.BooleanVar(value=self.action_profiler.enabled)
+        ttk.Checkbutton(options, text="Profiler les actions", variable=self.actions_var,
+                        command=self.toggle_action_profiling).pack(side=tk.LEFT, padx=(20, 0))
+
+        notebook = ttk.Notebook(self.top)
+        notebook.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        # Per-statement statistics, most expensive first
+        stats_frame = ttk.Frame(notebook)
+        notebook.add(stats_frame, text="Requêtes")
+        bounds = [f"<{bound}" for bound in HISTOGRAM_BOUNDS] + [f"≥{HISTOGRAM_BOUNDS[-1]}"]
+        columns = ('Requête', 'Nombre', 'Total (ms)', 'Moyenne (ms)', 'Max (ms)', 'Lignes',
+                   f"Répartition ({' / '.join(bounds)} ms)")
+        self.stats_tree = ttk.Treeview(stats_frame, columns=columns, show='headings')
+        for col in columns:
+            self.stats_tree.heading(col, text=col)
+            self.stats_tree.column(col, width=90, anchor='e')
+        self.stats_tree.column('Requête', width=420, anchor='w')
+        self.stats_tree.column(columns[-1], width=220, anchor='w')
+        self.pack_with_scrollbar(stats_frame, self.stats_tree)
+
+        # Slow query log with the plan of the selected entry
+        slow_frame = ttk.Frame(notebook)
+        notebook.add(slow_frame, text="Requêtes lentes")
+        columns = ('Heure', 'Durée (ms)', 'Lignes', 'Origine', 'Requête')
+        self.slow_tree = ttk.Treeview(slow_frame, columns=columns, show='headings', height=12)
+        for col in columns:
+            self.slow_tree.heading(col, text=col)
+            self.slow_tree.column(col, width=90)
+        self.slow_tree.column('Origine', width=250)
+        self.slow_tree.column('Requête', width=450)
+        self.slow_tree.bind('<<TreeviewSelect>>', self.on_slow_select)
+
+        self.plan_text = tk.Text(slow_frame, height=8, wrap=tk.WORD)
+        self.plan_text.pack(fill=tk.X, side=tk.BOTTOM, pady=(5, 0))
+        self.pack_with_scrollbar(slow_frame, self.slow_tree)
+
+        # Event loop stalls with the main thread stack of the selected entry
+        stall_frame = ttk.Frame(notebook)
+        notebook.add(stall_frame, text="Blocages de l'interface")
+        self.histogram_label = ttk.Label(stall_frame, text="")
+        self.histogram_label.pack(fill=tk.X, pady=5)
+        columns = ('Heure', 'Durée (ms)', 'Vue', 'Gestionnaire')
+        self.stall_tree = ttk.Treeview(stall_frame, columns=columns, show='headings', height=10)
+        for col in columns:
+            self.stall_tree.heading(col, text=col)
+            self.stall_tree.column(col, width=90)
+        self.stall_tree.column('Vue', width=120)
+        self.stall_tree.column('Gestionnaire', width=450)
+        self.stall_tree.bind('<<TreeviewSelect>>', self.on_stall_select)
+
+        self.stack_text = tk.Text(stall_frame, height=12, wrap=tk.NONE)
+        self.stack_text.pack(fill=tk.X, side=tk.BOTTOM, pady=(5, 0))
+        self.pack_with_scrollbar(stall_frame, self.stall_tree)
+
+        # Actions
+        btn_frame = ttk.Frame(self.top, padding=10)
+        btn_frame.pack(fill=tk.X)
+        profiled_button(btn_frame, "Actualiser", self.refresh).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Réinitialiser", self.reset).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Exporter...", self.export).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Fermer", self.top.destroy).pack(side=tk.RIGHT, padx=5)
+
+    def pack_with_scrollbar(self, parent, tree):
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+
+    def apply_options(self):
+        self.profiler.enabled = self.enabled_var.get()
+        try:
+            self.profiler.slow_ms = max(float(self.slow_var.get()), 0)
+        except ValueError:
+            self.slow_var.set(str(self.profiler.slow_ms))
+        try:
+            self.watchdog.threshold_ms = max(float(self.stall_var.get()), 1)
+        except ValueError:
+            self.stall_var.set(str(self.watchdog.threshold_ms))
+
+    def toggle_action_profiling(self):
+        self.action_profiler.set_enabled(self.actions_var.get())
+        if self.actions_var.get():
+            messagebox.showinfo(
+                "Profilage",
+                f"Chaque navigation et chaque bouton sera profilé dans le dossier "
+                f"« {os.path.abspath(self.action_profiler.directory)} ».",
+                parent=self.top)
+
+    def refresh(self):
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        for stats in self.profiler.stats():
+            self.stats_tree.insert('', tk.END, values=(
+                stats['sql'],
+                stats['count'],
+                f"{stats['total_ms']:.1f}",
+                f"{stats['avg_ms']:.2f}",
+                f"{stats['max_ms']:.1f}",
+                stats['rows'],
+                ' / '.join(str(count) for count in stats['histogram'])
+            ))
+
+        self.slow_entries = self.profiler.slow_queries()
+        self.slow_tree.delete(*self.slow_tree.get_children())
+        for index, entry in enumerate(self.slow_entries):
+            self.slow_tree.insert('', tk.END, iid=str(index), values=(
+                entry['time'][11:], entry['ms'], entry['rows'], entry['source'] or '', entry['sql']))
+        self.plan_text.delete('1.0', tk.END)
+
+        bounds = [f"<{bound}" for bound in STALL_BOUNDS] + [f"≥{STALL_BOUNDS[-1]}"]
+        histogram = self.watchdog.histogram()
+        self.histogram_label.configure(text="Répartition (ms) : " + "   ".join(
+            f"{bound} : {count}" for bound, count in zip(bounds, histogram)))
+        self.stall_entries = self.watchdog.stalls()
+        self.stall_tree.delete(*self.stall_tree.get_children())
+        for index, entry in enumerate(self.stall_entries):
+            self.stall_tree.insert('', tk.END, iid=str(index), values=(
+                entry['time'][11:], entry['ms'], entry['view'] or '', entry['handler'] or ''))
+        self.stack_text.delete('1.0', tk.END)
+
+    def on_slow_select(self, event=None):
+        selection = self.slow_tree.selection()
+        if not selection:
+            return
+        entry = self.slow_entries[int(selection[0])]
+        # The plan is computed now, on a dedicated reader connection
+        plan = self.profiler.explain(entry['id'], Database().open_reader)
+        lines = [entry['sql'], '', f"Paramètres : {entry['params']}",
+                 f"Thread : {entry['thread']}", '', "Plan d'exécution :"]
+        lines.extend(f"  {step}" for step in plan or ["(aucun)"])
+        self.plan_text.delete('1.0', tk.END)
+        self.plan_text.insert('1.0', '\n'.join(lines))
+
+    def on_stall_select(self, event=None):
+        selection = self.stall_tree.selection()
+        if not selection:
+            return
+        entry = self.stall_entries[int(selection[0])]
+        self.stack_text.delete('1.0', tk.END)
+        self.stack_text.insert('1.0', entry['stack'] or "(pile non capturée)")
+
+    def reset(self):
+        self.profiler.reset()
+        self.watchdog.reset()
+        self.refresh()
+
+    def export(self):
+        filename = filedialog.asksaveasfilename(
+            parent=self.top,
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile=f"diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        if not filename:
+            return
+        data = {
+            'dumped': datetime.now().isoformat(timespec='seconds'),
+            'queries': self.profiler.report(),
+            'stalls': self.watchdog.report()
+        }
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            messagebox.showinfo("Succès", "Statistiques exportées", parent=self.top)
+        except OSError as e:
+            messagebox.showerror("Erreur", f"Erreur lors de l'export: {str(e)}", parent=self.top)
@@ -1,11 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.database import Database
+from models.search import match_expression
+from utils.executor import QueryExecutor
+from utils.search_controller import SearchController
+from utils.virtual_tree import Keyset, VirtualTree
+from services.stock import StockService
+from utils.action_profiler import profiled_button
 
 class InventoryView:
     def __init__(self, parent):
         self.parent = parent
         self.db = Database()
+        self.executor = QueryExecutor()
         self.setup_ui()
         self.load_inventory()
 
@@ -14,14 +21,13 @@ class InventoryView:
         title_frame = ttk.Frame(self.parent)
         title_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(title_frame, text="Inventaire", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
-        ttk.Button(title_frame, text="Ajuster Stock", command=self.adjust_stock).pack(side=tk.RIGHT)
+        profiled_button(title_frame, "Ajuster Stock", self.adjust_stock).pack(side=tk.RIGHT)
 
         # Search frame
         search_frame = ttk.Frame(self.parent)
         search_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.filter_inventory)
         ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, padx=5)
 
         # Filter by category
@@ -30,7 +36,6 @@ class InventoryView:
         self.category_combo = ttk.Combobox(search_frame, textvariable=self.category_var)
         self.load_categories()
         self.category_combo.pack(side=tk.LEFT, padx=5)
-        self.category_var.trace('w', self.filter_inventory)
 
         # Inventory table
         self.tree = ttk.Treeview(self.parent, 
@@ -50,67 +55,58 @@ class InventoryView:
 
         self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
+        # Debounced background search on name and category
+        self.list = VirtualTree(self.tree, self.search_inventory, self.keyset, self.render_inventory)
+        self.search = SearchController(self.tree, [self.search_var, self.category_var],
+                                       self.list.first_page, self.list.show)
+
     def load_categories(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT name FROM categories')
-        categories = ['Toutes'] + [row[0] for row in cursor.fetchall()]
-        self.category_combo['values'] = categories
-        self.category_var.set('Toutes')
+        if not self.category_var.get():
+            self.category_var.set('Toutes')
+        self.executor.submit(self.category_combo, self.fetch_categories,
+                             on_success=self.show_categories)
+
+    def fetch_categories(self, conn):
+        return [row[0] for row in self.db.cache.fetchall(conn, 'SELECT name FROM categories')]
+
+    def show_categories(self, categories):
+        self.category_combo['values'] = ['Toutes'] + categories
+
+    def on_activate(self):
+        self.load_categories()
+        self.load_inventory()
 
     def load_inventory(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
+        self.search.refresh()
+
+    keyset = Keyset(('p.name', 'p.id'), ('name', 'id'))
+
+    def search_inventory(self, conn, term, category, after=None, before=None, limit=100):
+        match = match_expression(term)
+
+        conditions = []
+        params = []
+        if match is not None:
+            conditions.append('p.id IN (SELECT rowid FROM products_fts WHERE products_fts MATCH ?)')
+            params.append(match)
+        if category and category != 'Toutes':
+            conditions.append('c.name = ?')
+            params.append(category)
+
+        return self.keyset.query(conn, '''
             SELECT p.id, p.name, c.name, p.stock, p.price 
             FROM products p
             LEFT JOIN categories c ON p.category_id = c.id
-        ''')
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for row in cursor.fetchall():
-            row_data = dict(zip(['id','name','name','stock','price'],row))
-            self.tree.insert('', 'end', values=(
-                row_data['id'], 
-                row_data['name'],
-                row_data.get('name', ''),
-                row_data['stock'],
-                row_data['price']
-            ))
-
-    def filter_inventory(self, *args):
-        search_term = self.search_var.get().lower()
-        category = self.category_var.get()
-
-        cursor = self.db.conn.cursor()
-
-        if category == 'Toutes':
-            cursor.execute('''
-                SELECT p.id, p.name, c.name, p.stock, p.price 
-                FROM products p
-                LEFT JOIN categories c ON p.category_id = c.id
-                WHERE LOWER(p.name) LIKE ?
-            ''', (f'%{search_term}%',))
-        else:
-            cursor.execute('''
-                SELECT p.id, p.name, c.name, p.stock, p.price 
-                FROM products p
-                LEFT JOIN categories c ON p.category_id = c.id
-                WHERE LOWER(p.name) LIKE ? AND c.name = ?
-            ''', (f'%{search_term}%', category))
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for row in cursor.fetchall():
-            row_data = dict(zip(['id','name','name','stock','price'],row))
-            self.tree.insert('', 'end', values=(
-                row_data['id'], 
-                row_data['name'],
-                row_data.get('name', ''),
-                row_data['stock'],
-                row_data['price']
-            ))
+        ''', conditions, params, after, before, limit)
+
+    def render_inventory(self, row):
+        return row[0], (
+            row[0],
+            row[1],
+            row[2] or '',
+            row[3],
+            row[4]
+        )
 
     def adjust_stock(self):
         selection = self.tree.selection()
@@ -126,7 +122,7 @@ class InventoryView:
 class StockAdjustmentDialog:
     def __init__(self, parent, db, product_id):
         self.top = tk.Toplevel(parent)
-        self.db = db
+        self.stock = StockService(db)
         self.product_id = product_id
         self.setup_ui()
         self.load_product()
@@ -151,37 +147,26 @@ class StockAdjustmentDialog:
         # Buttons
         btn_frame = ttk.Frame(self.top)
         btn_frame.grid(row=3, column=0, columnspan=2, pady=10)
-        ttk.Button(btn_frame, text="Sauvegarder", command=self.save).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Annuler", command=self.top.destroy).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Sauvegarder", self.save).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Annuler", self.top.destroy).pack(side=tk.LEFT, padx=5)
 
     def load_product(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT name, stock FROM products WHERE id = ?', (self.product_id,))
-        product = cursor.fetchone()
+        QueryExecutor().submit(self.top, self.stock.product, self.product_id, on_success=self.show_product)
 
+    def show_product(self, product):
         if product:
-            product_data = dict(zip(['name','stock'],product))
-            self.product_label.config(text=product_data['name'])
-            self.current_stock_label.config(text=str(product_data['stock']))
+            self.product_label.config(text=product['name'])
+            self.current_stock_label.config(text=str(product['stock']))
         else:
             messagebox.showerror("Erreur", "Produit non trouvé")
             self.top.destroy()
 
     def save(self):
         try:
-            adjustment = float(self.adjustment_var.get())
-
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                UPDATE products 
-                SET stock = stock + ?
-                WHERE id = ?
-            ''', (adjustment, self.product_id))
-
-            self.db.conn.commit()
+            self.stock.adjust(self.product_id, self.adjustment_var.get())
             self.top.destroy()
 
-        except ValueError:
-            messagebox.showerror("Erreur", "Veuillez entrer une valeur numérique valide")
+        except ValueError as e:
+            messagebox.showerror("Erreur", str(e))
         except Exception as e:
             messagebox.showerror("Erreur", str(e))
\ No newline at end of file
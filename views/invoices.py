@@ -1,14 +1,23 @@
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
 from models.database import Database
-from utils.pdf_generator import PDFGenerator
-import os
+from models.search import match_expression
+from services.invoices import InvoiceService
+from utils.executor import QueryExecutor
+from utils.search_controller import SearchController
+from utils.virtual_tree import Keyset, VirtualTree
+from utils.dates import day_key, month_range, format_day_key
+from utils.action_profiler import profiled_button
 
 class InvoicesView:
     def __init__(self, parent):
         self.parent = parent
         self.db = Database()
-        self.pdf_gen = PDFGenerator()
+        self.executor = QueryExecutor()
+        self.invoices = InvoiceService(self.db)
         self.setup_ui()
         self.load_invoices()
 
@@ -42,12 +51,10 @@ class InvoicesView:
         style = ttk.Style()
         style.configure("Action.TButton", padding=8, font=('Helvetica', 10))
 
-        ttk.Button(buttons_frame, text="Imprimer", style="Action.TButton",
-                  command=self.generate_pdf).pack(side=tk.LEFT, padx=5)
-        ttk.Button(buttons_frame, text="Nouvelle Facture", style="Action.TButton",
-                  command=self.new_invoice).pack(side=tk.LEFT, padx=5)
-        ttk.Button(buttons_frame, text="Actualiser", style="Action.TButton",
-                  command=self.load_invoices).pack(side=tk.LEFT, padx=5)
+        profiled_button(buttons_frame, "Imprimer", self.generate_pdf, style="Action.TButton").pack(side=tk.LEFT, padx=5)
+        profiled_button(buttons_frame, "Facturation groupée", self.batch_invoices, style="Action.TButton").pack(side=tk.LEFT, padx=5)
+        profiled_button(buttons_frame, "Nouvelle Facture", self.new_invoice, style="Action.TButton").pack(side=tk.LEFT, padx=5)
+        profiled_button(buttons_frame, "Actualiser", self.load_invoices, style="Action.TButton").pack(side=tk.LEFT, padx=5)
 
         # Search frame with better styling
         search_frame = ttk.Frame(self.parent)
@@ -55,7 +62,6 @@ class InvoicesView:
         ttk.Label(search_frame, text="Rechercher:", 
                  font=('Helvetica', 11)).pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.filter_invoices)
         ttk.Entry(search_frame, textvariable=self.search_var, 
                  width=40).pack(side=tk.LEFT, padx=10)
 
@@ -81,49 +87,44 @@ class InvoicesView:
 
         self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
+        # Paged list, filled by the debounced background search
+        self.list = VirtualTree(self.tree, self.search_invoices, self.keyset, self.render_invoice)
+        self.search = SearchController(self.tree, [self.search_var], self.list.first_page, self.list.show)
+
         # Actions frame
         actions_frame = ttk.Frame(self.parent)
         actions_frame.pack(fill=tk.X, padx=5, pady=5)
-        ttk.Button(actions_frame, text="Générer PDF", command=self.generate_pdf).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(actions_frame, text="Voir détails", command=self.view_details).pack(side=tk.RIGHT, padx=5)
+        profiled_button(actions_frame, "Générer PDF", self.generate_pdf).pack(side=tk.RIGHT, padx=5)
+        profiled_button(actions_frame, "Voir détails", self.view_details).pack(side=tk.RIGHT, padx=5)
+
+    def on_activate(self):
+        self.load_invoices()
 
     def load_invoices(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
-            SELECT s.id, s.date, c.name, s.total, 
-                   CASE WHEN s.id IN (SELECT sale_id FROM sale_items) THEN 'Complète' ELSE 'En attente' END as status
-            FROM sales s
-            LEFT JOIN customers c ON s.customer_id = c.id
-            ORDER BY s.date DESC
-        ''')
+        self.search.refresh()
 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    # Most recent first
+    keyset = Keyset(('s.date', 's.id'), ('date', 'id'), descending=True)
 
-        for row in cursor.fetchall():
-            try:
-                row_data = dict(row)
-                self.tree.insert('', 'end', values=(row_data['id'], row_data['date'], row_data['name'], row_data['total'], row_data['status']))
-            except (KeyError, TypeError) as e:
-                print(f"Error inserting row: {e}, Row data: {row}")  #Handle missing keys gracefully
-
-    def filter_invoices(self, *args):
-        search_term = self.search_var.get().lower()
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
+    def search_invoices(self, conn, term, after=None, before=None, limit=100):
+        conditions = []
+        params = []
+        match = match_expression(term)
+        if match is not None:
+            conditions.append('s.customer_id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)')
+            params.append(match)
+
+        return self.keyset.query(conn, '''
             SELECT s.id, s.date, c.name, s.total,
-                   CASE WHEN s.id IN (SELECT sale_id FROM sale_items) THEN 'Complète' ELSE 'En attente' END as status
+                   CASE WHEN EXISTS (SELECT 1 FROM sale_items si WHERE si.sale_id = s.id)
+                        THEN 'Complète' ELSE 'En attente' END as status
             FROM sales s
             LEFT JOIN customers c ON s.customer_id = c.id
-            WHERE LOWER(c.name) LIKE ?
-            ORDER BY s.date DESC
-        ''', (f'%{search_term}%',))
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        ''', conditions, params, after, before, limit)
 
-        for row in cursor.fetchall():
-            self.tree.insert('', 'end', values=row)
+    def render_invoice(self, row):
+        row_data = dict(row)
+        return row_data['id'], (row_data['id'], row_data['date'], row_data['name'], row_data['total'], row_data['status'])
 
     def generate_pdf(self):
         selection = self.tree.selection()
@@ -131,51 +132,17 @@ class InvoicesView:
             messagebox.showwarning("Attention", "Veuillez sélectionner une facture")
             return
 
+        # Rendered in the background; an unchanged invoice is copied from the invoice cache
         sale_id = self.tree.item(selection[0])['values'][0]
+        self.executor.submit(self.tree, self.invoices.export, sale_id,
+                             on_success=self.invoice_written, loading=self.tree)
 
-        try:
-            # Get sale data
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                SELECT s.*, c.name as customer_name
-                FROM sales s
-                LEFT JOIN customers c ON s.customer_id = c.id
-                WHERE s.id = ?
-            ''', (sale_id,))
-            sale = cursor.fetchone()
-
-            # Get sale items
-            cursor.execute('''
-                SELECT p.name as product_name, si.quantity, si.price
-                FROM sale_items si
-                JOIN products p ON si.product_id = p.id
-                WHERE si.sale_id = ?
-            ''', (sale_id,))
-            items = cursor.fetchall()
-
-            sale_dict = dict(sale)
-            sale_data = {
-                'id': sale_dict['id'],
-                'date': sale_dict['date'],
-                'customer_name': sale_dict['customer_name'],
-                'total': sale_dict['total'],
-                'items': [
-                    {
-                        'product_name': item[0],
-                        'quantity': item[1],
-                        'price': item[2]
-                    } for item in items
-                ]
-            }
-
-            # Generate PDF
-            filename = f"facture_{sale_id}.pdf"
-            self.pdf_gen.generate_invoice(sale_data, filename)
-
-            messagebox.showinfo("Succès", f"La facture a été générée: {filename}")
+    def invoice_written(self, filename):
+        messagebox.showinfo("Succès", f"La facture a été générée: {filename}")
 
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
+    def batch_invoices(self):
+        dialog = BatchInvoiceDialog(self.parent, self.db)
+        self.parent.wait_window(dialog.top)
 
     def view_details(self):
         selection = self.tree.selection()
@@ -190,7 +157,7 @@ class InvoicesView:
 class InvoiceDetailsDialog:
     def __init__(self, parent, db, sale_id):
         self.top = tk.Toplevel(parent)
-        self.db = db
+        self.invoices = InvoiceService(db)
         self.sale_id = sale_id
         self.setup_ui()
 
@@ -198,22 +165,9 @@ class InvoiceDetailsDialog:
         self.top.title(f"Détails de la facture #{self.sale_id}")
         self.top.geometry("500x400")
 
-        # Load invoice details
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
-            SELECT s.date, c.name, s.total 
-            FROM sales s 
-            LEFT JOIN customers c ON s.customer_id = c.id
-            WHERE s.id = ?
-        ''', (self.sale_id,))
-        sale = cursor.fetchone()
-
-        # Display invoice info
-        info_frame = ttk.Frame(self.top)
-        info_frame.pack(fill=tk.X, padx=5, pady=5)
-        ttk.Label(info_frame, text=f"Date: {sale[0]}").pack()
-        ttk.Label(info_frame, text=f"Client: {sale[1]}").pack()
-        ttk.Label(info_frame, text=f"Total: {sale[2]} €").pack()
+        # Invoice info, filled in once the details are loaded
+        self.info_frame = ttk.Frame(self.top)
+        self.info_frame.pack(fill=tk.X, padx=5, pady=5)
 
         # Display items
         self.tree = ttk.Treeview(self.top, 
@@ -225,15 +179,138 @@ class InvoiceDetailsDialog:
         self.tree.heading('Total', text='Total')
         self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        # Load items
-        cursor.execute('''
-            SELECT p.name, si.quantity, si.price, (si.quantity * si.price) as total
-            FROM sale_items si
-            JOIN products p ON si.product_id = p.id
-            WHERE si.sale_id = ?
-        ''', (self.sale_id,))
+        profiled_button(self.top, "Fermer", self.top.destroy).pack(pady=5)
+
+        QueryExecutor().submit(self.top, self.invoices.fetch, self.sale_id,
+                               on_success=self.show_details, loading=self.tree)
+
+    def show_details(self, sale):
+        # Display invoice info
+        ttk.Label(self.info_frame, text=f"Date: {sale['date']}").pack()
+        ttk.Label(self.info_frame, text=f"Client: {sale['customer_name']}").pack()
+        ttk.Label(self.info_frame, text=f"Total: {sale['total']} €").pack()
+
+        for item in sale['items']:
+            self.tree.insert('', 'end', values=(item['product_name'], item['quantity'], item['price'],
+                                                item['quantity'] * item['price']))
+
+class BatchInvoiceDialog:
+    def __init__(self, parent, db):
+        self.invoices = InvoiceService(db)
+        self.top = tk.Toplevel(parent)
+        self.events = queue.Queue()
+        self.cancel = threading.Event()
+        self.running = False
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.top.title("Facturation groupée")
+        self.top.geometry("450x300")
+        self.top.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Current month by default
+        today = datetime.now()
+        first, last = month_range(today.year, today.month)
+
+        form = ttk.Frame(self.top, padding=10)
+        form.pack(fill=tk.X)
+        ttk.Label(form, text="Du (AAAA-MM-JJ):").grid(row=0, column=0, sticky='w', pady=5)
+        self.start_entry = ttk.Entry(form)
+        self.start_entry.insert(0, format_day_key(first))
+        self.start_entry.grid(row=0, column=1, sticky='ew', pady=5)
+
+        ttk.Label(form, text="Au (AAAA-MM-JJ):").grid(row=1, column=0, sticky='w', pady=5)
+        self.end_entry = ttk.Entry(form)
+        self.end_entry.insert(0, format_day_key(last))
+        self.end_entry.grid(row=1, column=1, sticky='ew', pady=5)
+
+        ttk.Label(form, text="Dossier:").grid(row=2, column=0, sticky='w', pady=5)
+        self.folder_var = tk.StringVar(value=f"factures/{today.strftime('%Y-%m')}")
+        ttk.Entry(form, textvariable=self.folder_var).grid(row=2, column=1, sticky='ew', pady=5)
+        profiled_button(form, "...", self.choose_folder, width=3).grid(row=2, column=2, padx=5)
+        form.columnconfigure(1, weight=1)
+
+        self.progress = ttk.Progressbar(self.top, mode='determinate')
+        self.progress.pack(fill=tk.X, padx=10, pady=10)
+        self.status = ttk.Label(self.top, text="")
+        self.status.pack()
+
+        btn_frame = ttk.Frame(self.top)
+        btn_frame.pack(fill=tk.X, padx=10, pady=10, side=tk.BOTTOM)
+        self.start_btn = profiled_button(btn_frame, "Générer", self.start, name="Facturation groupée")
+        self.start_btn.pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Fermer", self.close).pack(side=tk.RIGHT, padx=5)
+
+    def choose_folder(self):
+        folder = filedialog.askdirectory(parent=self.top)
+        if folder:
+            self.folder_var.set(folder)
+
+    def start(self):
+        try:
+            start = day_key(self.start_entry.get())
+            end = day_key(self.end_entry.get())
+        except ValueError:
+            messagebox.showerror("Erreur", "Format de date invalide", parent=self.top)
+            return
+
+        self.running = True
+        self.cancel.clear()
+        self.start_btn.configure(state='disabled')
+        self.status.configure(text="Lecture des ventes...")
+
+        # Unchanged invoices come from the invoice cache: running again resumes the batch
+        threading.Thread(target=self.run, args=(start, end, self.folder_var.get()),
+                         name="invoice-batch", daemon=True).start()
+        self.top.after(100, self.poll)
 
-        for row in cursor.fetchall():
-            self.tree.insert('', 'end', values=row)
+    def run(self, start, end, folder):
+        try:
+            result = self.invoices.generate(start, end, folder,
+                                            progress=lambda done, total: self.events.put(('progress', done, total)),
+                                            cancelled=self.cancel.is_set)
+            self.events.put(('done', result))
+        except Exception as e:
+            self.events.put(('error', e))
 
-        ttk.Button(self.top, text="Fermer", command=self.top.destroy).pack(pady=5)
\ No newline at end of file
+    def poll(self):
+        if not self.top.winfo_exists():
+            return
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                self.top.after(100, self.poll)
+                return
+
+            if event[0] == 'progress':
+                done, total = event[1:]
+                self.progress['maximum'] = max(total, 1)
+                self.progress['value'] = done
+                self.status.configure(text=f"{done} / {total} factures")
+                continue
+
+            self.running = False
+            self.start_btn.configure(state='normal')
+            if event[0] == 'error':
+                messagebox.showerror("Erreur", str(event[1]), parent=self.top)
+                return
+
+            result = event[1]
+            message = (f"{result['generated']} factures générées, "
+                       f"{result['cached']} depuis le cache, {len(result['failed'])} échecs")
+            if result['cancelled']:
+                message = "Interrompu : " + message
+            self.status.configure(text=message)
+            if result['failed']:
+                messagebox.showwarning("Facturation groupée", message + "\n" + "\n".join(
+                    f"#{sale_id} : {error}" for sale_id, error in result['failed'][:10]), parent=self.top)
+            return
+
+    def close(self):
+        if self.running:
+            if not messagebox.askyesno("Confirmation", "Interrompre la génération en cours ?", parent=self.top):
+                return
+            # The batch stops after the invoices being rendered; it can be resumed later
+            self.cancel.set()
+        self.top.destroy()
@@ -1,13 +1,32 @@
+import importlib
+import logging
+import threading
 import tkinter as tk
+from concurrent.futures import Future
 from tkinter import ttk, messagebox
 import sv_ttk
-from views import products, sales, customers, invoices, suppliers, categories, inventory, cashier, reports, settings, home, auth
+from utils import startup
+from utils.action_profiler import ActionProfiler, profiled_button
+from utils.startup import Step, StartupPipeline
+from utils.tk_async import watch_future
+from utils.view_registry import ViewRegistry
+from utils.watchdog import StallWatchdog
+from views import auth
+
+logger = logging.getLogger(__name__)
+
+# Modules whose import is deferred at startup, preloaded during the splash
+PRELOAD_MODULES = (
+    'views.home', 'views.cashier', 'views.products', 'views.sales', 'views.customers',
+    'views.invoices', 'views.suppliers', 'views.categories', 'views.inventory',
+    'views.reports', 'views.settings', 'utils.pdf_generator', 'werkzeug.security',
+)
 
 
 class SplashScreen:
     """
     Écran de démarrage qui s'affiche au lancement de l'application.
-    Affiche le logo, le titre et une barre de progression.
+    Affiche le logo, le titre et l'avancement des étapes du démarrage.
     """
 
     def __init__(self, parent):
@@ -53,25 +72,22 @@ class SplashScreen:
         self.progress = ttk.Progressbar(content_frame,
                                         length=300,
                                         mode='determinate')
-        self.progress.pack(pady=30)
-
-        # Démarrer l'animation
+        self.progress.pack(pady=(30, 10))
         self.progress['maximum'] = 100
         self.progress['value'] = 0
-        self.animate()
 
-    def animate(self):
-        """Anime la barre de progression jusqu'à 100%"""
-        if self.progress['value'] < 100:
-            self.progress['value'] += 5
-            self.splash.after(50, self.animate)
-        else:
-            self.splash.after(500, self.finish)
+        # Étape en cours
+        self.status = tk.Label(content_frame,
+                               text="",
+                               font=('Helvetica', 11),
+                               bg="#1a1a2e",
+                               fg="#94a3b8")
+        self.status.pack()
 
-    def finish(self):
-        """Ferme l'écran de démarrage et affiche la fenêtre principale"""
-        self.splash.destroy()
-        self.parent.deiconify()
+    def set_progress(self, fraction, label):
+        """Affiche l'avancement du démarrage (fraction entre 0 et 1)"""
+        self.progress['value'] = fraction * 100
+        self.status.configure(text=label)
 
 
 class MainWindow:
@@ -86,6 +102,7 @@ class MainWindow:
         self.root.geometry("1200x800")
         self.current_user = None
         self.root.update_idletasks()
+        startup.mark("tk")
 
         # Cacher la fenêtre principale initialement
         self.root.withdraw()
@@ -116,12 +133,92 @@ class MainWindow:
                        background="008789",
                        foreground="white",
                        font=('Helvetica', 16, 'bold'))
+        startup.mark("theme")
 
         self.setup_ui()
+        startup.mark("main window")
 
-        # Afficher l'écran de démarrage puis l'authentification
+        # Profiling mode: navigation is captured by the view registry, view
+        # buttons created with profiled_button() are named after the active view
+        ActionProfiler().set_context(lambda: self.views.current)
+
+        # Afficher l'écran de démarrage pendant l'initialisation, puis l'authentification
         self.splash = SplashScreen(self.root)
-        self.splash.splash.after(1500, lambda: self.show_login_after_splash())
+        self.pipeline = StartupPipeline(self.startup_steps())
+        self.pipeline.start(self.splash.splash, self.splash.set_progress,
+                            self.on_startup_done, self.on_startup_failed)
+
+    def startup_steps(self):
+        """Étapes exécutées en arrière-plan pendant l'écran de démarrage"""
+        return [
+            Step("Ouverture de la base de données", self.open_database, 3, required=True),
+            Step("Optimisation des index", lambda: self.db.optimize()),
+            Step("Chargement du catalogue", self.warm_catalog, 2),
+            Step("Chargement des clients", self.warm_customers),
+            Step("Chargement des modules", self.preload_modules, 3),
+        ]
+
+    def open_database(self):
+        """Ouvre la base, crée le schéma et applique les migrations en attente"""
+        from models.database import Database
+        self.db = Database()
+
+    def warm_catalog(self):
+        """Charge le catalogue produits en mémoire"""
+        from models.catalog import Catalog
+        Catalog().refresh()
+
+    def warm_customers(self):
+        """Place la liste des clients de la caisse dans le cache des requêtes"""
+        from views.cashier import CLIENTS_QUERY
+        self.db.cached_fetchall(CLIENTS_QUERY)
+
+    def preload_modules(self):
+        """Importe les modules dont le chargement a été différé"""
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                logger.warning("Module %s non préchargé : %s", name, e)
+
+    def on_startup_done(self, failures):
+        """Affiche l'authentification dès la fin du démarrage"""
+        if failures:
+            messagebox.showwarning(
+                "Démarrage",
+                "\n".join(f"{label} : {error}" for label, error in failures),
+                parent=self.splash.splash)
+        self.check_integrity()
+        self.show_login_after_splash()
+
+    def check_integrity(self):
+        """Vérifie l'intégrité de la base en arrière-plan si la dernière vérification est ancienne"""
+        # quick_check reads the whole file: at most once per INTEGRITY_INTERVAL,
+        # never on the splash screen
+        if not self.db.integrity_due():
+            return
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(self.db.check_integrity())
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="integrity-check", daemon=True).start()
+        watch_future(self.root, future, self.on_integrity_checked, interval=500)
+
+    def on_integrity_checked(self, future):
+        """Signale une base endommagée"""
+        error = future.exception()
+        if error is not None:
+            logger.error("Vérification d'intégrité : %s", error)
+            messagebox.showerror("Base de données", str(error))
+
+    def on_startup_failed(self, label, error):
+        """Interrompt l'application si une étape indispensable a échoué"""
+        messagebox.showerror("Erreur", f"{label} : {error}", parent=self.splash.splash)
+        self.root.quit()
 
     def setup_ui(self):
         """Configure l'interface utilisateur principale"""
@@ -176,10 +273,11 @@ class MainWindow:
         logout_frame = ttk.Frame(self.sidebar, style="Sidebar.TFrame")
         logout_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=20)
 
-        self.logout_btn = ttk.Button(logout_frame,
-                                     text="🚪  Déconnexion",
-                                     command=self.logout,
-                                     style="Menu.TButton")
+        self.logout_btn = profiled_button(logout_frame,
+                                          "🚪  Déconnexion",
+                                          self.logout,
+                                          name="Déconnexion",
+                                          style="Menu.TButton")
         self.logout_btn.pack(fill=tk.X)
         self.logout_btn.configure(state="disabled")
 
@@ -202,10 +300,29 @@ class MainWindow:
         self.content = ttk.Frame(right_container, style="TFrame")
         self.content.pack(fill=tk.BOTH, expand=True, padx=30, pady=30)
 
+        # Each view is built once, then hidden and shown again on navigation;
+        # view modules are only imported the first time they are shown
+        self.views = ViewRegistry(self.content)
+        self.views.register('home', 'views.home:HomeView', pinned=True)
+        self.views.register('products', 'views.products:ProductsView', tables=('products', 'categories'))
+        self.views.register('sales', 'views.sales:SalesView', tables=('sales', 'customers'))
+        self.views.register('customers', 'views.customers:CustomersView', tables=('customers',))
+        self.views.register('invoices', 'views.invoices:InvoicesView', tables=('sales', 'sale_items', 'customers'))
+        self.views.register('suppliers', 'views.suppliers:SuppliersView', tables=('suppliers',))
+        self.views.register('categories', 'views.categories:CategoriesView', tables=('categories',))
+        self.views.register('inventory', 'views.inventory:InventoryView', tables=('products', 'categories'))
+        self.views.register('cashier', 'views.cashier:CashierView', tables=('products', 'customers'), pinned=True)
+        self.views.register('reports', 'views.reports:ReportsView')
+        self.views.register('settings', 'views.settings:SettingsView')
+        # Views left hidden for a long time are destroyed to free memory
+        self.views.start()
+
     def show_login(self):
         """Affiche la fenêtre de connexion"""
         self.clear_content()
         login_window = auth.LoginWindow(callback=self.on_login_success)
+        startup.mark("login")
+        startup.report()
         self.root.wait_window(login_window.window)
         if not self.current_user:
             self.root.quit()
@@ -238,83 +355,74 @@ class MainWindow:
     def show_home(self):
         """Affiche la page d'accueil"""
         self.menu_title.configure(text="Accueil")
-        self.clear_content()
-        home.HomeView(self.content)
+        self.views.show('home')
 
     def show_products(self):
         """Affiche la gestion des produits"""
         self.menu_title.configure(text="Produits")
-        self.clear_content()
-        products.ProductsView(self.content)
+        self.views.show('products')
 
     def show_sales(self):
         """Affiche la gestion des ventes"""
         self.menu_title.configure(text="Ventes")
-        self.clear_content()
-        sales.SalesView(self.content)
+        self.views.show('sales')
 
     def show_customers(self):
         """Affiche la gestion des clients"""
         self.menu_title.configure(text="Clients")
-        self.clear_content()
-        customers.CustomersView(self.content)
+        self.views.show('customers')
 
     def show_invoices(self):
         """Affiche la gestion des factures"""
         self.menu_title.configure(text="Factures")
-        self.clear_content()
-        invoices.InvoicesView(self.content)
+        self.views.show('invoices')
 
     def show_suppliers(self):
         """Affiche la gestion des fournisseurs"""
         self.menu_title.configure(text="Fournisseurs")
-        self.clear_content()
-        suppliers.SuppliersView(self.content)
+        self.views.show('suppliers')
 
     def show_categories(self):
         """Affiche la gestion des catégories"""
         self.menu_title.configure(text="Catégories")
-        self.clear_content()
-        categories.CategoriesView(self.content)
+        self.views.show('categories')
 
     def show_inventory(self):
         """Affiche la gestion de l'inventaire"""
         self.menu_title.configure(text="Inventaire")
-        self.clear_content()
-        inventory.InventoryView(self.content)
+        self.views.show('inventory')
 
     def show_cashier(self):
         """Affiche la caisse"""
         self.menu_title.configure(text="Caisse")
-        self.clear_content()
-        cashier.CashierView(self.content)
+        self.views.show('cashier')
 
     def show_reports(self):
         """Affiche les rapports"""
         self.menu_title.configure(text="Rapports")
-        self.clear_content()
-        reports.ReportsView(self.content)
+        self.views.show('reports')
 
     def show_settings(self):
         """Affiche les paramètres"""
         self.menu_title.configure(text="Réglages")
-        self.clear_content()
-        settings.SettingsView(self.content)
+        self.views.show('settings')
 
     def clear_content(self):
-        """Nettoie la zone de contenu principal de manière optimisée"""
-        if hasattr(self, '_current_view'):
-            if hasattr(self._current_view, 'destroy'):
-                self._current_view.destroy()
-        for widget in self.content.winfo_children():
-            widget.destroy()
-        self.content.update_idletasks()
+        """Détruit toutes les vues construites"""
+        self.views.clear()
 
     def show_login_after_splash(self):
-        """Affiche la page de connexion après le splash screen"""
+        """Affiche la page de connexion à la fin du démarrage"""
         self.splash.splash.destroy()
+        startup.mark("splash")
         self.show_login()
 
     def run(self):
         """Lance l'application"""
-        self.root.mainloop()
+        # Log main loop stalls with the active view and the blocking handler
+        watchdog = StallWatchdog()
+        watchdog.start(self.root, lambda: self.views.current)
+        try:
+            self.root.mainloop()
+        finally:
+            watchdog.stop()
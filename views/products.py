@@ -2,6 +2,11 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 from models.database import Database
+from models.search import match_expression
+from utils.executor import QueryExecutor
+from utils.search_controller import SearchController
+from utils.virtual_tree import Keyset, VirtualTree
+from utils.action_profiler import profiled_button
 
 class ProductsView:
     def __init__(self, parent):
@@ -17,14 +22,13 @@ class ProductsView:
         ttk.Label(title_frame, text="Gestion des Produits", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
 
         # Add button
-        ttk.Button(title_frame, text="+ Nouveau Produit", command=self.add_product).pack(side=tk.RIGHT)
+        profiled_button(title_frame, "+ Nouveau Produit", self.add_product).pack(side=tk.RIGHT)
 
         # Search frame
         search_frame = ttk.Frame(self.parent)
         search_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.filter_products)
         ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, padx=5)
 
         # Products table
@@ -44,49 +48,40 @@ class ProductsView:
 
         self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
+        # Paged list, filled by the debounced background search
+        self.list = VirtualTree(self.tree, self.search_products, self.keyset, self.render_product)
+        self.search = SearchController(self.tree, [self.search_var], self.list.first_page, self.list.show)
+
+    def on_activate(self):
+        self.load_products()
+
     def load_products(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
-            SELECT p.id, p.name, p.price, p.stock, c.name 
-            FROM products p 
-            LEFT JOIN categories c ON p.category_id = c.id
-        ''')
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['name'],
-                row_data['price'],
-                row_data['stock'],
-                row_data.get('name', '')  # Category name
-            ))
-
-    def filter_products(self, *args):
-        search_term = self.search_var.get().lower()
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
+        self.search.refresh()
+
+    keyset = Keyset(('p.name', 'p.id'), ('name', 'id'))
+
+    def search_products(self, conn, term, after=None, before=None, limit=100):
+        conditions = []
+        params = []
+        match = match_expression(term)
+        if match is not None:
+            conditions.append('p.id IN (SELECT rowid FROM products_fts WHERE products_fts MATCH ?)')
+            params.append(match)
+
+        return self.keyset.query(conn, '''
             SELECT p.id, p.name, p.price, p.stock, c.name 
             FROM products p 
             LEFT JOIN categories c ON p.category_id = c.id
-            WHERE LOWER(p.name) LIKE ?
-        ''', (f'%{search_term}%',))
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['name'],
-                row_data['price'],
-                row_data['stock'],
-                row_data.get('name', '')  # Category name
-            ))
+        ''', conditions, params, after, before, limit)
+
+    def render_product(self, row):
+        return row[0], (
+            row[0],
+            row[1],
+            row[2],
+            row[3],
+            row[4] or ''  # Category name
+        )
 
     def add_product(self):
         dialog = ProductDialog(self.parent, self.db)
@@ -148,13 +143,16 @@ class ProductDialog:
         # Buttons
         btn_frame = ttk.Frame(main_frame)
         btn_frame.pack(fill=tk.X, pady=20)
-        ttk.Button(btn_frame, text="Sauvegarder", command=self.save).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Annuler", command=self.top.destroy).pack(side=tk.LEFT)
+        profiled_button(btn_frame, "Sauvegarder", self.save).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Annuler", self.top.destroy).pack(side=tk.LEFT)
 
     def load_categories(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT name FROM categories')
-        categories = [row[0] for row in cursor.fetchall()]
+        QueryExecutor().submit(self.top, self.fetch_categories, on_success=self.show_categories)
+
+    def fetch_categories(self, conn):
+        return [row[0] for row in self.db.cache.fetchall(conn, 'SELECT name FROM categories')]
+
+    def show_categories(self, categories):
         self.category_combo['values'] = categories
 
     def save(self):
@@ -164,16 +162,16 @@ class ProductDialog:
             stock = float(self.stock_var.get())
             category = self.category_var.get()
 
-            cursor = self.db.conn.cursor()
-            cursor.execute('SELECT id FROM categories WHERE name = ?', (category,))
-            category_id = cursor.fetchone()[0]
+            with self.db.write() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT id FROM categories WHERE name = ?', (category,))
+                category_id = cursor.fetchone()[0]
 
-            cursor.execute('''
-                INSERT INTO products (name, price, stock, category_id)
-                VALUES (?, ?, ?, ?)
-            ''', (name, price, stock, category_id))
+                cursor.execute('''
+                    INSERT INTO products (name, price, stock, category_id)
+                    VALUES (?, ?, ?, ?)
+                ''', (name, price, stock, category_id))
 
-            self.db.conn.commit()
             self.top.destroy()
 
         except ValueError:
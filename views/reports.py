@@ -1,18 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from models.database import Database
-from utils.pdf_generator import PDFGenerator
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import os
+from utils.executor import QueryExecutor
+from utils.dates import day_key, month_range, format_day_key
+from services.reports import ReportService
+from utils.action_profiler import profiled_button
+from datetime import datetime
+
 
 class ReportsView:
     def __init__(self, parent):
         self.parent = parent
-        self.db = Database()
-        self.pdf_gen = PDFGenerator()
+        self.executor = QueryExecutor()
+        self.reports = ReportService()
         self.setup_ui()
 
     def setup_ui(self):
@@ -32,7 +31,7 @@ class ReportsView:
         self.daily_date = ttk.Entry(daily_frame, width=10)
         self.daily_date.insert(0, datetime.now().strftime('%Y-%m-%d'))
         self.daily_date.pack(side=tk.LEFT, padx=5)
-        ttk.Button(daily_frame, text="Générer", command=self.generate_daily_report).pack(side=tk.LEFT)
+        profiled_button(daily_frame, "Générer", self.generate_daily_report, name="Rapport journalier").pack(side=tk.LEFT)
 
         # Monthly sales report
         monthly_frame = ttk.Frame(reports_frame)
@@ -51,87 +50,46 @@ class ReportsView:
         year_combo.set(str(datetime.now().year))
         year_combo.pack(side=tk.LEFT, padx=5)
         
-        ttk.Button(monthly_frame, text="Générer", command=self.generate_monthly_report).pack(side=tk.LEFT)
+        profiled_button(monthly_frame, "Générer", self.generate_monthly_report, name="Rapport mensuel").pack(side=tk.LEFT)
+
+        # Date range report
+        period_frame = ttk.Frame(reports_frame)
+        period_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(period_frame, text="Rapport sur une période:").pack(side=tk.LEFT)
+        first_day, _ = month_range(datetime.now().year, 1)
+        self.period_start = ttk.Entry(period_frame, width=10)
+        self.period_start.insert(0, format_day_key(first_day))
+        self.period_start.pack(side=tk.LEFT, padx=5)
+        ttk.Label(period_frame, text="au").pack(side=tk.LEFT)
+        self.period_end = ttk.Entry(period_frame, width=10)
+        self.period_end.insert(0, datetime.now().strftime('%Y-%m-%d'))
+        self.period_end.pack(side=tk.LEFT, padx=5)
+        profiled_button(period_frame, "Générer", self.generate_period_report, name="Rapport période").pack(side=tk.LEFT)
 
         # Stock report
         stock_frame = ttk.Frame(reports_frame)
         stock_frame.pack(fill=tk.X, pady=5)
         ttk.Label(stock_frame, text="Rapport de stock:").pack(side=tk.LEFT)
-        ttk.Button(stock_frame, text="Générer", command=self.generate_stock_report).pack(side=tk.LEFT, padx=5)
+        profiled_button(stock_frame, "Générer", self.generate_stock_report, name="Rapport stock").pack(side=tk.LEFT, padx=5)
 
         # Preview frame
         preview_frame = ttk.LabelFrame(self.parent, text="Aperçu", padding=10)
         preview_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        self.summary_label = ttk.Label(preview_frame, text="")
+        self.summary_label.pack(fill=tk.X, pady=(0, 5))
+
         self.preview_tree = ttk.Treeview(preview_frame, show='headings')
         self.preview_tree.pack(fill=tk.BOTH, expand=True)
 
     def generate_daily_report(self):
         try:
-            date_str = self.daily_date.get()
-            date = datetime.strptime(date_str, '%Y-%m-%d')
-            
-            cursor = self.db.conn.cursor()
-            
-            # Get sales data
-            cursor.execute('''
-                SELECT p.name, SUM(si.quantity) as quantity, SUM(si.quantity * si.price) as revenue
-                FROM sale_items si
-                JOIN products p ON si.product_id = p.id
-                JOIN sales s ON si.sale_id = s.id
-                WHERE DATE(s.date) = ?
-                GROUP BY p.id, p.name
-                ORDER BY revenue DESC
-            ''', (date_str,))
-            
-            sales_data = cursor.fetchall()
-            
-            # Get total sales and transaction count
-            cursor.execute('''
-                SELECT COUNT(*) as transaction_count, SUM(total) as total_sales
-                FROM sales
-                WHERE DATE(date) = ?
-            ''', (date_str,))
-            
-            summary = cursor.fetchone()
-            transaction_count = summary[0]
-            total_sales = summary[1] or 0
-            average_basket = total_sales / transaction_count if transaction_count > 0 else 0
-            
-            report_data = {
-                'sales_summary': [
-                    {
-                        'product_name': row[0],
-                        'quantity': row[1],
-                        'revenue': row[2]
-                    } for row in sales_data
-                ],
-                'transaction_count': transaction_count,
-                'total_sales': total_sales,
-                'average_basket': average_basket
-            }
-            
-            # Generate PDF
-            filename = f"rapport_journalier_{date_str}.pdf"
-            self.pdf_gen.generate_daily_report(report_data, filename)
-            
-            # Update preview
-            self.preview_tree['columns'] = ('Produit', 'Quantité', 'CA')
-            for col in self.preview_tree['columns']:
-                self.preview_tree.heading(col, text=col)
-            
-            for item in self.preview_tree.get_children():
-                self.preview_tree.delete(item)
-                
-            for row in sales_data:
-                self.preview_tree.insert('', 'end', values=(row[0], f"{row[1]} kg", f"{row[2]} €"))
-            
-            messagebox.showinfo("Succès", f"Rapport généré: {filename}")
-            
+            day = day_key(self.daily_date.get())
         except ValueError:
             messagebox.showerror("Erreur", "Format de date invalide (YYYY-MM-DD)")
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
+            return
+
+        self.run_report('daily', day)
 
     def generate_monthly_report(self):
         try:
@@ -143,67 +101,49 @@ class ReportsView:
             
             month = months[self.month_var.get()]
             year = int(self.year_var.get())
-            
-            cursor = self.db.conn.cursor()
-            
-            cursor.execute('''
-                SELECT 
-                    DATE(s.date) as sale_date,
-                    COUNT(*) as transactions,
-                    SUM(s.total) as daily_total
-                FROM sales s
-                WHERE strftime('%m', date) = ? AND strftime('%Y', date) = ?
-                GROUP BY DATE(s.date)
-                ORDER BY sale_date
-            ''', (f"{month:02d}", str(year)))
-            
-            data = cursor.fetchall()
-            
-            # Update preview
-            self.preview_tree['columns'] = ('Date', 'Transactions', 'Total')
-            for col in self.preview_tree['columns']:
-                self.preview_tree.heading(col, text=col)
-            
-            for item in self.preview_tree.get_children():
-                self.preview_tree.delete(item)
-                
-            for row in data:
-                self.preview_tree.insert('', 'end', values=(row[0], row[1], f"{row[2]} €"))
-            
-            # Generate PDF report...
-            filename = f"rapport_mensuel_{year}_{month:02d}.pdf"
-            messagebox.showinfo("Succès", f"Rapport généré: {filename}")
-            
         except Exception as e:
             messagebox.showerror("Erreur", str(e))
+            return
 
-    def generate_stock_report(self):
+        self.run_report('monthly', year, month)
+
+    def generate_period_report(self):
         try:
-            cursor = self.db.conn.cursor()
-            
-            cursor.execute('''
-                SELECT p.name, p.stock, c.name as category, p.price
-                FROM products p
-                LEFT JOIN categories c ON p.category_id = c.id
-                ORDER BY c.name, p.name
-            ''')
-            
-            data = cursor.fetchall()
-            
-            # Update preview
-            self.preview_tree['columns'] = ('Produit', 'Stock', 'Catégorie', 'Prix')
-            for col in self.preview_tree['columns']:
-                self.preview_tree.heading(col, text=col)
-            
-            for item in self.preview_tree.get_children():
-                self.preview_tree.delete(item)
-                
-            for row in data:
-                self.preview_tree.insert('', 'end', values=(row[0], f"{row[1]} kg", row[2], f"{row[3]} €"))
-            
-            # Generate PDF report...
-            filename = f"rapport_stock_{datetime.now().strftime('%Y%m%d')}.pdf"
-            messagebox.showinfo("Succès", f"Rapport généré: {filename}")
-            
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
+            start = day_key(self.period_start.get())
+            end = day_key(self.period_end.get())
+        except ValueError:
+            messagebox.showerror("Erreur", "Format de date invalide (YYYY-MM-DD)")
+            return
+
+        self.run_report('period', start, end)
+
+    def generate_stock_report(self):
+        self.run_report('stock', *self.reports.stock_args())
+
+    def run_report(self, kind, *args):
+        # The PDF is written in the background, from a single read snapshot
+        self.executor.submit(self.preview_tree, self.reports.export, kind, *args,
+                             on_success=self.show_report, on_error=self.report_failed,
+                             loading=self.preview_tree)
+
+    def report_failed(self, error):
+        messagebox.showerror("Erreur", str(error))
+
+    def show_report(self, result):
+        filename, report = result
+        columns = [column.label for column in report.columns]
+        self.preview_tree['columns'] = columns
+        for col in columns:
+            self.preview_tree.heading(col, text=col)
+
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        for values in report.rows():
+            self.preview_tree.insert('', 'end', values=values)
+
+        self.summary_label.configure(
+            text="   ".join(f"{label}: {value}" for label, value in report.summary_rows()))
+
+        message = f"Rapport généré: {filename}"
+        if report.line_count > len(report.lines):
+            message += f"\n(aperçu limité aux {len(report.lines)} premières lignes sur {report.line_count})"
+        messagebox.showinfo("Succès", message)
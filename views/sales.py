@@ -1,7 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.database import Database
-from datetime import datetime
+from models.catalog import Catalog
+from models.search import match_expression
+from services.sales import SaleService, LARGE_QUANTITY, adjustments, check_quantity, new_barcode, subtotal
+from services.invoices import InvoiceService
+from utils.executor import QueryExecutor
+from utils.search_controller import SearchController
+from utils.virtual_tree import Keyset, VirtualTree
+from utils.tk_async import watch_future
+from utils.action_profiler import profiled_button
 
 class SalesView:
     def __init__(self, parent):
@@ -15,15 +23,14 @@ class SalesView:
         title_frame = ttk.Frame(self.parent)
         title_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(title_frame, text="Gestion des Ventes", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
-        ttk.Button(title_frame, text="+ Nouvelle Vente", command=self.new_sale).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(title_frame, text="Générer Facture", command=self.generate_invoice).pack(side=tk.RIGHT, padx=5)
+        profiled_button(title_frame, "+ Nouvelle Vente", self.new_sale).pack(side=tk.RIGHT, padx=5)
+        profiled_button(title_frame, "Générer Facture", self.generate_invoice).pack(side=tk.RIGHT, padx=5)
 
         # Search frame
         search_frame = ttk.Frame(self.parent)
         search_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.filter_sales)
         ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, padx=5)
 
         # Sales table
@@ -44,49 +51,41 @@ class SalesView:
         # Bind double click
         self.tree.bind('<Double-1>', self.view_sale_details)
 
+        # Paged list, filled by the debounced background search
+        self.list = VirtualTree(self.tree, self.search_sales, self.keyset, self.render_sale)
+        self.search = SearchController(self.tree, [self.search_var], self.list.first_page, self.list.show)
+
+    def on_activate(self):
+        self.load_sales()
+
     def load_sales(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
-            SELECT s.id, s.date, c.name, s.total 
-            FROM sales s 
-            LEFT JOIN customers c ON s.customer_id = c.id
-            ORDER BY s.date DESC
-        ''')
+        self.search.refresh()
 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    # Most recent first
+    keyset = Keyset(('s.date', 's.id'), ('date', 'id'), descending=True)
 
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['date'],
-                row_data['name'],
-                row_data['total']
-            ))
+    def search_sales(self, conn, term, after=None, before=None, limit=100):
+        conditions = []
+        params = []
+        match = match_expression(term)
+        if match is not None:
+            conditions.append('s.customer_id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)')
+            params.append(match)
 
-    def filter_sales(self, *args):
-        search_term = self.search_var.get().lower()
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
+        return self.keyset.query(conn, '''
             SELECT s.id, s.date, c.name, s.total 
             FROM sales s 
             LEFT JOIN customers c ON s.customer_id = c.id
-            WHERE LOWER(c.name) LIKE ?
-            ORDER BY s.date DESC
-        ''', (f'%{search_term}%',))
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        ''', conditions, params, after, before, limit)
 
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['date'],
-                row_data.get('name', 'Client Anonyme'),
-                row_data['total']
-            ))
+    def render_sale(self, row):
+        row_data = dict(row)
+        return row_data['id'], (
+            row_data['id'],
+            row_data['date'],
+            row_data['name'] or 'Client Anonyme',
+            row_data['total']
+        )
 
     def new_sale(self):
         dialog = SaleDialog(self.parent, self.db)
@@ -117,6 +116,7 @@ class InvoiceGenerationDialog:
         self.parent = parent
         self.db = db
         self.sale_id = sale_id
+        self.invoices = InvoiceService(db)
         self.top = tk.Toplevel(parent)
         self.setup_ui()
 
@@ -124,30 +124,19 @@ class InvoiceGenerationDialog:
         self.top.title("Générer une facture")
         self.top.geometry("400x300")
         
-        # Sale details
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
-            SELECT 
-                s.date, 
-                COALESCE(c.name, 'Client Anonyme') as customer_name,
-                s.total
-            FROM sales s 
-            LEFT JOIN customers c ON s.customer_id = c.id
-            WHERE s.id = ?
-        ''', (self.sale_id,))
-        sale = cursor.fetchone()
-        if sale:
-            sale = dict(sale)
-        
-        if not sale:
-            messagebox.showerror("Erreur", "Vente non trouvée")
-            self.top.destroy()
-            return
+        # Sale details are loaded in the background
+        QueryExecutor().submit(self.top, self.invoices.fetch, self.sale_id,
+                               on_success=self.show_sale, on_error=self.sale_not_found)
 
+    def sale_not_found(self, error):
+        messagebox.showerror("Erreur", str(error))
+        self.top.destroy()
+
+    def show_sale(self, sale):
         ttk.Label(self.top, text=f"Vente #{self.sale_id}", font=('Helvetica', 12, 'bold')).pack(pady=10)
-        ttk.Label(self.top, text=f"Date: {sale[0]}").pack()
-        ttk.Label(self.top, text=f"Client: {sale[1]}").pack()
-        ttk.Label(self.top, text=f"Total: {sale[2]} €").pack()
+        ttk.Label(self.top, text=f"Date: {sale['date']}").pack()
+        ttk.Label(self.top, text=f"Client: {sale['customer_name'] or 'Client Anonyme'}").pack()
+        ttk.Label(self.top, text=f"Total: {sale['total']} €").pack()
 
         # Status selection
         status_frame = ttk.LabelFrame(self.top, text="Statut de la facture")
@@ -162,63 +151,33 @@ class InvoiceGenerationDialog:
         # Buttons
         btn_frame = ttk.Frame(self.top)
         btn_frame.pack(fill=tk.X, padx=20, pady=20)
-        ttk.Button(btn_frame, text="Générer", command=self.generate).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Annuler", command=self.top.destroy).pack(side=tk.RIGHT, padx=5)
+        profiled_button(btn_frame, "Générer", self.generate, name="Générer Facture").pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Annuler", self.top.destroy).pack(side=tk.RIGHT, padx=5)
 
     def generate(self):
         try:
-            cursor = self.db.conn.cursor()
-            
-            # Update sale status
-            cursor.execute('''
-                UPDATE sales 
-                SET status = ?
-                WHERE id = ?
-            ''', (self.status_var.get(), self.sale_id))
-            
-            self.db.conn.commit()
-            
-            # Generate PDF using the existing PDF generator
-            from utils.pdf_generator import PDFGenerator
-            pdf_gen = PDFGenerator()
-            
-            cursor.execute('''
-                SELECT s.*, c.name as customer_name
-                FROM sales s
-                LEFT JOIN customers c ON s.customer_id = c.id
-                WHERE s.id = ?
-            ''', (self.sale_id,))
-            sale = cursor.fetchone()
-            
-            cursor.execute('''
-                SELECT p.name, si.quantity, si.price
-                FROM sale_items si
-                JOIN products p ON si.product_id = p.id
-                WHERE si.sale_id = ?
-            ''', (self.sale_id,))
-            items = cursor.fetchall()
-            
-            sale_data = {
-                'id': sale[0],
-                'date': sale[1],
-                'customer_name': sale[4],
-                'total': sale[3],
-                'items': [{'product_name': i[0], 'quantity': i[1], 'price': i[2]} for i in items]
-            }
-            
-            filename = f"facture_{self.sale_id}.pdf"
-            pdf_gen.generate_invoice(sale_data, filename)
-            
-            messagebox.showinfo("Succès", f"La facture a été générée: {filename}")
-            self.top.destroy()
-            
+            self.invoices.set_status(self.sale_id, self.status_var.get())
+
+            # The PDF is rendered (or copied from the invoice cache) in the background
+            QueryExecutor().submit(self.top, self.invoices.export, self.sale_id,
+                                   on_success=self.invoice_written)
+
         except Exception as e:
             messagebox.showerror("Erreur", str(e))
 
+    def invoice_written(self, filename):
+        messagebox.showinfo("Succès", f"La facture a été générée: {filename}")
+        self.top.destroy()
+
 class SaleDialog:
     def __init__(self, parent, db):
         self.parent = parent
         self.db = db
+        self.executor = QueryExecutor()
+        self.catalog = Catalog()
+        self.sales = SaleService(db)
+        self.customers = {}
+        self.items = []
         self.top = tk.Toplevel(parent)
         self.setup_ui()
 
@@ -293,7 +252,7 @@ class SaleDialog:
         quantity_entry.grid(row=0, column=3, padx=5, pady=5)
 
         # Add button
-        ttk.Button(input_frame, text="Ajouter", command=self.add_product).grid(row=0, column=4, padx=5, pady=5)
+        profiled_button(input_frame, "Ajouter", self.add_product).grid(row=0, column=4, padx=5, pady=5)
 
         # Products list frame
         list_frame = ttk.LabelFrame(main_frame, text="Produits sélectionnés")
@@ -326,20 +285,30 @@ class SaleDialog:
         # Buttons frame
         btn_frame = ttk.Frame(main_frame)
         btn_frame.pack(fill=tk.X, pady=10)
-        ttk.Button(btn_frame, text="Sauvegarder", command=self.save).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(btn_frame, text="Annuler", command=self.top.destroy).pack(side=tk.RIGHT)
+        self.save_btn = profiled_button(btn_frame, "Sauvegarder", self.save)
+        self.save_btn.pack(side=tk.RIGHT, padx=5)
+        profiled_button(btn_frame, "Annuler", self.top.destroy).pack(side=tk.RIGHT)
 
     def load_customers(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT name FROM customers ORDER BY name')
-        customers = [row[0] for row in cursor.fetchall()]
-        self.customer_combo['values'] = customers
+        self.executor.submit(self.customer_combo, self.fetch_customers, on_success=self.show_customers)
+
+    def fetch_customers(self, conn):
+        return {row['name']: row['id'] for row in self.db.cache.fetchall(
+            conn, 'SELECT id, name FROM customers ORDER BY name')}
+
+    def show_customers(self, customers):
+        self.customers = customers
+        self.customer_combo['values'] = list(customers)
 
     def load_products(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT name FROM products WHERE stock > 0 ORDER BY name')
-        products = [row[0] for row in cursor.fetchall()]
-        self.product_combo['values'] = products
+        self.executor.submit(self.product_combo, self.fetch_products, on_success=self.show_products)
+
+    def fetch_products(self, conn):
+        self.catalog.refresh()
+        return [product.name for product in self.catalog.products(in_stock=True)]
+
+    def show_products(self, names):
+        self.product_combo['values'] = names
 
     def add_product(self):
         try:
@@ -347,34 +316,18 @@ class SaleDialog:
             if not product:
                 raise ValueError("Veuillez sélectionner un produit")
 
-            quantity = float(self.quantity_var.get())
-            if not isinstance(quantity, (int, float)) or quantity <= 0:
-                raise ValueError("La quantité doit être un nombre positif")
-            if quantity != float(f"{quantity:.3f}"):
-                raise ValueError("La quantité ne peut pas avoir plus de 3 décimales")
-            if quantity > 1000:
+            quantity = check_quantity(self.quantity_var.get())
+            if quantity > LARGE_QUANTITY:
                 if not messagebox.askyesno("Confirmation", f"Êtes-vous sûr de vouloir ajouter {quantity} kg ?"): 
                     return
 
-            cursor = self.db.conn.cursor()
-            cursor.execute('SELECT price, stock FROM products WHERE name = ?', (product,))
-            result = cursor.fetchone()
+            # Price and stock come from the in-memory catalog
+            line = self.sales.line(self.catalog.by_name(product), quantity, self.items)
+            self.items.append(line)
 
-            if not result:
-                raise ValueError("Produit non trouvé")
-
-            price, stock = result
-
-            if quantity > stock:
-                raise ValueError(f"Stock insuffisant (disponible: {stock} kg)")
-
-            total = price * quantity
-
-            self.products_tree.insert('', 'end', values=(product, f"{quantity:.2f}", f"{price:.2f}", f"{total:.2f}"))
-
-            # Update total
-            current_total = float(self.total_var.get().replace('€', '').strip())
-            self.total_var.set(f"{current_total + total:.2f} €")
+            self.products_tree.insert('', 'end', values=(
+                line['name'], f"{line['quantity']:.2f}", f"{line['price']:.2f}", f"{line['total']:.2f}"))
+            self.total_var.set(f"{subtotal(self.items):.2f} €")
 
             # Clear inputs
             self.product_var.set('')
@@ -393,19 +346,6 @@ class SaleDialog:
         else:
             self.customer_combo.configure(state="normal")
 
-    def calculate_final_total(self):
-        subtotal = float(self.total_var.get().replace('€', '').strip())
-        discount_val = float(self.discount_value.get() or 0)
-        
-        if self.discount_type.get() == "percentage":
-            discount = subtotal * (discount_val / 100)
-        else:
-            discount = discount_val
-
-        tax = (subtotal - discount) * 0.20  # 20% TVA
-        total = subtotal - discount + tax
-        return total, discount, tax
-
     def save(self):
         try:
             payment_method = self.payment_var.get()
@@ -416,70 +356,45 @@ class SaleDialog:
             else:
                 customer = "Anonymous"
 
-            if not self.products_tree.get_children():
+            if not self.items:
                 raise ValueError("Veuillez ajouter des produits à la vente")
 
-            cursor = self.db.conn.cursor()
-
             # Get customer id
-            cursor.execute('SELECT id FROM customers WHERE name = ?', (customer,))
-            customer_id = cursor.fetchone()
-            if not customer_id:
+            customer_id = self.customers.get(customer)
+            if customer_id is None:
                 raise ValueError("Client non trouvé")
 
-            customer_id = customer_id[0]
-            total = float(self.total_var.get().replace('€', '').strip())
-
-            # Create sale
-            final_total, discount, tax = self.calculate_final_total()
-            barcode = f"INV-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-            
-            cursor.execute('''
-                INSERT INTO sales (date, customer_id, total, payment_method, discount, tax, barcode)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 
-                 customer_id, final_total, self.payment_var.get(), 
-                 discount, tax, barcode))
-
-            sale_id = cursor.lastrowid
-
-            # Add sale items
-            for item in self.products_tree.get_children():
-                values = self.products_tree.item(item)['values']
-                product_name = values[0]
-                quantity = float(values[1])
-                price = float(values[2])
-
-                cursor.execute('SELECT id FROM products WHERE name = ?', (product_name,))
-                product_id = cursor.fetchone()[0]
-
-                # Insert sale item
-                cursor.execute('''
-                    INSERT INTO sale_items (sale_id, product_id, quantity, price)
-                    VALUES (?, ?, ?, ?)
-                ''', (sale_id, product_id, quantity, price))
-
-                # Update stock
-                cursor.execute('''
-                    UPDATE products 
-                    SET stock = stock - ? 
-                    WHERE id = ?
-                ''', (quantity, product_id))
-
-            self.db.conn.commit()
-            messagebox.showinfo("Succès", "La vente a été enregistrée avec succès")
-            self.top.destroy()
+            discount, tax = adjustments(subtotal(self.items), self.discount_type.get(),
+                                        self.discount_value.get())
+
+            # Sale header, items and stock updates are committed by the writer thread
+            future = self.sales.record_sale(customer_id, self.items, payment_method=payment_method,
+                                            discount=discount, tax=tax, barcode=new_barcode())
+
+            self.save_btn.configure(state="disabled")
+            watch_future(self.top, future, self.on_saved)
 
         except ValueError as e:
             messagebox.showerror("Erreur", str(e))
         except Exception as e:
             messagebox.showerror("Erreur", f"Une erreur est survenue: {str(e)}")
 
+    def on_saved(self, future):
+        self.save_btn.configure(state="normal")
+        error = future.exception()
+        if error is not None:
+            messagebox.showerror("Erreur", f"Une erreur est survenue: {str(error)}")
+            return
+
+        messagebox.showinfo("Succès", "La vente a été enregistrée avec succès")
+        self.top.destroy()
+
 class SaleDetailsDialog:
     def __init__(self, parent, db, sale_id):
         self.parent = parent
         self.db = db
         self.sale_id = sale_id
+        self.invoices = InvoiceService(db)
         self.top = tk.Toplevel(parent)
         self.setup_ui()
 
@@ -495,22 +410,9 @@ class SaleDetailsDialog:
         y = self.parent.winfo_rooty() + (self.parent.winfo_height() - window_height) // 2
         self.top.geometry(f"{window_width}x{window_height}+{x}+{y}")
 
-        # Load sale details
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
-            SELECT s.date, c.name, s.total 
-            FROM sales s 
-            LEFT JOIN customers c ON s.customer_id = c.id
-            WHERE s.id = ?
-        ''', (self.sale_id,))
-        sale = cursor.fetchone()
-
-        # Display sale info
-        info_frame = ttk.Frame(self.top)
-        info_frame.pack(fill=tk.X, padx=10, pady=10)
-        ttk.Label(info_frame, text=f"Date: {sale[0]}", font=('Helvetica', 10)).pack()
-        ttk.Label(info_frame, text=f"Client: {sale[1]}", font=('Helvetica', 10)).pack()
-        ttk.Label(info_frame, text=f"Total: {sale[2]} €", font=('Helvetica', 10, 'bold')).pack()
+        # Sale info, filled in once the details are loaded
+        self.info_frame = ttk.Frame(self.top)
+        self.info_frame.pack(fill=tk.X, padx=10, pady=10)
 
         # Display items
         self.tree = ttk.Treeview(self.top, 
@@ -522,20 +424,21 @@ class SaleDetailsDialog:
         self.tree.heading('Total', text='Total')
         self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        # Load items
-        cursor.execute('''
-            SELECT p.name, si.quantity, si.price, (si.quantity * si.price) as total
-            FROM sale_items si
-            JOIN products p ON si.product_id = p.id
-            WHERE si.sale_id = ?
-        ''', (self.sale_id,))
+        profiled_button(self.top, "Fermer", self.top.destroy).pack(pady=10)
+
+        QueryExecutor().submit(self.top, self.invoices.fetch, self.sale_id,
+                               on_success=self.show_details, loading=self.tree)
 
-        for row in cursor.fetchall():
+    def show_details(self, sale):
+        # Display sale info
+        ttk.Label(self.info_frame, text=f"Date: {sale['date']}", font=('Helvetica', 10)).pack()
+        ttk.Label(self.info_frame, text=f"Client: {sale['customer_name']}", font=('Helvetica', 10)).pack()
+        ttk.Label(self.info_frame, text=f"Total: {sale['total']} €", font=('Helvetica', 10, 'bold')).pack()
+
+        for item in sale['items']:
             self.tree.insert('', 'end', values=(
-                row[0],
-                f"{row[1]:.2f}",
-                f"{row[2]:.2f} €",
-                f"{row[3]:.2f} €"
+                item['product_name'],
+                f"{item['quantity']:.2f}",
+                f"{item['price']:.2f} €",
+                f"{item['quantity'] * item['price']:.2f} €"
             ))
-
-        ttk.Button(self.top, text="Fermer", command=self.top.destroy).pack(pady=10)
\ No newline at end of file
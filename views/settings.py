@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox, colorchooser
 import json
 import os
+from utils.action_profiler import profiled_button
 
 class SettingsView:
     def __init__(self, parent):
@@ -73,10 +74,14 @@ class SettingsView:
         # Actions
         actions_frame = ttk.Frame(settings_frame)
         actions_frame.pack(fill=tk.X, pady=10)
-        ttk.Button(actions_frame, text="Sauvegarder", 
-                   command=self.save_settings).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(actions_frame, text="Réinitialiser", 
-                   command=self.reset_settings).pack(side=tk.RIGHT, padx=5)
+        profiled_button(actions_frame, "Sauvegarder", self.save_settings).pack(side=tk.RIGHT, padx=5)
+        profiled_button(actions_frame, "Réinitialiser", self.reset_settings).pack(side=tk.RIGHT, padx=5)
+        profiled_button(actions_frame, "Diagnostics", self.show_diagnostics).pack(side=tk.LEFT, padx=5)
+
+    def show_diagnostics(self):
+        # Loaded on demand: only used for troubleshooting
+        from views.diagnostics import DiagnosticsDialog
+        DiagnosticsDialog(self.parent)
 
     def load_settings(self):
         try:
@@ -1,6 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.database import Database
+from models.search import match_expression
+from utils.executor import QueryExecutor
+from utils.search_controller import SearchController
+from utils.tree_model import TreeModel
+from utils.action_profiler import profiled_button
 
 class SuppliersView:
     def __init__(self, parent):
@@ -14,14 +19,13 @@ class SuppliersView:
         title_frame = ttk.Frame(self.parent)
         title_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(title_frame, text="Gestion des Fournisseurs", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
-        ttk.Button(title_frame, text="+ Nouveau Fournisseur", command=self.add_supplier).pack(side=tk.RIGHT)
+        profiled_button(title_frame, "+ Nouveau Fournisseur", self.add_supplier).pack(side=tk.RIGHT)
 
         # Search frame
         search_frame = ttk.Frame(self.parent)
         search_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.filter_suppliers)
         ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, padx=5)
 
         # Suppliers table
@@ -40,39 +44,37 @@ class SuppliersView:
 
         # Bind double click for editing
         self.tree.bind('<Double-1>', self.edit_supplier)
+        self.model = TreeModel(self.tree)
+
+        # Debounced background search
+        self.search = SearchController(self.tree, [self.search_var], self.search_suppliers, self.show_suppliers)
+
+    def on_activate(self):
+        self.load_suppliers()
 
     def load_suppliers(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT * FROM suppliers')
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['name'],
-                row_data['phone'],
-                row_data['address']
-            ))
-
-    def filter_suppliers(self, *args):
-        search_term = self.search_var.get().lower()
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT * FROM suppliers WHERE LOWER(name) LIKE ?', (f'%{search_term}%',))
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for row in cursor.fetchall():
-            row_data = dict(row)
-            self.tree.insert('', 'end', values=(
-                row_data['id'],
-                row_data['name'],
-                row_data['phone'],
-                row_data['address']
-            ))
+        self.search.refresh()
+
+    def search_suppliers(self, conn, term):
+        match = match_expression(term)
+        if match is None:
+            return conn.execute('SELECT * FROM suppliers').fetchall()
+
+        return conn.execute('''
+            SELECT t.*
+            FROM suppliers_fts f
+            JOIN suppliers t ON t.id = f.rowid
+            WHERE suppliers_fts MATCH ?
+            ORDER BY f.rank
+        ''', (match,)).fetchall()
+
+    def show_suppliers(self, rows):
+        self.model.update((row['id'], (
+            row['id'],
+            row['name'],
+            row['phone'],
+            row['address']
+        )) for row in rows)
 
     def add_supplier(self):
         dialog = SupplierDialog(self.parent, self.db)
@@ -116,16 +118,19 @@ class SupplierDialog:
         # Buttons
         btn_frame = ttk.Frame(self.top)
         btn_frame.grid(row=3, column=0, columnspan=2, pady=10)
-        ttk.Button(btn_frame, text="Sauvegarder", command=self.save).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Annuler", command=self.top.destroy).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Sauvegarder", self.save).pack(side=tk.LEFT, padx=5)
+        profiled_button(btn_frame, "Annuler", self.top.destroy).pack(side=tk.LEFT, padx=5)
         if self.supplier_id:
-            ttk.Button(btn_frame, text="Supprimer", command=self.delete).pack(side=tk.LEFT, padx=5)
+            profiled_button(btn_frame, "Supprimer", self.delete).pack(side=tk.LEFT, padx=5)
 
     def load_supplier(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute('SELECT * FROM suppliers WHERE id = ?', (self.supplier_id,))
-        supplier = cursor.fetchone()
+        QueryExecutor().submit(self.top, self.fetch_supplier, on_success=self.show_supplier)
 
+    def fetch_supplier(self, conn):
+        return conn.execute('SELECT * FROM suppliers WHERE id = ?',
+                            (self.supplier_id,)).fetchone()
+
+    def show_supplier(self, supplier):
         self.name_var.set(supplier[1])
         self.phone_var.set(supplier[2])
         self.address_var.set(supplier[3])
@@ -136,20 +141,20 @@ class SupplierDialog:
             phone = self.phone_var.get()
             address = self.address_var.get()
 
-            cursor = self.db.conn.cursor()
-            if self.supplier_id:
-                cursor.execute('''
-                    UPDATE suppliers 
-                    SET name = ?, phone = ?, address = ?
-                    WHERE id = ?
-                ''', (name, phone, address, self.supplier_id))
-            else:
-                cursor.execute('''
-                    INSERT INTO suppliers (name, phone, address)
-                    VALUES (?, ?, ?)
-                ''', (name, phone, address))
-
-            self.db.conn.commit()
+            with self.db.write() as conn:
+                cursor = conn.cursor()
+                if self.supplier_id:
+                    cursor.execute('''
+                        UPDATE suppliers 
+                        SET name = ?, phone = ?, address = ?
+                        WHERE id = ?
+                    ''', (name, phone, address, self.supplier_id))
+                else:
+                    cursor.execute('''
+                        INSERT INTO suppliers (name, phone, address)
+                        VALUES (?, ?, ?)
+                    ''', (name, phone, address))
+
             self.top.destroy()
 
         except Exception as e:
@@ -158,9 +163,9 @@ class SupplierDialog:
     def delete(self):
         if messagebox.askyesno("Confirmation", "Voulez-vous vraiment supprimer ce fournisseur ?"):
             try:
-                cursor = self.db.conn.cursor()
-                cursor.execute('DELETE FROM suppliers WHERE id = ?', (self.supplier_id,))
-                self.db.conn.commit()
+                with self.db.write() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute('DELETE FROM suppliers WHERE id = ?', (self.supplier_id,))
                 self.top.destroy()
             except Exception as e:
                 messagebox.showerror("Erreur", str(e))
\ No newline at end of file